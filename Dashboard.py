@@ -37,6 +37,7 @@ st.write("""
 -   **Modeling**: Pembangunan dan evaluasi model regresi dan klastering.
 -   **Analisis Klastering**: Halaman untuk menampilkan hasil klastering data properti.
 -   **House Price Prediction**: Halaman untuk melakukan prediksi harga rumah berdasarkan input Anda.
+-   **Peta Harga**: Peta median harga dan klaster dominan per sel heksagon di seluruh Jabodetabek.
 """)
 
 # Anda bisa menambahkan gambar, video, atau elemen lain di halaman dashboard ini.
\ No newline at end of file
@@ -0,0 +1,278 @@
+# benchmark.py
+# Benchmark jalur-jalur utama aplikasi (load CSV, feature engineering, transform, prediksi,
+# K-Means, render halaman Streamlit) pada beberapa ukuran dataset sintetis, lalu bandingkan
+# dengan baseline yang disimpan (benchmark_baseline.json) untuk mendeteksi regresi.
+#
+# Contoh:
+#   python benchmark.py                          # jalankan + bandingkan dengan baseline
+#   python benchmark.py --check                  # + gagal jika ada benchmark tanpa entri baseline
+#   python benchmark.py --sizes 1000 --skip-pages
+#   python benchmark.py --update-baseline        # simpan hasil sebagai baseline baru
+#
+# Setiap hasil menyimpan semua sampel waktu dan sebarannya (spread_s), sehingga batas regresi
+# memperhitungkan variasi pengukuran sebenarnya, bukan hanya persentase tetap. Baseline harus
+# direkam ulang (--update-baseline) setiap kali benchmark baru ditambahkan atau artefak dilatih ulang.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_access import load_listings
+from feature_engineering import prepare_dataframe
+from import_report import APP_DIR, PAGE_FILES, page_import_report
+from model_artifacts import load_kmeans_model
+from prediction import MODEL_INPUT_COLUMNS, build_feature_frame, load_artifacts, predict_batch, predict_one
+from scenarios import numeric_sweep, run_scenarios
+from spatial_index import ComparableIndex
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+KMEANS_MODEL_PATH = 'kmeans_cluster_model.pkl'
+RESULTS_PATH = 'benchmark_results.json'
+BASELINE_PATH = 'benchmark_baseline.json'
+# Ukuran default sama dengan baseline yang tersimpan agar hasilnya bisa dibandingkan
+DEFAULT_SIZES = [500, 2000, 8000]
+
+# Dijalankan di interpreter baru agar import dan cache Streamlit benar-benar dingin
+_PAGE_RENDER_SCRIPT = """
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+at.run()
+print(json.dumps({'seconds': time.perf_counter() - start,
+                  'exceptions': [str(e.value) for e in at.exception]}))
+"""
+
+
+def make_synthetic_listings(n_rows, source_path=DATA_PATH, seed=42):
+    """Dataset sintetis dengan skema CSV sumber: setiap kolom di-resample independen
+    (dengan pengembalian), termasuk proporsi nilai kosongnya."""
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        col: source[col].to_numpy()[rng.integers(0, len(source), n_rows)]
+        for col in source.columns
+    })
+
+
+def timing_summary(timings):
+    """Median, minimum, dan sebaran sampel waktu. spread_s = 1.4826 x median absolute deviation
+    (perkiraan simpangan baku yang tidak terpengaruh satu-dua sampel lambat)."""
+    median = statistics.median(timings)
+    return {'median_s': median, 'min_s': min(timings), 'repeats': len(timings),
+            'spread_s': 1.4826 * statistics.median(abs(t - median) for t in timings),
+            'samples_s': list(timings)}
+
+
+def time_call(func, repeats=5, warmup=1):
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timing_summary(timings)
+
+
+def _result(name, size, timing, **extra):
+    return {'name': name, 'size': size, **timing, **extra}
+
+
+def run_data_benchmarks(sizes, repeats=5, workdir=None):
+    preprocessor, model = load_artifacts(flatten=True)
+    kmeans = load_kmeans_model(KMEANS_MODEL_PATH)
+
+    results = []
+    single_features = prepare_dataframe(make_synthetic_listings(100))[MODEL_INPUT_COLUMNS].iloc[0].to_dict()
+    timing = time_call(lambda: predict_one(single_features, preprocessor, model), repeats=max(repeats, 20))
+    results.append(_result('predict_single', 1, timing))
+    print(f"{'predict_single':<24} {1:>8} {timing['median_s'] * 1000:>10.1f} ms")
+
+    # Grid what-if 50 luas tanah x 9 kota dalam satu batch
+    sweeps = {'land_size_m2': numeric_sweep(60, 300, 50),
+              'city': ['Bekasi', 'Tangerang', 'Jakarta Selatan', 'Bogor', 'Depok', 'Jakarta Barat',
+                       'Jakarta Timur', 'Jakarta Pusat', 'Jakarta Utara']}
+    timing = time_call(lambda: run_scenarios(single_features, sweeps, preprocessor, model), repeats=repeats)
+    results.append(_result('scenario_grid', 450, timing))
+    print(f"{'scenario_grid':<24} {450:>8} {timing['median_s'] * 1000:>10.1f} ms")
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            csv_path = os.path.join(tmp, f'listings_{size}.csv')
+            make_synthetic_listings(size).to_csv(csv_path, index=False)
+            raw = pd.read_csv(csv_path)
+            prepared = prepare_dataframe(raw)
+            X = build_feature_frame(prepared.drop(columns='price_in_rp'), preprocessor)
+            X_processed = preprocessor.transform(X)
+
+            load_listings(csv_path)  # Bangun cache kolumnar sekali; yang diukur adalah pembacaan
+            benchmarks = [
+                ('csv_load', lambda: pd.read_csv(csv_path)),
+                ('columnar_load', lambda: load_listings(csv_path)),
+                ('feature_engineering', lambda: prepare_dataframe(raw)),
+                ('preprocessor_transform', lambda: preprocessor.transform(X)),
+                ('predict_batch', lambda: predict_batch(prepared, preprocessor, model)),
+                ('kmeans_predict', lambda: kmeans.predict(X_processed)),
+            ]
+            for name, func in benchmarks:
+                timing = time_call(func, repeats=repeats)
+                results.append(_result(name, size, timing, rows_per_s=size / timing['median_s']))
+                print(f"{name:<24} {size:>8} {timing['median_s'] * 1000:>10.1f} ms")
+
+            # Latensi satu kueri pembanding terhadap indeks berisi `size` listing
+            spatial_index = ComparableIndex(raw)
+            lat, long = single_features['lat'], single_features['long']
+            for name, func in [('spatial_nearest', lambda: spatial_index.nearest(lat, long, k=5)),
+                               ('spatial_radius_1km', lambda: spatial_index.radius_features(lat, long))]:
+                timing = time_call(func, repeats=max(repeats, 20))
+                results.append(_result(name, size, timing))
+                print(f"{name:<24} {size:>8} {timing['median_s'] * 1000:>10.3f} ms")
+            del X, X_processed
+    return results
+
+
+def time_page_render(page, timeout=300):
+    proc = subprocess.run([sys.executable, '-c', _PAGE_RENDER_SCRIPT, page, str(timeout)],
+                          capture_output=True, text=True, timeout=timeout + 60, cwd=APP_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Render {page} gagal:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_page_benchmarks(pages=PAGE_FILES, repeats=3):
+    results = []
+    for page in pages:
+        runs = [time_page_render(page) for _ in range(repeats)]
+        timings = [run['seconds'] for run in runs]
+        results.append(_result('page_cold_render', 0, timing_summary(timings),
+                               page=page, exceptions=runs[-1]['exceptions']))
+        print(f"{'page_cold_render':<24} {page:<45} {statistics.median(timings) * 1000:>10.1f} ms")
+
+        # Waktu import tingkat-modul saja (lihat import_report.py)
+        imports = [page_import_report(page)['total_ms'] / 1000 for _ in range(repeats)]
+        results.append(_result('page_import', 0, timing_summary(imports), page=page))
+        print(f"{'page_import':<24} {page:<45} {statistics.median(imports) * 1000:>10.1f} ms")
+    return results
+
+
+def _result_key(result):
+    return f"{result['name']}[{result.get('page') or result['size']}]"
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_delta_s=0.002, noise_sigmas=3.0):
+    """(regresi, missing): benchmark yang median-nya lebih lambat dari baseline * (1 + tolerance)
+    dan selisihnya melebihi noise, serta kunci benchmark yang tidak punya entri di baseline.
+
+    Noise = `noise_sigmas` x (spread_s baseline + spread_s hasil sekarang), minimal `min_delta_s`;
+    entri baseline lama tanpa spread_s hanya memakai min_delta_s.
+    """
+    baseline_by_key = {_result_key(r): r for r in baseline.get('results', [])}
+    regressions, missing = [], []
+    for result in results:
+        base = baseline_by_key.get(_result_key(result))
+        if base is None:
+            missing.append(_result_key(result))
+            continue
+        ratio = result['median_s'] / base['median_s']
+        noise_s = max(min_delta_s, noise_sigmas * (base.get('spread_s', 0.0) + result.get('spread_s', 0.0)))
+        if ratio > 1 + tolerance and result['median_s'] - base['median_s'] > noise_s:
+            regressions.append({'key': _result_key(result), 'baseline_s': base['median_s'],
+                                'current_s': result['median_s'], 'ratio': ratio, 'noise_s': noise_s})
+    return regressions, missing
+
+
+def environment_info():
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def git_commit():
+    """Commit tempat benchmark dijalankan, agar baseline yang basi mudah dikenali."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur utama aplikasi dan bandingkan dengan baseline.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--page-repeats', type=int, default=3)
+    parser.add_argument('--skip-pages', action='store_true', help="Lewati benchmark render halaman")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Batas perlambatan relatif (0.25 = 25%%)")
+    parser.add_argument('--check', action='store_true',
+                        help="Gagal juga jika ada benchmark yang belum punya entri baseline")
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run_data_benchmarks(args.sizes, repeats=args.repeats)
+    if not args.skip_pages:
+        results += run_page_benchmarks(repeats=args.page_repeats)
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': git_commit(),
+        'environment': environment_info(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil benchmark disimpan ke {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline diperbarui: {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"Baseline {args.baseline} belum ada; jalankan dengan --update-baseline")
+        return
+    environment = report['environment']
+    changed = {key: (value, environment.get(key)) for key, value in baseline.get('environment', {}).items()
+               if environment.get(key) != value}
+    for key, (base_value, value) in changed.items():
+        print(f"PERINGATAN lingkungan berbeda dari baseline: {key} {base_value} -> {value}")
+
+    regressions, missing = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+    for key in missing:
+        print(f"MISSING {key}: tidak ada di baseline "
+              f"({baseline.get('created_at')}, commit {baseline.get('git_commit')}); jalankan --update-baseline")
+    for reg in regressions:
+        print(f"REGRESI {reg['key']}: {reg['baseline_s'] * 1000:.1f} ms -> {reg['current_s'] * 1000:.1f} ms "
+              f"({reg['ratio']:.2f}x, noise {reg['noise_s'] * 1000:.1f} ms)")
+    if regressions or (args.check and missing):
+        sys.exit(1)
+    if missing:
+        print(f"Tidak ada regresi, tetapi {len(missing)} benchmark tidak bisa dibandingkan")
+    else:
+        print("Tidak ada regresi dibanding baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# cluster_summary.py
+# Label klaster dan statistik per klaster yang dihitung offline untuk halaman Analisis Klastering.
+# Artefak disimpan di samping kmeans_cluster_model.pkl bersama hash data dan model, sehingga
+# halaman cukup memuat file kecil ini dan hanya menghitung ulang jika data/model berubah.
+# Hasil hitung ulang dari halaman disimpan di .cache/, bukan menimpa cluster_summary.pkl yang
+# di-commit; artefak itu hanya ditulis oleh CLI di bawah.
+#
+# Contoh:
+#   python cluster_summary.py
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import cached_file_sha256, source_sha256
+from eda_aggregates import box_stats
+from feature_engineering import get_prepared_df
+from metrics import stage
+from model_artifacts import load_kmeans_model
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+PREPROCESSOR_PATH = 'preprocessor.pkl'
+KMEANS_MODEL_PATH = 'kmeans_cluster_model.pkl'
+CLUSTER_SUMMARY_PATH = 'cluster_summary.pkl'
+CLUSTER_SUMMARY_CACHE_PATH = os.path.join('.cache', 'cluster_summary.pkl')
+# Naikkan jika isi artefak berubah agar artefak lama dihitung ulang; jalankan juga
+# `python cluster_summary.py` dan commit cluster_summary.pkl yang baru bersama perubahan itu
+SUMMARY_FORMAT_VERSION = 3
+
+# Define numerical columns for statistical summary
+NUMERICAL_COLS_FOR_SUMMARY = [
+    'price_in_rp', 'land_size_m2', 'building_size_m2', 'bedrooms',
+    'bathrooms', 'total_rooms', 'price_per_m2', 'floors', 'building_age', 'garages'
+]
+SUMMARY_AGGREGATIONS = ['count', 'mean', 'median', 'min', 'max']
+
+
+def artifact_hashes(data_path=DATA_PATH, preprocessor_path=PREPROCESSOR_PATH, kmeans_model_path=KMEANS_MODEL_PATH):
+    return {
+        'data_sha256': source_sha256(data_path),
+        'preprocessor_sha256': cached_file_sha256(preprocessor_path),
+        'model_sha256': cached_file_sha256(kmeans_model_path),
+    }
+
+
+def build_cluster_summary(data_path=DATA_PATH, preprocessor_path=PREPROCESSOR_PATH,
+                          kmeans_model_path=KMEANS_MODEL_PATH):
+    with stage('cluster_load_data'):
+        df = get_prepared_df(data_path)
+    with stage('cluster_preprocessor_transform'):
+        X_cluster_processed = joblib.load(preprocessor_path).transform(df.drop('price_in_rp', axis=1))
+    # Model bisa berupa Pipeline reducer + K-Means (k_selection.py --reduction); predict sama saja
+    from k_selection import describe_cluster_model
+
+    # Centroid dari artefak bersama (model_artifacts.py) jika sudah diekspor, selain itu dari .pkl
+    kmeans_model = load_kmeans_model(kmeans_model_path)
+    with stage('kmeans_predict'):
+        cluster_labels = kmeans_model.predict(X_cluster_processed)
+
+    summary = df.groupby(cluster_labels)[NUMERICAL_COLS_FOR_SUMMARY].agg(SUMMARY_AGGREGATIONS)
+    summary.index.name = 'cluster'
+    prices = pd.DataFrame({'cluster': cluster_labels, 'price_in_rp': df['price_in_rp'].to_numpy()})
+    return {
+        'format_version': SUMMARY_FORMAT_VERSION,
+        **artifact_hashes(data_path, preprocessor_path, kmeans_model_path),
+        'labels': cluster_labels.astype(np.int16),
+        'cluster_model': describe_cluster_model(kmeans_model),
+        'cluster_counts': pd.Series(cluster_labels, name='cluster').value_counts().rename('Jumlah Data per Klaster'),
+        'cluster_summary_df': summary,
+        # Kuantil boxplot harga per klaster, agar halaman tidak perlu membaca kolom harga
+        'price_box_by_cluster': box_stats(prices, 'cluster', 'price_in_rp'),
+    }
+
+
+def _load_matching_summary(path, current_hashes):
+    # Ringkasan di path jika format dan hash data/model-nya cocok, selain itu None
+    try:
+        with stage('cluster_summary_load'):
+            summary = joblib.load(path)
+    except (FileNotFoundError, EOFError, ValueError):
+        return None
+    if summary.get('format_version') == SUMMARY_FORMAT_VERSION \
+            and all(summary.get(key) == value for key, value in current_hashes.items()):
+        return summary
+    return None
+
+
+def load_cluster_summary(data_path=DATA_PATH, preprocessor_path=PREPROCESSOR_PATH,
+                         kmeans_model_path=KMEANS_MODEL_PATH, summary_path=CLUSTER_SUMMARY_PATH,
+                         cache_path=CLUSTER_SUMMARY_CACHE_PATH):
+    """Muat artefak ringkasan klaster (summary_path, lalu cache_path). Jika keduanya tidak cocok
+    dengan hash data/model, hitung ulang dan simpan ke cache_path; summary_path tidak ditimpa."""
+    with stage('cluster_artifact_hashes'):
+        current_hashes = artifact_hashes(data_path, preprocessor_path, kmeans_model_path)
+    for path in (summary_path, cache_path):
+        summary = _load_matching_summary(path, current_hashes)
+        if summary is not None:
+            return summary
+
+    summary = build_cluster_summary(data_path, preprocessor_path, kmeans_model_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        joblib.dump(summary, cache_path)
+    except OSError:
+        pass  # Direktori read-only: tetap pakai hasil hitung ulang di memori
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung label dan ringkasan klaster untuk halaman Analisis Klastering.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--model', default=KMEANS_MODEL_PATH)
+    parser.add_argument('--output', default=CLUSTER_SUMMARY_PATH)
+    args = parser.parse_args(argv)
+
+    summary = build_cluster_summary(args.data, args.preprocessor, args.model)
+    joblib.dump(summary, args.output)
+    print(summary['cluster_counts'].to_string())
+    print(f"Ringkasan klaster disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
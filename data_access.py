@@ -0,0 +1,145 @@
+# data_access.py
+# Akses data listing lewat cache kolumnar (Arrow/Feather) dari jabodetabek_house_price.csv.
+# CSV di-parse sekali, disimpan dengan tipe data tetap (kategori + numerik yang di-downcast),
+# lalu dibaca dengan memory-map dan hanya kolom yang dibutuhkan.
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+CACHE_DIR = '.cache'
+SCHEMA_VERSION = 1
+
+# Kolom dengan sedikit nilai unik -> dtype category
+CATEGORY_COLUMNS = [
+    'district', 'city', 'property_type', 'certificate', 'electricity',
+    'property_condition', 'building_orientation', 'furnishing'
+]
+# Kolom teks bebas / identitas tetap string
+TEXT_COLUMNS = ['url', 'title', 'address', 'facilities', 'ads_id']
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# Hash file per (path, mtime, ukuran), agar file besar tidak di-hash ulang di setiap rerun halaman
+_sha_cache = {}
+_sha_lock = threading.Lock()
+
+
+def cached_file_sha256(path):
+    """file_sha256 yang hanya dihitung ulang jika mtime/ukuran file berubah."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _sha_lock:
+        if key not in _sha_cache:
+            _sha_cache[key] = file_sha256(path)
+        return _sha_cache[key]
+
+
+def _downcast_numeric(series):
+    # float64 -> float32 hanya jika semua nilai bisa direpresentasikan tanpa kehilangan presisi
+    # (jumlah kamar, luas, tahun); harga dan koordinat tetap float64
+    as_float32 = series.astype(np.float32)
+    if ((as_float32.astype(np.float64) == series) | series.isna()).all():
+        return as_float32
+    return series
+
+
+def apply_schema(df):
+    df = df.copy()
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in TEXT_COLUMNS:
+            df[col] = df[col].astype(object)
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = _downcast_numeric(df[col])
+    return df
+
+
+def cache_paths(csv_path=DATA_PATH, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    base = os.path.join(os.path.dirname(os.path.abspath(csv_path)), cache_dir, stem)
+    return base + '.feather', base + '.meta.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def ensure_columnar_cache(csv_path=DATA_PATH, cache_dir=CACHE_DIR):
+    """Pastikan cache Feather untuk csv_path ada dan masih sesuai isi CSV; kembalikan path-nya."""
+    feather_path, meta_path = cache_paths(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+    meta = _read_meta(meta_path)
+    if meta is not None and meta.get('schema_version') == SCHEMA_VERSION and os.path.exists(feather_path):
+        if (meta['source_mtime_ns'], meta['source_size']) == (stat.st_mtime_ns, stat.st_size):
+            return feather_path
+        digest = file_sha256(csv_path)
+        if meta['source_sha256'] == digest:
+            # Isi file sama (hanya mtime berubah) -> perbarui metadata saja
+            meta.update(source_mtime_ns=stat.st_mtime_ns, source_size=stat.st_size)
+            _write_json(meta_path, meta)
+            return feather_path
+    else:
+        digest = file_sha256(csv_path)
+
+    import pyarrow.feather as feather
+
+    df = apply_schema(pd.read_csv(csv_path))
+    os.makedirs(os.path.dirname(feather_path), exist_ok=True)
+    tmp_path = feather_path + '.tmp'
+    # Tanpa kompresi agar file bisa di-memory-map langsung
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, feather_path)
+    _write_json(meta_path, {
+        'schema_version': SCHEMA_VERSION,
+        'source': os.path.basename(csv_path),
+        'source_sha256': digest,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_size': stat.st_size,
+        'n_rows': int(len(df)),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+    })
+    return feather_path
+
+
+def _write_json(path, obj):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_listings(csv_path=DATA_PATH, columns=None):
+    """Baca data listing (bertipe) dari cache kolumnar; `columns` membatasi kolom yang dibaca."""
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return apply_schema(pd.read_csv(csv_path, usecols=columns))
+    feather_path = ensure_columnar_cache(csv_path)
+    table = feather.read_table(feather_path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def source_sha256(csv_path=DATA_PATH):
+    """Hash isi CSV sumber, diambil dari metadata cache tanpa membaca ulang file."""
+    try:
+        ensure_columnar_cache(csv_path)
+    except ImportError:
+        return file_sha256(csv_path)
+    return _read_meta(cache_paths(csv_path)[1])['source_sha256']
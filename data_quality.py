@@ -0,0 +1,174 @@
+# data_quality.py
+# Laporan kualitas data yang dihitung secara streaming (per chunk) untuk halaman Data Understanding:
+# dtype, jumlah null, pemakaian memori, jumlah baris duplikat persis (hash 64-bit per baris) dan
+# perkiraan kardinalitas per kolom (sketch HyperLogLog berukuran tetap). File tidak pernah dimuat
+# utuh ke memori; yang disimpan satu sketch per kolom dan 8 byte hash per baris *unik* (hash
+# di-dedup per chunk), jadi penghitungan duplikat persis tetap O(jumlah baris unik).
+# Laporan di-cache di disk per hash isi file.
+#
+# Contoh:
+#   python data_quality.py jabodetabek_house_price.csv
+#   python data_quality.py dump_listing.parquet --chunksize 200000
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import cached_file_sha256
+from prediction import iter_listing_chunks
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+CACHE_DIR = '.cache'
+DEFAULT_CHUNKSIZE = 100000
+# Naikkan jika isi laporan berubah agar laporan lama di cache tidak dipakai
+REPORT_FORMAT_VERSION = 2
+
+
+class HyperLogLog:
+    """Sketch kardinalitas dengan 2**precision register (precision=14 -> 16 KiB, galat ~0.8%)."""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return self
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Posisi bit 1 pertama di (64 - p) bit sisanya; frexp memberi panjang bit rest
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def update(self, series):
+        # Numerik disamakan ke float64 seperti row_hashes: 5 (int64) dan 5.0 (float64) harus satu nilai
+        series = series.dropna()
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            series = series.astype(np.float64)
+        return self.update_hashes(pd.util.hash_pandas_object(series, index=False).to_numpy())
+
+    def estimate(self):
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)  # Linear counting untuk kardinalitas kecil
+        return float(raw)
+
+
+def row_hashes(chunk):
+    """Hash 64-bit per baris. Kolom numerik disamakan ke float64 dulu, agar nilai yang sama tetap
+    ber-hash sama walau dtype hasil inferensi berbeda antar chunk (mis. int64 vs float64)."""
+    numeric = chunk.select_dtypes(include=[np.number, 'bool']).columns
+    return pd.util.hash_pandas_object(chunk.astype({col: np.float64 for col in numeric}), index=False).to_numpy()
+
+
+def _merge_dtype(previous, current):
+    # Chunk berbeda bisa menghasilkan dtype berbeda (mis. int lalu float karena NaN)
+    if previous is None or previous == current:
+        return current
+    previous_dtype, current_dtype = pd.api.types.pandas_dtype(previous), pd.api.types.pandas_dtype(current)
+    if pd.api.types.is_numeric_dtype(previous_dtype) and pd.api.types.is_numeric_dtype(current_dtype):
+        return str(np.result_type(previous, current))
+    return 'object'
+
+
+def profile_chunks(chunks):
+    """Profil data dari iterator DataFrame; mengembalikan dict laporan (lihat profile_file)."""
+    n_rows = 0
+    dtypes, null_counts, memory_bytes, sketches = {}, {}, {}, {}
+    # Hash baris unik yang sudah terlihat (terurut) dan hash yang muncul lebih dari sekali
+    unique_hashes = np.empty(0, dtype=np.uint64)
+    duplicate_hashes = np.empty(0, dtype=np.uint64)
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        n_rows += len(chunk)
+        chunk_memory = chunk.memory_usage(index=False, deep=True)
+        for col in columns:
+            dtypes[col] = _merge_dtype(dtypes.get(col), str(chunk[col].dtype))
+            null_counts[col] = null_counts.get(col, 0) + int(chunk[col].isna().sum())
+            memory_bytes[col] = memory_bytes.get(col, 0) + int(chunk_memory[col])
+            sketches.setdefault(col, HyperLogLog()).update(chunk[col])
+        chunk_hashes, counts = np.unique(row_hashes(chunk), return_counts=True)
+        repeated = np.union1d(chunk_hashes[counts > 1], np.intersect1d(chunk_hashes, unique_hashes))
+        duplicate_hashes = np.union1d(duplicate_hashes, repeated)
+        unique_hashes = np.union1d(unique_hashes, chunk_hashes)
+
+    columns = columns or []
+    column_report = pd.DataFrame({
+        'dtype': [dtypes[col] for col in columns],
+        'non_null': [n_rows - null_counts[col] for col in columns],
+        'nulls': [null_counts[col] for col in columns],
+        'null_pct': [100.0 * null_counts[col] / n_rows if n_rows else 0.0 for col in columns],
+        'memory_mb': [memory_bytes[col] / 2 ** 20 for col in columns],
+        'approx_distinct': [int(round(sketches[col].estimate())) for col in columns],
+    }, index=pd.Index(columns, name='column'))
+    return {
+        'format_version': REPORT_FORMAT_VERSION,
+        'n_rows': n_rows,
+        'n_columns': len(columns),
+        'memory_bytes': int(sum(memory_bytes.values())),
+        'duplicate_rows': int(n_rows - unique_hashes.size),
+        'duplicate_hashes': duplicate_hashes,
+        'columns': column_report,
+    }
+
+
+def duplicate_examples(path, duplicate_hashes, chunksize=DEFAULT_CHUNKSIZE, max_rows=5):
+    """Baris duplikat (kemunculan kedua dst.) untuk ditampilkan; berhenti setelah max_rows baris."""
+    if len(duplicate_hashes) == 0 or max_rows <= 0:
+        return pd.DataFrame()
+    seen, examples = set(), []
+    for chunk in iter_listing_chunks(path, chunksize):
+        hashes = row_hashes(chunk)
+        for position in np.flatnonzero(np.isin(hashes, duplicate_hashes)):
+            if hashes[position] in seen:
+                examples.append(chunk.iloc[position])
+                if len(examples) >= max_rows:
+                    return pd.DataFrame(examples)
+            seen.add(hashes[position])
+    return pd.DataFrame(examples)
+
+
+def profile_file(path, chunksize=DEFAULT_CHUNKSIZE, max_duplicate_examples=5):
+    """Profil streaming file listing CSV/Parquet tanpa memuat seluruh isinya ke memori."""
+    report = profile_chunks(iter_listing_chunks(path, chunksize))
+    report['duplicate_examples'] = duplicate_examples(path, report['duplicate_hashes'], chunksize,
+                                                      max_duplicate_examples)
+    return report
+
+
+def _profile_cached(file_sha256, path, chunksize, format_version):
+    # file_sha256 dan format_version hanya menjadi kunci cache; isi dibaca dari path
+    return profile_file(path, chunksize)
+
+
+def load_quality_report(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE, cache_dir=CACHE_DIR):
+    """Laporan kualitas data untuk path; dihitung sekali per hash isi file dan di-cache di disk."""
+    memory = joblib.Memory(cache_dir, verbose=0)
+    cached = memory.cache(_profile_cached, ignore=['path'])
+    return cached(cached_file_sha256(path), path, chunksize, REPORT_FORMAT_VERSION)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laporan kualitas data streaming untuk file listing CSV/Parquet.")
+    parser.add_argument('input', nargs='?', default=DATA_PATH)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    report = load_quality_report(args.input, chunksize=args.chunksize)
+    print(f"{report['n_rows']} baris, {report['n_columns']} kolom, "
+          f"{report['memory_bytes'] / 2 ** 20:.1f} MB di memori, {report['duplicate_rows']} baris duplikat")
+    print(report['columns'].to_string(float_format=lambda v: f'{v:,.2f}'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# eda_aggregates.py
+# Agregat kecil untuk grafik halaman EDA: statistik deskriptif, bin histogram + KDE harga di
+# grid tetap, kuantil boxplot per kota, hitungan kategori, dan matriks korelasi. Semuanya
+# dihitung sekali per hash data (cache joblib di .cache/), sehingga waktu render halaman
+# tidak bergantung pada jumlah listing.
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import source_sha256
+from feature_engineering import get_prepared_df
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+CACHE_DIR = '.cache'
+
+HIST_BINS = 50
+KDE_GRID_POINTS = 512
+BOX_GROUP_COLUMN = 'city'
+COUNT_COLUMN = 'house_age_category'
+PRICE_COLUMN = 'price_in_rp'
+
+
+def histogram_with_kde(values, bins=HIST_BINS, grid_points=KDE_GRID_POINTS):
+    """Bin histogram + KDE Gaussian (bandwidth Scott) yang dievaluasi di grid tetap.
+
+    KDE dihitung dari histogram halus berisi `grid_points` bin yang dikonvolusi dengan
+    kernel Gaussian (binned KDE), jadi biayanya O(n) sekali bacaan data. Kurva KDE
+    diskalakan ke satuan jumlah per bin histogram agar bisa digambar di sumbu yang sama.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    hist = pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+    if values.size < 2 or edges[-1] == edges[0]:
+        return hist, pd.DataFrame({'x': [], 'count': []})
+
+    fine_counts, fine_edges = np.histogram(values, bins=grid_points, range=(edges[0], edges[-1]))
+    step = fine_edges[1] - fine_edges[0]
+    bandwidth = values.std(ddof=1) * values.size ** (-1 / 5)
+    sigma_bins = max(bandwidth / step, 1e-3)
+    half_width = int(np.ceil(4 * sigma_bins))
+    kernel = np.exp(-0.5 * (np.arange(-half_width, half_width + 1) / sigma_bins) ** 2)
+    kernel /= kernel.sum()
+    smoothed = np.convolve(fine_counts, kernel)[half_width:half_width + grid_points]
+    # smoothed berisi jumlah per bin halus -> skala ke lebar bin histogram
+    kde = pd.DataFrame({
+        'x': (fine_edges[:-1] + fine_edges[1:]) / 2,
+        'count': smoothed * (edges[1] - edges[0]) / step,
+    })
+    return hist, kde
+
+
+def box_stats(df, group_col, value_col):
+    """Kuantil boxplot per grup (aturan whisker 1.5 IQR seperti seaborn) + jumlah outlier."""
+    grouped = df.groupby(group_col, observed=True)[value_col]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    lower_fence = df[group_col].map(stats['q1'] - 1.5 * iqr).astype(float)
+    upper_fence = df[group_col].map(stats['q3'] + 1.5 * iqr).astype(float)
+    inside = (df[value_col] >= lower_fence) & (df[value_col] <= upper_fence)
+    within = df.loc[inside].groupby(group_col, observed=True)[value_col]
+    stats['whisker_low'] = within.min()
+    stats['whisker_high'] = within.max()
+    stats['n'] = grouped.count()
+    stats['n_outliers'] = stats['n'] - within.count().reindex(stats.index, fill_value=0)
+    stats.index = stats.index.astype(str)
+    stats.index.name = group_col
+    return stats.reset_index()
+
+
+def compute_eda_aggregates(df):
+    hist, kde = histogram_with_kde(df[PRICE_COLUMN])
+    counts = df[COUNT_COLUMN].astype(str).value_counts().rename_axis(COUNT_COLUMN).reset_index(name='count')
+    return {
+        'n_rows': int(len(df)),
+        'describe_numeric': df.describe(),
+        'describe_categorical': df.describe(include=['object', 'category']),
+        'price_histogram': hist,
+        'price_kde': kde,
+        'price_box_by_city': box_stats(df, BOX_GROUP_COLUMN, PRICE_COLUMN),
+        'age_category_counts': counts,
+        'correlation': df.corr(numeric_only=True),
+    }
+
+
+def _eda_aggregates(data_sha256, data_path):
+    # data_sha256 hanya menjadi kunci cache; isi data dibaca dari data_path
+    return compute_eda_aggregates(get_prepared_df(data_path))
+
+
+def load_eda_aggregates(data_path=DATA_PATH, cache_dir=CACHE_DIR):
+    """Agregat EDA untuk data_path; dihitung sekali per hash data dan di-cache di disk."""
+    memory = joblib.Memory(cache_dir, verbose=0)
+    cached = memory.cache(_eda_aggregates, ignore=['data_path'])
+    return cached(source_sha256(data_path), data_path)
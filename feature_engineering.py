@@ -0,0 +1,87 @@
+# feature_engineering.py
+# Penanganan missing values dan feature engineering (notebook cell 10 & 11) yang
+# dipakai bersama oleh notebook, halaman Streamlit, dan prediction.py.
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_access import load_listings, source_sha256
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+
+AGE_CATEGORY_BINS = [-np.inf, 2, 10, np.inf]
+AGE_CATEGORY_LABELS = ['baru', 'sedang', 'lama']
+ROOM_COLUMNS = ['bedrooms', 'bathrooms', 'maid_bedrooms', 'maid_bathrooms']
+
+
+def impute_missing(df):
+    """Isi missing values: median untuk kolom numerik, modus (atau 'Unknown') untuk kolom kategorikal."""
+    df = df.copy()
+    num_cols = df.select_dtypes(include=[np.number]).columns
+    df[num_cols] = df[num_cols].fillna(df[num_cols].median())
+    cat_cols = df.select_dtypes(include=['object', 'category']).columns
+    modes = {col: (m[0] if not (m := df[col].mode()).empty else 'Unknown') for col in cat_cols}
+    for col in cat_cols:
+        # Kolom category (dari data_access) harus mengenal nilai pengisi lebih dulu
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and modes[col] not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories([modes[col]])
+    df[cat_cols] = df[cat_cols].fillna(modes)
+    return df
+
+
+def price_per_m2(df):
+    return df['price_in_rp'] / df['land_size_m2']
+
+
+def total_rooms(df):
+    return df[ROOM_COLUMNS[0]] + df[ROOM_COLUMNS[1]] + df[ROOM_COLUMNS[2]] + df[ROOM_COLUMNS[3]]
+
+
+def house_age_category(building_age):
+    """'baru' (<= 2 tahun), 'sedang' (<= 10 tahun), 'lama' (> 10 tahun), 'unknown' jika kosong."""
+    categories = pd.cut(building_age, bins=AGE_CATEGORY_BINS, labels=AGE_CATEGORY_LABELS)
+    return pd.Series(categories, index=building_age.index).astype(object).fillna('unknown')
+
+
+def add_engineered_features(df):
+    df = df.copy()
+    df['price_per_m2'] = price_per_m2(df)
+    df['total_rooms'] = total_rooms(df)
+    df['house_age_category'] = house_age_category(df['building_age'])
+    return df
+
+
+def prepare_dataframe(df):
+    """Data mentah -> data siap analisis/modeling (imputasi + fitur hasil rekayasa)."""
+    return add_engineered_features(impute_missing(df))
+
+
+# Cache satu frame hasil persiapan untuk seluruh proses (dipakai bersama oleh semua halaman)
+_prepared_cache = {}
+_prepared_lock = threading.Lock()
+
+
+def get_prepared_df(path=DATA_PATH):
+    """Frame hasil prepare_dataframe(path), dibaca dan dihitung sekali per versi file.
+
+    Data dibaca dari cache kolumnar (data_access.load_listings). Kunci cache adalah
+    mtime/ukuran file dan hash isinya: jika mtime berubah tetapi isi file sama,
+    frame lama tetap dipakai. Frame yang dikembalikan dipakai bersama, jadi jangan
+    diubah di tempat (gunakan .copy() / .assign()).
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    with _prepared_lock:
+        entry = _prepared_cache.get(path)
+        if entry is not None and entry['stat'] == stat_key:
+            return entry['df']
+        digest = source_sha256(path)
+        if entry is None or entry['sha256'] != digest:
+            entry = {'sha256': digest, 'df': prepare_dataframe(load_listings(path))}
+        entry['stat'] = stat_key
+        _prepared_cache[path] = entry
+        return entry['df']
+
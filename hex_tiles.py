@@ -0,0 +1,264 @@
+# hex_tiles.py
+# Agregasi listing ke sel heksagonal multi-resolusi untuk peta harga/klaster. Setiap resolusi
+# adalah grid heksagon di proyeksi equirectangular lokal Jabodetabek (ukuran sel 16 km sampai
+# 250 m); per sel disimpan jumlah listing, median price_in_rp, median price_per_m2, klaster
+# dominan, dan titik tengah sel. Halaman peta hanya mengirim sel yang ada di viewport pada
+# resolusi yang sesuai zoom, sehingga jumlah elemen yang digambar dibatasi beberapa ribu sel,
+# bukan satu titik per listing.
+#
+# Tile dibangun ulang secara inkremental: hash per baris (koordinat, harga, klaster) dibandingkan
+# dengan build sebelumnya, dan hanya sel yang kehilangan atau mendapat baris yang dihitung ulang.
+# Tile disimpan di .cache/hex_tiles.pkl (turunan data + model, tidak di-commit).
+#
+# Contoh:
+#   python hex_tiles.py
+#   python hex_tiles.py --resolutions 0 1 2 3 4 5 6
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import cached_file_sha256, source_sha256
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+PREPROCESSOR_PATH = 'preprocessor.pkl'
+KMEANS_MODEL_PATH = 'kmeans_cluster_model.pkl'
+HEX_TILES_PATH = os.path.join('.cache', 'hex_tiles.pkl')
+# Naikkan jika isi artefak berubah agar tile lama dibangun ulang penuh
+TILES_FORMAT_VERSION = 1
+
+# Jari-jari heksagon (km) per resolusi; setiap resolusi dua kali lebih halus dari sebelumnya
+HEX_SIZE_KM = {0: 16.0, 1: 8.0, 2: 4.0, 3: 2.0, 4: 1.0, 5: 0.5, 6: 0.25}
+# Lintang acuan proyeksi (tengah Jabodetabek); jarak timur-barat dikoreksi dengan cos(lintang)
+REFERENCE_LAT = -6.3
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LONG = 111.320 * np.cos(np.radians(REFERENCE_LAT))
+# Batas kasar wilayah; koordinat di luar kotak ini dianggap salah input dan tidak dipetakan
+VALID_BOUNDS = {'lat_min': -7.5, 'lat_max': -5.5, 'long_min': 105.8, 'long_max': 107.8}
+MAX_CELLS = 5000
+TILE_COLUMNS = ['q', 'r', 'lat', 'long', 'count', 'median_price_in_rp', 'median_price_per_m2',
+                'dominant_cluster', 'dominant_cluster_share']
+
+
+def hex_cells(lat, long, size_km):
+    """Koordinat axial (q, r) heksagon pointy-top berjari-jari size_km untuk setiap titik."""
+    x = np.asarray(long, dtype=np.float64) * KM_PER_DEG_LONG / size_km
+    y = np.asarray(lat, dtype=np.float64) * KM_PER_DEG_LAT / size_km
+    q = np.sqrt(3) / 3 * x - y / 3
+    r = 2 / 3 * y
+    # Pembulatan koordinat kubus (q, r, s) ke heksagon terdekat
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_centers(q, r, size_km):
+    """(lat, long) titik tengah sel (q, r)."""
+    q, r = np.asarray(q, dtype=np.float64), np.asarray(r, dtype=np.float64)
+    x = size_km * np.sqrt(3) * (q + r / 2)
+    y = size_km * 1.5 * r
+    return y / KM_PER_DEG_LAT, x / KM_PER_DEG_LONG
+
+
+def hex_polygons(q, r, size_km):
+    """Daftar poligon [[long, lat], ...] (6 titik sudut) per sel, untuk digambar di peta."""
+    lat, long = hex_centers(q, r, size_km)
+    angles = np.radians(60 * np.arange(6) - 30)
+    corner_long = long[:, None] + size_km * np.cos(angles)[None, :] / KM_PER_DEG_LONG
+    corner_lat = lat[:, None] + size_km * np.sin(angles)[None, :] / KM_PER_DEG_LAT
+    return np.stack([corner_long, corner_lat], axis=-1).tolist()
+
+
+def cell_keys(q, r):
+    # (q, r) dipadatkan menjadi satu int64 agar bisa dibandingkan dengan np.isin
+    return (np.asarray(q, dtype=np.int64) << 32) | (np.asarray(r, dtype=np.int64) & 0xFFFFFFFF)
+
+
+def listing_points(df, cluster_labels=None):
+    """Frame titik (lat, long, price_in_rp, price_per_m2, cluster) dengan koordinat valid saja."""
+    points = pd.DataFrame({
+        'lat': pd.to_numeric(df['lat'], errors='coerce').to_numpy(np.float64),
+        'long': pd.to_numeric(df['long'], errors='coerce').to_numpy(np.float64),
+        'price_in_rp': pd.to_numeric(df['price_in_rp'], errors='coerce').to_numpy(np.float64),
+        'price_per_m2': pd.to_numeric(df['price_per_m2'], errors='coerce').to_numpy(np.float64),
+        'cluster': (np.asarray(cluster_labels, dtype=np.int64) if cluster_labels is not None
+                    else np.full(len(df), -1, dtype=np.int64)),
+    })
+    valid = (points['lat'].between(VALID_BOUNDS['lat_min'], VALID_BOUNDS['lat_max'])
+             & points['long'].between(VALID_BOUNDS['long_min'], VALID_BOUNDS['long_max']))
+    return points[valid].reset_index(drop=True)
+
+
+def point_hashes(points):
+    """Hash per baris; baris identik dibedakan dengan nomor kemunculannya, sehingga listing
+    duplikat yang ditambahkan tetap terdeteksi sebagai baris baru."""
+    base = pd.util.hash_pandas_object(points, index=False).to_numpy()
+    occurrence = pd.Series(base).groupby(base).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({'hash': base, 'occurrence': occurrence}), index=False).to_numpy()
+
+
+def aggregate_cells(points, resolution):
+    """Tile satu resolusi dari titik-titik: satu baris per sel (index = kunci sel)."""
+    size_km = HEX_SIZE_KM[resolution]
+    q, r = hex_cells(points['lat'], points['long'], size_km)
+    frame = points.assign(key=cell_keys(q, r), q=q, r=r)
+    grouped = frame.groupby('key')
+    tiles = grouped.agg(q=('q', 'first'), r=('r', 'first'), count=('lat', 'size'),
+                        median_price_in_rp=('price_in_rp', 'median'),
+                        median_price_per_m2=('price_per_m2', 'median'))
+    cluster_counts = frame.groupby(['key', 'cluster']).size().rename('n').reset_index()
+    dominant = cluster_counts.sort_values(['key', 'n', 'cluster'], ascending=[True, False, True]) \
+        .drop_duplicates('key').set_index('key')
+    tiles['dominant_cluster'] = dominant['cluster']
+    tiles['dominant_cluster_share'] = dominant['n'] / tiles['count']
+    tiles['lat'], tiles['long'] = hex_centers(tiles['q'].to_numpy(), tiles['r'].to_numpy(), size_km)
+    return tiles[TILE_COLUMNS]
+
+
+def build_tiles(points, resolutions=tuple(HEX_SIZE_KM)):
+    return {
+        'format_version': TILES_FORMAT_VERSION,
+        'resolutions': {res: aggregate_cells(points, res) for res in resolutions},
+        'hashes': point_hashes(points),
+        'points_latlong': points[['lat', 'long']].to_numpy(np.float64),
+    }
+
+
+def update_tiles(previous, points):
+    """Tile baru dari `previous` dengan menghitung ulang hanya sel yang isinya berubah.
+
+    Baris dibandingkan lewat hash (lat, long, harga, price_per_m2, klaster): sel yang memuat baris
+    yang hilang (dari koordinat build sebelumnya) atau baris baru dihitung ulang dari semua titik
+    di sel itu; sel lain dipakai apa adanya. Mengembalikan (tiles, jumlah sel yang dihitung ulang).
+    """
+    hashes = point_hashes(points)
+    added = ~np.isin(hashes, previous['hashes'])
+    removed = ~np.isin(previous['hashes'], hashes)
+    removed_latlong = previous['points_latlong'][removed]
+    resolutions, n_recomputed = {}, 0
+    for res, old_tiles in previous['resolutions'].items():
+        size_km = HEX_SIZE_KM[res]
+        q, r = hex_cells(points['lat'], points['long'], size_km)
+        keys = cell_keys(q, r)
+        affected = np.union1d(keys[added], cell_keys(*hex_cells(removed_latlong[:, 0], removed_latlong[:, 1], size_km)))
+        if affected.size == 0:
+            resolutions[res] = old_tiles
+            continue
+        in_affected = np.isin(keys, affected)
+        recomputed = aggregate_cells(points[in_affected], res) if in_affected.any() else old_tiles.iloc[:0]
+        n_recomputed += len(recomputed)
+        # Sel yang kini kosong (semua barisnya hilang) ikut terbuang karena termasuk `affected`
+        resolutions[res] = pd.concat([old_tiles[~old_tiles.index.isin(affected)], recomputed]).sort_index()
+    tiles = {
+        'format_version': TILES_FORMAT_VERSION,
+        'resolutions': resolutions,
+        'hashes': hashes,
+        'points_latlong': points[['lat', 'long']].to_numpy(np.float64),
+    }
+    return tiles, n_recomputed
+
+
+def resolution_for_zoom(zoom, resolutions=tuple(HEX_SIZE_KM)):
+    """Resolusi untuk zoom peta web (Mercator): zoom 9 -> sel 16 km, setiap zoom +1 -> sel separuhnya."""
+    index = int(np.clip(round(zoom) - 9, 0, len(resolutions) - 1))
+    return sorted(resolutions)[index]
+
+
+def cells_in_view(tiles, zoom, lat_min, lat_max, long_min, long_max, max_cells=MAX_CELLS):
+    """(resolusi, sel) untuk viewport: resolusi sesuai zoom, turun ke resolusi lebih kasar jika
+    sel di viewport melebihi max_cells. Sel yang sebagian masuk viewport tetap disertakan."""
+    available = sorted(tiles['resolutions'])
+    resolution = resolution_for_zoom(zoom, available)
+    for res in reversed([r for r in available if r <= resolution]):
+        cells = tiles['resolutions'][res]
+        lat_margin = HEX_SIZE_KM[res] / KM_PER_DEG_LAT
+        long_margin = HEX_SIZE_KM[res] / KM_PER_DEG_LONG
+        in_view = cells[cells['lat'].between(lat_min - lat_margin, lat_max + lat_margin)
+                        & cells['long'].between(long_min - long_margin, long_max + long_margin)]
+        if len(in_view) <= max_cells:
+            return res, in_view
+    return res, in_view.nlargest(max_cells, 'count')
+
+
+def tile_source_hashes(data_path=DATA_PATH, preprocessor_path=PREPROCESSOR_PATH, kmeans_model_path=KMEANS_MODEL_PATH):
+    """Hash data dan model klaster (kunci sama dengan cluster_summary.artifact_hashes). File model
+    hanya di-hash ulang jika mtime/ukurannya berubah, jadi murah dipanggil di setiap rerun halaman."""
+    hashes = {'data_sha256': source_sha256(data_path)}
+    try:
+        hashes.update(preprocessor_sha256=cached_file_sha256(preprocessor_path),
+                      model_sha256=cached_file_sha256(kmeans_model_path))
+    except FileNotFoundError:
+        pass  # Tanpa model klaster: tile hanya berisi harga
+    return hashes
+
+
+def _current_points(data_path, preprocessor_path, kmeans_model_path, with_clusters):
+    from feature_engineering import get_prepared_df
+
+    labels = None
+    if with_clusters:
+        from cluster_summary import load_cluster_summary
+        labels = load_cluster_summary(data_path, preprocessor_path, kmeans_model_path)['labels']
+    return listing_points(get_prepared_df(data_path), labels)
+
+
+def load_hex_tiles(data_path=DATA_PATH, preprocessor_path=PREPROCESSOR_PATH, kmeans_model_path=KMEANS_MODEL_PATH,
+                   tiles_path=HEX_TILES_PATH, resolutions=tuple(HEX_SIZE_KM)):
+    """Muat tile; jika data atau model klaster berubah, perbarui secara inkremental dan simpan."""
+    source = tile_source_hashes(data_path, preprocessor_path, kmeans_model_path)
+    try:
+        tiles = joblib.load(tiles_path)
+    except (FileNotFoundError, EOFError, ValueError):
+        tiles = None
+    compatible = tiles is not None and tiles.get('format_version') == TILES_FORMAT_VERSION \
+        and sorted(tiles['resolutions']) == sorted(resolutions)
+    if compatible and tiles.get('source') == source:
+        return tiles
+
+    start = time.perf_counter()
+    points = _current_points(data_path, preprocessor_path, kmeans_model_path, with_clusters='model_sha256' in source)
+    if compatible:
+        tiles, n_recomputed = update_tiles(tiles, points)
+    else:
+        tiles = build_tiles(points, resolutions)
+        n_recomputed = sum(len(cells) for cells in tiles['resolutions'].values())
+    tiles['source'] = source
+    tiles['build'] = {'n_points': len(points), 'n_recomputed_cells': n_recomputed,
+                      'seconds': time.perf_counter() - start}
+    try:
+        os.makedirs(os.path.dirname(tiles_path) or '.', exist_ok=True)
+        joblib.dump(tiles, tiles_path)
+    except OSError:
+        pass  # Direktori read-only: tetap pakai hasil hitung ulang di memori
+    return tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun tile heksagon multi-resolusi untuk peta harga/klaster.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--model', default=KMEANS_MODEL_PATH)
+    parser.add_argument('--output', default=HEX_TILES_PATH)
+    parser.add_argument('--resolutions', type=int, nargs='+', default=list(HEX_SIZE_KM), choices=list(HEX_SIZE_KM))
+    args = parser.parse_args(argv)
+
+    tiles = load_hex_tiles(args.data, args.preprocessor, args.model, args.output, tuple(args.resolutions))
+    build = tiles.get('build', {})
+    if build:
+        print(f"{build['n_points']} listing, {build['n_recomputed_cells']} sel dihitung ulang "
+              f"dalam {build['seconds']:.2f} s")
+    for res, cells in sorted(tiles['resolutions'].items()):
+        print(f"resolusi {res} ({HEX_SIZE_KM[res]:g} km): {len(cells)} sel")
+    print(f"Tile disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
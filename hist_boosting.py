@@ -0,0 +1,69 @@
+# hist_boosting.py
+# Model HistGradientBoostingRegressor dengan kategori native: kolom kategorikal (district, city,
+# certificate, furnishing, ...) di-encode ordinal dan dipakai langsung oleh pohon, bukan lewat
+# ~10 ribu kolom one-hot. Fitur di-bin ke histogram (maks. 255 bin) sehingga biaya split
+# tidak bergantung pada jumlah baris, pelatihan memakai semua core (OpenMP), dan jumlah
+# iterasi ditentukan early stopping.
+#
+# Model disimpan sebagai satu Pipeline (encoder + regressor) di best_model.pkl. Pipeline ini
+# menerima frame fitur mentah dari prediction.build_feature_frame, bukan output preprocessor.pkl;
+# prediction.predict_batch mengenalinya lewat uses_feature_frame().
+#
+# Contoh:
+#   python training.py --models "Hist Gradient Boosting" "Gradient Boosting"
+from preprocessing import CAT_FEATURES, NUM_FEATURES, RARE_CAT_FEATURES
+
+# Nama langkah encoder di Pipeline; dipakai sebagai penanda model yang menerima frame fitur
+ENCODER_STEP = 'native_encode'
+MODEL_STEP = 'model'
+NATIVE_CAT_FEATURES = CAT_FEATURES + RARE_CAT_FEATURES
+# Kategori native dibatasi jumlah bin HGB (255, satu bin untuk missing); distrik yang lebih
+# jarang digabung menjadi satu kategori 'infrequent'
+MAX_CATEGORIES = 254
+
+# Grid tuning (nama parameter mengikuti langkah Pipeline)
+PARAM_GRID = {
+    f'{MODEL_STEP}__learning_rate': [0.05, 0.1, 0.2],
+    f'{MODEL_STEP}__max_leaf_nodes': [15, 31, 63],
+    f'{MODEL_STEP}__l2_regularization': [0.0, 1.0],
+}
+
+
+def uses_feature_frame(model):
+    """True jika model menerima frame fitur mentah (Pipeline dari make_hist_boosting)."""
+    return ENCODER_STEP in getattr(model, 'named_steps', {})
+
+
+def build_native_encoder(max_categories=MAX_CATEGORIES):
+    """ColumnTransformer dense: kolom numerik apa adanya (NaN ditangani HGB), lalu kode ordinal
+    kolom kategorikal. Kategori yang tidak dikenal saat predict menjadi NaN (missing)."""
+    import numpy as np
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OrdinalEncoder
+
+    encoder = OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan,
+                             encoded_missing_value=np.nan, max_categories=max_categories)
+    return ColumnTransformer([
+        ('num', 'passthrough', NUM_FEATURES),
+        ('cat', encoder, NATIVE_CAT_FEATURES),
+    ], remainder='drop', sparse_threshold=0.0)
+
+
+def make_hist_boosting(random_state=42, max_iter=1000, early_stopping=True, n_iter_no_change=20,
+                       validation_fraction=0.1, **params):
+    """Pipeline encoder + HistGradientBoostingRegressor dengan kolom kategorikal native.
+
+    max_iter adalah batas atas; dengan early_stopping pelatihan berhenti setelah skor validasi
+    (validation_fraction dari data training) tidak membaik selama n_iter_no_change iterasi.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.pipeline import Pipeline
+
+    n_num = len(NUM_FEATURES)
+    regressor = HistGradientBoostingRegressor(
+        categorical_features=list(range(n_num, n_num + len(NATIVE_CAT_FEATURES))),
+        max_iter=max_iter, early_stopping=early_stopping, n_iter_no_change=n_iter_no_change,
+        validation_fraction=validation_fraction, random_state=random_state,
+    )
+    pipeline = Pipeline([(ENCODER_STEP, build_native_encoder()), (MODEL_STEP, regressor)])
+    return pipeline.set_params(**params)
@@ -0,0 +1,79 @@
+# import_report.py
+# Laporan waktu import per halaman Streamlit: import tingkat-modul setiap halaman dijalankan
+# di interpreter baru dengan `python -X importtime`, lalu dilaporkan total waktunya dan paket
+# teratas yang paling mahal. Dipakai untuk menjaga cold start container tetap cepat
+# (library plotting/ML sebaiknya diimpor di jalur yang benar-benar merender/memprediksi).
+#
+# Contoh:
+#   python import_report.py
+#   python import_report.py pages/08_House_Price_Prediction.py --top 10
+#   python import_report.py --json import_report.json
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_FILES = ['Dashboard.py'] + sorted(
+    os.path.relpath(path, APP_DIR) for path in glob.glob(os.path.join(APP_DIR, 'pages', '*.py')))
+_MARKER = '--page-imports--'
+
+
+def module_level_imports(page):
+    """Kode sumber semua pernyataan import tingkat-modul di file halaman."""
+    with open(os.path.join(APP_DIR, page), encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=page)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _parse_importtime(stderr):
+    # Format baris: "import time: <self us> | <cumulative us> | <indentasi 2 spasi per level><paket>"
+    lines = stderr.split(_MARKER, 1)[-1].splitlines()
+    packages = []
+    for line in lines:
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        if not name.startswith(' '):  # Hanya paket yang diimpor langsung oleh halaman (level 0)
+            packages.append((name.strip(), int(cumulative) / 1000))
+    return packages
+
+
+def page_import_report(page, python=sys.executable):
+    """Waktu import (ms) halaman `page` dalam interpreter baru, total dan per paket tingkat atas."""
+    statements = module_level_imports(page)
+    code = '\n'.join([f'import sys; sys.stderr.write({_MARKER!r} + "\\n"); sys.stderr.flush()', *statements])
+    proc = subprocess.run([python, '-X', 'importtime', '-c', code], capture_output=True, text=True, cwd=APP_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import {page} gagal:\n{proc.stderr[-2000:]}")
+    packages = sorted(_parse_importtime(proc.stderr), key=lambda p: p[1], reverse=True)
+    return {
+        'page': page,
+        'total_ms': sum(ms for _, ms in packages),
+        'packages': [{'package': name, 'cumulative_ms': ms} for name, ms in packages],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laporan waktu import tingkat-modul per halaman Streamlit.")
+    parser.add_argument('pages', nargs='*', default=PAGE_FILES)
+    parser.add_argument('--top', type=int, default=5, help="Jumlah paket termahal yang ditampilkan per halaman")
+    parser.add_argument('--json', help="Simpan laporan lengkap ke file JSON")
+    args = parser.parse_args(argv)
+
+    reports = [page_import_report(page) for page in args.pages]
+    for report in reports:
+        heaviest = ', '.join(f"{p['package']} {p['cumulative_ms']:.0f} ms" for p in report['packages'][:args.top])
+        print(f"{report['page']:<45} {report['total_ms']:>8.0f} ms  {heaviest}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Laporan disimpan ke {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+# incremental.py
+# Mode update inkremental (online): listing baru diproses tanpa fit ulang penuh.
+# - Statistik imputasi (median via reservoir sample, modus via hitungan) dan momen scaler
+#   diperbarui berjalan
+# - Kosakata kategori bertambah di slot yang sudah dicadangkan, sehingga lebar output
+#   preprocessor (dan ukuran koefisien model) tetap
+# - SGDRegressor dan MiniBatchKMeans diperbarui dengan partial_fit hanya pada baris baru
+# - Setiap update menulis satu versi baru: artifacts/incremental/v0001/{preprocessor,best_model,
+#   kmeans_cluster_model}.pkl + metadata.json; file LATEST menunjuk versi terbaru
+#
+# Contoh:
+#   python incremental.py jabodetabek_house_price.csv      # versi awal dari data yang ada
+#   python incremental.py listing_baru_2026-10-18.csv      # update harian
+#   python incremental.py listing_baru.csv --publish       # daftarkan + aktifkan di registry model
+#
+# --publish tidak menimpa preprocessor.pkl / best_model.pkl / kmeans_cluster_model.pkl: versi
+# inkremental didaftarkan di registry (model_registry.py) dan dijadikan ACTIVE, sehingga
+# model_server dan halaman prediksi beralih tanpa restart, versinya tercatat (halaman Modeling
+# menampilkannya), dan `python model_registry.py activate N` mengembalikan versi sebelumnya.
+import argparse
+import collections
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from feature_engineering import add_engineered_features
+from preprocessing import (ALL_X_COLUMNS, CAT_FEATURES, NUM_FEATURES, RARE_CAT_FEATURES, TEXT_FEATURES,
+                           TEXT_HASH_FEATURES)
+from data_access import source_sha256
+from model_registry import REGISTRY_DIR, activate, register
+from training import regression_metrics
+
+ARTIFACT_DIR = os.path.join('artifacts', 'incremental')
+LATEST_FILE = 'LATEST'
+APP_ARTIFACT_PATHS = {
+    'preprocessor': 'preprocessor.pkl',
+    'model': 'best_model.pkl',
+    'kmeans': 'kmeans_cluster_model.pkl',
+}
+N_CLUSTERS = 3
+RANDOM_STATE = 42
+
+# Jumlah slot one-hot per kolom kategorikal; slot terakhir menampung kategori di luar kosakata
+DEFAULT_CATEGORY_SLOTS = {col: 32 for col in CAT_FEATURES}
+DEFAULT_CATEGORY_SLOTS['district'] = 1024
+
+# Fitur hasil rekayasa dihitung dari kolom mentah setelah imputasi
+ENGINEERED_FEATURES = ['price_per_m2', 'total_rooms', 'house_age_category']
+
+
+class RunningImputer:
+    """Nilai pengisi missing values yang diperbarui per batch.
+
+    Median numerik dihitung dari reservoir sample berukuran tetap (perkiraan median seluruh
+    data yang pernah dilihat); modus kategorikal dari hitungan kumulatif.
+    """
+
+    def __init__(self, num_cols, cat_cols, reservoir_size=10000, random_state=RANDOM_STATE):
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.reservoir_size = reservoir_size
+        self.reservoirs = {col: np.empty(0) for col in self.num_cols}
+        self.n_seen = {col: 0 for col in self.num_cols}
+        self.counts = {col: collections.Counter() for col in self.cat_cols}
+        self._rng = np.random.default_rng(random_state)
+
+    def _update_reservoir(self, col, values):
+        reservoir, n_seen = self.reservoirs[col], self.n_seen[col]
+        room = max(self.reservoir_size - reservoir.size, 0)
+        reservoir = np.concatenate([reservoir, values[:room]])
+        rest = values[room:]
+        if rest.size:
+            # Algorithm R: elemen ke-i menggantikan posisi acak dengan peluang size / (i + 1)
+            positions = self._rng.integers(0, n_seen + room + np.arange(1, rest.size + 1))
+            keep = positions < self.reservoir_size
+            reservoir[positions[keep]] = rest[keep]
+        self.reservoirs[col] = reservoir
+        self.n_seen[col] = n_seen + values.size
+
+    def partial_fit(self, df):
+        for col in self.num_cols:
+            if col in df.columns:
+                self._update_reservoir(col, pd.to_numeric(df[col], errors='coerce').dropna().to_numpy(float))
+        for col in self.cat_cols:
+            if col in df.columns:
+                self.counts[col].update(df[col].dropna().astype(str))
+        return self
+
+    def fill_values(self):
+        values = {col: float(np.median(res)) for col, res in self.reservoirs.items() if res.size}
+        values.update({col: (counts.most_common(1)[0][0] if counts else 'Unknown')
+                       for col, counts in self.counts.items()})
+        return values
+
+    def transform(self, df):
+        df = df.copy()
+        for col in self.cat_cols:
+            if col in df.columns:
+                df[col] = df[col].astype(object)
+        return df.fillna({col: v for col, v in self.fill_values().items() if col in df.columns})
+
+
+class IncrementalPreprocessor:
+    """Pengganti ColumnTransformer dari preprocessing.py yang bisa di-partial_fit.
+
+    Output CSR dengan lebar tetap: kolom numerik di-standardisasi, setiap kolom
+    kategorikal mendapat `category_slots[col]` kolom one-hot (kategori baru mengisi slot
+    kosong berikutnya), kolom teks di-hash seperti build_preprocessor. Nilai numerik hasil
+    scaling dipotong ke +-`clip_scaled` agar outlier tidak mendominasi update SGD.
+    """
+
+    def __init__(self, category_slots=None, text_hash_features=None, clip_scaled=3.0):
+        self.clip_scaled = clip_scaled
+        self.category_slots = {**DEFAULT_CATEGORY_SLOTS, **(category_slots or {})}
+        self.cat_columns = CAT_FEATURES + RARE_CAT_FEATURES
+        raw_num = [col for col in NUM_FEATURES if col not in ENGINEERED_FEATURES]
+        raw_cat = [col for col in self.cat_columns if col not in ENGINEERED_FEATURES]
+        self.imputer = RunningImputer(raw_num + ['price_in_rp'], raw_cat)
+        self.scaler = StandardScaler()
+        self.vocabulary = {col: {} for col in self.cat_columns}
+        text_hash_features = {**TEXT_HASH_FEATURES, **(text_hash_features or {})}
+        self.text_vectorizers = {
+            col: HashingVectorizer(n_features=text_hash_features[col], alternate_sign=False)
+            for col in TEXT_FEATURES
+        }
+
+    @property
+    def n_features_out(self):
+        return (len(NUM_FEATURES) + sum(self.category_slots[col] for col in self.cat_columns)
+                + sum(v.n_features for v in self.text_vectorizers.values()))
+
+    def _prepare(self, X):
+        X = self.imputer.transform(X.reindex(columns=ALL_X_COLUMNS))
+        X[NUM_FEATURES] = X[NUM_FEATURES].apply(pd.to_numeric, errors='coerce')
+        for col in self.cat_columns + TEXT_FEATURES:
+            X[col] = X[col].fillna('unknown').astype(str)
+        return X
+
+    def partial_fit(self, X):
+        X = self._prepare(X)
+        self.scaler.partial_fit(X[NUM_FEATURES].to_numpy(float))
+        for col in self.cat_columns:
+            vocab, capacity = self.vocabulary[col], self.category_slots[col] - 1
+            for value in pd.unique(X[col]):
+                if value not in vocab and len(vocab) < capacity:
+                    vocab[value] = len(vocab)
+        return self
+
+    def transform(self, X):
+        X = self._prepare(X)
+        n_rows = len(X)
+        numeric = X[NUM_FEATURES].to_numpy(float)
+        # Nilai numerik yang masih kosong (mis. fitur rekayasa) -> rata-rata, bernilai 0 setelah scaling
+        numeric = np.where(np.isnan(numeric), self.scaler.mean_, numeric)
+        scaled = self.scaler.transform(numeric)
+        if self.clip_scaled is not None:
+            scaled = np.clip(scaled, -self.clip_scaled, self.clip_scaled)
+        blocks = [sparse.csr_matrix(scaled)]
+        for col in self.cat_columns:
+            slots = self.category_slots[col]
+            codes = X[col].map(self.vocabulary[col]).fillna(slots - 1).to_numpy(int)
+            blocks.append(sparse.csr_matrix((np.ones(n_rows), (np.arange(n_rows), codes)), shape=(n_rows, slots)))
+        for col, vectorizer in self.text_vectorizers.items():
+            blocks.append(vectorizer.transform(X[col]))
+        return sparse.hstack(blocks, format='csr')
+
+
+class OnlinePriceRegressor:
+    """SGDRegressor (averaged) pada log(1 + harga); predict mengembalikan harga dalam rupiah.
+
+    Target dikurangi rata-rata log harga batch pertama agar intercept tidak perlu
+    "berjalan" dari 0 ke ~21, dan prediksi dibatasi ke rentang log harga yang pernah dilihat
+    (kesalahan kecil di skala log menjadi sangat besar setelah expm1).
+    """
+
+    def __init__(self, **sgd_params):
+        self.regressor = SGDRegressor(**{'alpha': 1e-4, 'average': True, 'random_state': RANDOM_STATE,
+                                         **sgd_params})
+        self.target_offset = None
+        self.target_range = (np.inf, -np.inf)
+        self._rng = np.random.default_rng(RANDOM_STATE)
+
+    def partial_fit(self, X, y, epochs=5):
+        target = np.log1p(np.asarray(y, dtype=float))
+        if self.target_offset is None:
+            self.target_offset = float(target.mean())
+        self.target_range = (min(self.target_range[0], target.min()), max(self.target_range[1], target.max()))
+        target = target - self.target_offset
+        for _ in range(epochs):
+            order = self._rng.permutation(X.shape[0])
+            self.regressor.partial_fit(X[order], target[order])
+        return self
+
+    def predict(self, X):
+        log_price = self.regressor.predict(X) + self.target_offset
+        return np.expm1(np.clip(log_price, *self.target_range))
+
+
+def prepare_batch(raw, preprocessor, update_statistics=True):
+    """Listing mentah -> (X, y). Dengan update_statistics=True statistik imputasi diperbarui
+    dengan batch ini lebih dulu; False memakai statistik yang ada (evaluasi prequential)."""
+    raw = raw[pd.to_numeric(raw['price_in_rp'], errors='coerce').notna()]
+    if update_statistics:
+        preprocessor.imputer.partial_fit(raw)
+    df = add_engineered_features(preprocessor.imputer.transform(raw))
+    return df.drop(columns='price_in_rp'), df['price_in_rp'].to_numpy(float)
+
+
+def latest_version(artifact_dir=ARTIFACT_DIR):
+    try:
+        with open(os.path.join(artifact_dir, LATEST_FILE)) as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def version_dir(version, artifact_dir=ARTIFACT_DIR):
+    return os.path.join(artifact_dir, f'v{version:04d}')
+
+
+def load_version(version=None, artifact_dir=ARTIFACT_DIR):
+    """Muat (preprocessor, model, kmeans, metadata) untuk versi tertentu (default: terbaru)."""
+    version = latest_version(artifact_dir) if version is None else version
+    if version is None:
+        raise FileNotFoundError(f"Belum ada versi inkremental di {artifact_dir}")
+    path = version_dir(version, artifact_dir)
+    with open(os.path.join(path, 'metadata.json')) as f:
+        metadata = json.load(f)
+    return (joblib.load(os.path.join(path, APP_ARTIFACT_PATHS['preprocessor'])),
+            joblib.load(os.path.join(path, APP_ARTIFACT_PATHS['model'])),
+            joblib.load(os.path.join(path, APP_ARTIFACT_PATHS['kmeans'])),
+            metadata)
+
+
+def save_version(preprocessor, model, kmeans, metadata, artifact_dir=ARTIFACT_DIR):
+    # Versi ditulis ke direktori sementara lalu di-rename, sehingga proses yang crash di tengah
+    # jalan tidak meninggalkan direktori versi setengah jadi yang menghalangi run berikutnya
+    os.makedirs(artifact_dir, exist_ok=True)
+    tmp_dir = os.path.join(artifact_dir, f'.tmp-{os.getpid()}-{time.time_ns()}')
+    os.makedirs(tmp_dir)
+    for key, obj in (('preprocessor', preprocessor), ('model', model), ('kmeans', kmeans)):
+        joblib.dump(obj, os.path.join(tmp_dir, APP_ARTIFACT_PATHS[key]))
+    version = (latest_version(artifact_dir) or 0) + 1
+    while True:
+        with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as f:
+            json.dump({**metadata, 'version': version}, f, indent=2)
+        try:
+            os.rename(tmp_dir, version_dir(version, artifact_dir))
+            break
+        except OSError:
+            # Nomor ini sudah dipakai (mis. sisa run lama yang tidak pernah menjadi LATEST)
+            if not os.path.isdir(version_dir(version, artifact_dir)):
+                raise
+            version += 1
+    # Pointer diganti atomik setelah semua file versi baru selesai ditulis
+    tmp_path = os.path.join(artifact_dir, LATEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(str(version))
+    os.replace(tmp_path, os.path.join(artifact_dir, LATEST_FILE))
+    return version
+
+
+def update(new_listings, artifact_dir=ARTIFACT_DIR, epochs=5):
+    """Perbarui versi terbaru dengan listing baru dan simpan sebagai versi berikutnya.
+
+    Metrik pada metadata dihitung pada batch baru *sebelum* model dan statistik imputasi
+    diperbarui (evaluasi prequential), sehingga menggambarkan performa pada data yang belum dilihat.
+    """
+    parent = latest_version(artifact_dir)
+    if parent is None:
+        preprocessor = IncrementalPreprocessor()
+        model = OnlinePriceRegressor()
+        kmeans = MiniBatchKMeans(n_clusters=N_CLUSTERS, random_state=RANDOM_STATE, n_init=3)
+        n_rows_total = 0
+    else:
+        preprocessor, model, kmeans, parent_metadata = load_version(parent, artifact_dir)
+        n_rows_total = parent_metadata['n_rows_total']
+
+    metrics = None
+    if parent is not None:
+        X_eval, y_eval = prepare_batch(new_listings, preprocessor, update_statistics=False)
+        metrics = regression_metrics(y_eval, model.predict(preprocessor.transform(X_eval)))
+
+    X, y = prepare_batch(new_listings, preprocessor)
+
+    preprocessor.partial_fit(X)
+    X_processed = preprocessor.transform(X)
+    model.partial_fit(X_processed, y, epochs=epochs)
+    kmeans.partial_fit(X_processed)
+
+    metadata = {
+        'parent_version': parent,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'n_rows_batch': int(len(y)),
+        'n_rows_total': int(n_rows_total + len(y)),
+        'n_features_out': int(preprocessor.n_features_out),
+        'vocabulary_sizes': {col: len(v) for col, v in preprocessor.vocabulary.items()},
+        'prequential_metrics': metrics,
+    }
+    version = save_version(preprocessor, model, kmeans, metadata, artifact_dir)
+    return version, metadata
+
+
+def publish(version=None, artifact_dir=ARTIFACT_DIR, registry_dir=REGISTRY_DIR, make_active=True, data_path=None):
+    """Daftarkan versi inkremental (default: terbaru) di registry model; kembalikan nomor versi registry.
+
+    Metrik yang dicatat adalah metrik prequential batch terakhir. Dengan make_active=True versi
+    registry baru langsung menjadi ACTIVE.
+    """
+    version = latest_version(artifact_dir) if version is None else version
+    if version is None:
+        raise FileNotFoundError(f"Belum ada versi inkremental di {artifact_dir}")
+    path = version_dir(version, artifact_dir)
+    with open(os.path.join(path, 'metadata.json')) as f:
+        metadata = json.load(f)
+    registry_version = register(
+        {key: os.path.join(path, name) for key, name in APP_ARTIFACT_PATHS.items()},
+        metrics=metadata['prequential_metrics'],
+        data_sha256=source_sha256(data_path) if data_path else None,
+        model_name='SGDRegressor (inkremental)',
+        params={'incremental_version': version, 'n_rows_total': metadata['n_rows_total']},
+        notes=f"incremental.py v{version:04d}; metrik prequential pada batch terakhir sebelum update",
+        registry_dir=registry_dir)
+    if make_active:
+        activate(registry_version, registry_dir)
+    return registry_version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update inkremental preprocessor, regresor, dan K-Means dengan listing baru.")
+    parser.add_argument('input', help="CSV listing baru (skema sama dengan jabodetabek_house_price.csv)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--epochs', type=int, default=5, help="Jumlah lintasan partial_fit per batch")
+    parser.add_argument('--publish', action='store_true',
+                        help="Daftarkan versi baru di registry model dan jadikan ACTIVE")
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    args = parser.parse_args(argv)
+
+    version, metadata = update(pd.read_csv(args.input), args.artifact_dir, epochs=args.epochs)
+    print(f"Versi {version} disimpan di {version_dir(version, args.artifact_dir)} "
+          f"({metadata['n_rows_batch']} baris baru, {metadata['n_rows_total']} total)")
+    if metadata['prequential_metrics']:
+        m = metadata['prequential_metrics']
+        print(f"Metrik pada batch baru sebelum update: RMSE={m['RMSE']:.2f}, MAE={m['MAE']:.2f}, R2={m['R2']:.4f}")
+    if args.publish:
+        registry_version = publish(version, args.artifact_dir, args.registry, data_path=args.input)
+        print(f"Versi inkremental {version} aktif di registry sebagai versi {registry_version}: dipakai halaman "
+              f"prediksi dan model_server. Metrik statis di halaman Modeling dan interpretasi klaster di halaman "
+              f"Analisis Klastering tetap menggambarkan *.pkl hasil pipeline.py.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# k_selection.py
+# Pemilihan jumlah klaster K-Means (Elbow Method & Silhouette Score) secara paralel.
+# Pengganti loop k = 2..10 di notebook yang melatih KMeans satu per satu dan menghitung
+# silhouette_score penuh (O(n^2)) di setiap langkah.
+#
+# Contoh:
+#   python k_selection.py --k-min 2 --k-max 10 --sample-size 2000
+#   python k_selection.py --k 3 --curves k_scan.csv
+#   python k_selection.py --k 3 --reduction svd --n-components 50 --compare-full
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+from sklearn.pipeline import Pipeline
+
+KMEANS_MODEL_PATH = 'kmeans_cluster_model.pkl'
+# Di atas jumlah baris ini MiniBatchKMeans dipakai otomatis (algorithm='auto')
+MINIBATCH_THRESHOLD = 50000
+REDUCTION_METHODS = ['svd', 'random_projection']
+DEFAULT_N_COMPONENTS = 50
+
+
+def make_kmeans(k, algorithm='kmeans', random_state=42, n_init=10, batch_size=4096):
+    if algorithm == 'minibatch':
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=n_init, batch_size=batch_size)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+
+
+def make_reducer(method, n_components=DEFAULT_N_COMPONENTS, random_state=42):
+    """Reduksi dimensi sebelum K-Means: 'svd' (TruncatedSVD) atau 'random_projection'
+    (SparseRandomProjection). Keduanya menerima matriks sparse hasil one-hot secara langsung."""
+    if method == 'svd':
+        from sklearn.decomposition import TruncatedSVD
+        return TruncatedSVD(n_components=n_components, random_state=random_state)
+    if method == 'random_projection':
+        from sklearn.random_projection import SparseRandomProjection
+        return SparseRandomProjection(n_components=n_components, dense_output=True, random_state=random_state)
+    raise ValueError(f"Metode reduksi tidak dikenal: {method} (pilih {REDUCTION_METHODS})")
+
+
+def with_reducer(reducer, kmeans):
+    """Gabungkan reducer dan K-Means yang sudah di-fit menjadi satu Pipeline.
+
+    Pipeline dipakai persis seperti model K-Means biasa (predict / fit_predict pada X_cluster
+    lebar penuh), sehingga kmeans_cluster_model.pkl tetap satu file dan pemanggilnya tidak berubah.
+    """
+    if reducer is None:
+        return kmeans
+    return Pipeline([('reduce', reducer), ('kmeans', kmeans)])
+
+
+def make_cluster_model(k, algorithm='kmeans', reduction=None, n_components=DEFAULT_N_COMPONENTS, random_state=42):
+    """Model klaster belum di-fit: K-Means biasa, atau Pipeline reducer + K-Means jika `reduction` diisi."""
+    kmeans = make_kmeans(k, algorithm, random_state=random_state)
+    if reduction is None:
+        return kmeans
+    return with_reducer(make_reducer(reduction, n_components, random_state), kmeans)
+
+
+def final_kmeans(model):
+    """Langkah K-Means dari model klaster (Pipeline dengan reducer atau K-Means biasa)."""
+    return model.named_steps['kmeans'] if isinstance(model, Pipeline) else model
+
+
+def describe_cluster_model(model):
+    """Ringkasan model klaster: k dan reduksi dimensi (jika ada)."""
+    kmeans = final_kmeans(model)
+    description = {'k': int(kmeans.n_clusters), 'algorithm': type(kmeans).__name__,
+                   'reduction': None, 'n_features_in': None, 'n_components': None}
+    if isinstance(model, Pipeline):
+        reducer = model.named_steps['reduce']
+        description.update(reduction=type(reducer).__name__, n_features_in=int(reducer.n_features_in_),
+                           n_components=int(reducer.n_components_ if hasattr(reducer, 'n_components_')
+                                            else reducer.n_components))
+    return description
+
+
+def clustering_agreement(X, model, reference_model):
+    """Adjusted Rand Index antara label dua model klaster pada X (1.0 = pembagian identik)."""
+    return float(adjusted_rand_score(reference_model.predict(X), model.predict(X)))
+
+
+def full_width_agreement(X, model, random_state=42):
+    """Bandingkan model klaster (dengan reducer) terhadap K-Means yang dilatih pada X lebar penuh
+    dengan k dan algoritma yang sama. Mengembalikan ARI dan waktu predict kedua model."""
+    kmeans = final_kmeans(model)
+    algorithm = 'minibatch' if isinstance(kmeans, MiniBatchKMeans) else 'kmeans'
+    start = time.perf_counter()
+    full_model = make_kmeans(kmeans.n_clusters, algorithm, random_state=random_state).fit(X)
+    full_fit_seconds = time.perf_counter() - start
+    timings = {}
+    for name, candidate in (('full', full_model), ('reduced', model)):
+        start = time.perf_counter()
+        candidate.predict(X)
+        timings[f'{name}_predict_seconds'] = time.perf_counter() - start
+    return {'ari': clustering_agreement(X, model, full_model), 'full_fit_seconds': full_fit_seconds, **timings}
+
+
+def _fit_candidate(X, k, algorithm, sample_size, random_state, n_init, batch_size):
+    start = time.perf_counter()
+    model = make_kmeans(k, algorithm, random_state=random_state, n_init=n_init, batch_size=batch_size)
+    labels = model.fit_predict(X)
+    fit_seconds = time.perf_counter() - start
+
+    # Silhouette dihitung pada sampel acak berukuran tetap -> biaya O(sample_size^2), bukan O(n^2)
+    n_samples = X.shape[0]
+    sample = sample_size if sample_size is not None and sample_size < n_samples else None
+    silhouette = silhouette_score(X, labels, sample_size=sample, random_state=random_state)
+    return model, {
+        'k': k,
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette),
+        'fit_seconds': fit_seconds,
+        'silhouette_seconds': time.perf_counter() - start - fit_seconds,
+    }
+
+
+def scan_k(X, k_values=range(2, 11), algorithm='auto', sample_size=2000, n_jobs=-1,
+           patience=None, random_state=42, n_init=10, batch_size=4096, reduction=None,
+           n_components=DEFAULT_N_COMPONENTS):
+    """Latih K-Means untuk setiap k secara paralel dan kembalikan (curves, models).
+
+    `curves` adalah DataFrame berisi inertia dan silhouette per k; `models` memetakan
+    k ke model yang sudah di-fit. Jika `patience` diisi, pencarian berhenti setelah
+    silhouette tidak membaik untuk `patience` nilai k berturut-turut (k dievaluasi
+    per gelombang sebanyak jumlah worker).
+
+    Jika `reduction` diisi ('svd' / 'random_projection'), X direduksi sekali ke `n_components`
+    kolom, semua k dilatih dan dinilai (silhouette, inertia) pada ruang tereduksi, dan setiap
+    model dikembalikan sebagai Pipeline reducer + K-Means yang menerima X lebar penuh.
+    """
+    reducer = None
+    if reduction is not None:
+        reducer = make_reducer(reduction, n_components, random_state)
+        X = reducer.fit_transform(X)
+    k_values = sorted(k_values)
+    if algorithm == 'auto':
+        algorithm = 'minibatch' if X.shape[0] >= MINIBATCH_THRESHOLD else 'kmeans'
+    n_workers = joblib.effective_n_jobs(n_jobs)
+    wave_size = len(k_values) if patience is None else max(1, n_workers)
+
+    rows, models = [], {}
+    best_score, since_best = -np.inf, 0
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, len(k_values), wave_size):
+            wave = k_values[start:start + wave_size]
+            results = parallel(
+                delayed(_fit_candidate)(X, k, algorithm, sample_size, random_state, n_init, batch_size)
+                for k in wave
+            )
+            stop = False
+            for model, row in results:
+                models[row['k']] = with_reducer(reducer, model)
+                rows.append(row)
+                if row['silhouette'] > best_score:
+                    best_score, since_best = row['silhouette'], 0
+                else:
+                    since_best += 1
+                    stop = stop or (patience is not None and since_best >= patience)
+            if stop:
+                break
+
+    curves = pd.DataFrame(rows).set_index('k')
+    curves['algorithm'] = algorithm
+    curves['reduction'] = reduction
+    curves['n_features'] = X.shape[1]
+    return curves, models
+
+
+def best_k(curves):
+    return int(curves['silhouette'].idxmax())
+
+
+def save_model(model, path=KMEANS_MODEL_PATH):
+    joblib.dump(model, path)
+
+
+def main(argv=None):
+    from feature_engineering import get_prepared_df
+
+    parser = argparse.ArgumentParser(description="Pemilihan jumlah klaster K-Means dan simpan kmeans_cluster_model.pkl.")
+    parser.add_argument('--data', default='jabodetabek_house_price.csv')
+    parser.add_argument('--preprocessor', default='preprocessor.pkl')
+    parser.add_argument('--k-min', type=int, default=2)
+    parser.add_argument('--k-max', type=int, default=10)
+    parser.add_argument('--k', type=int, default=None, help="Jumlah klaster yang dipakai (default: silhouette tertinggi)")
+    parser.add_argument('--algorithm', choices=['auto', 'kmeans', 'minibatch'], default='auto')
+    parser.add_argument('--sample-size', type=int, default=2000, help="Ukuran sampel untuk silhouette score")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--patience', type=int, default=None)
+    parser.add_argument('--curves', default=None, help="Simpan kurva inertia/silhouette ke CSV")
+    parser.add_argument('--reduction', choices=REDUCTION_METHODS, default=None,
+                        help="Reduksi dimensi sebelum K-Means (disimpan bersama model)")
+    parser.add_argument('--n-components', type=int, default=DEFAULT_N_COMPONENTS)
+    parser.add_argument('--compare-full', action='store_true',
+                        help="Laporkan ARI terhadap K-Means pada X lebar penuh (k sama)")
+    parser.add_argument('--output', default=KMEANS_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    df = get_prepared_df(args.data)
+    X_cluster = joblib.load(args.preprocessor).transform(df.drop('price_in_rp', axis=1))
+    k_values = range(args.k_min, args.k_max + 1)
+    if args.k is not None and args.k not in k_values:
+        k_values = sorted(set(k_values) | {args.k})
+
+    curves, models = scan_k(X_cluster, k_values, algorithm=args.algorithm, sample_size=args.sample_size,
+                            n_jobs=args.n_jobs, patience=args.patience, reduction=args.reduction,
+                            n_components=args.n_components)
+    print(curves.to_string())
+    if args.curves:
+        curves.to_csv(args.curves)
+
+    chosen_k = args.k if args.k is not None else best_k(curves)
+    model = models.get(chosen_k)
+    if model is None:
+        # k yang diminta tidak sempat dievaluasi karena early stopping
+        model = make_cluster_model(chosen_k, curves['algorithm'].iloc[0], args.reduction,
+                                   args.n_components).fit(X_cluster)
+    if args.reduction is not None and args.compare_full:
+        agreement = full_width_agreement(X_cluster, model)
+        print(f"ARI terhadap K-Means lebar penuh ({X_cluster.shape[1]} kolom): {agreement['ari']:.4f}; "
+              f"predict {agreement['reduced_predict_seconds']:.3f} s vs {agreement['full_predict_seconds']:.3f} s")
+    save_model(model, args.output)
+    print(f"Model K-Means (k={chosen_k}) disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# metrics.py
+# Instrumentasi latensi per tahap untuk jalur prediksi dan klastering: setiap tahap dibungkus
+# `with stage('model_predict'):` dan durasinya masuk ke histogram (bucket ala Prometheus).
+# Histogram bisa dibaca sebagai ringkasan (panel debug Streamlit), diekspor dalam format teks
+# Prometheus (endpoint /metrics di model_server.py atau file untuk textfile collector), dan satu
+# permintaan bisa diprofil dengan cProfile.
+#
+# Contoh:
+#   with stage('preprocessor_transform'):
+#       X_processed = preprocessor.transform(X)
+#   PRICE_METRICS_FILE=/var/lib/node_exporter/house_price.prom streamlit run Dashboard.py
+import bisect
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+
+METRIC_NAME = 'house_price_stage_duration_seconds'
+METRICS_FILE_ENV = 'PRICE_METRICS_FILE'
+# Batas atas bucket (detik); +Inf ditambahkan otomatis
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogram kumulatif thread-safe: jumlah observasi per bucket, total, dan jumlah durasi."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Elemen terakhir = bucket +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, q):
+        """Perkiraan kuantil dengan interpolasi linear di dalam bucket (seperti histogram_quantile)."""
+        counts, count, _ = self.snapshot()
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if cumulative + n >= rank and n > 0:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Di atas bucket terbesar: hanya batas bawah yang diketahui
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Kumpulan histogram per nama tahap."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(self.buckets)
+            return self._histograms[name]
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        """List dict per tahap: count, mean_ms, p50_ms, p90_ms, p99_ms, total_s."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        rows = []
+        for name, hist in histograms:
+            _, count, total = hist.snapshot()
+            rows.append({
+                'stage': name,
+                'count': count,
+                'mean_ms': total / count * 1000 if count else None,
+                **{f'p{q}_ms': (v * 1000 if (v := hist.quantile(q / 100)) is not None else None)
+                   for q in (50, 90, 99)},
+                'total_s': total,
+            })
+        return rows
+
+    def prometheus_text(self, metric_name=METRIC_NAME):
+        """Semua histogram dalam format teks eksposisi Prometheus (label `stage`)."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        lines = [f'# HELP {metric_name} Durasi tahap jalur prediksi/klastering.',
+                 f'# TYPE {metric_name} histogram']
+        for name, hist in histograms:
+            counts, count, total = hist.snapshot()
+            cumulative = 0
+            for upper, n in zip(list(hist.buckets) + ['+Inf'], counts):
+                cumulative += n
+                lines.append(f'{metric_name}_bucket{{stage="{name}",le="{upper}"}} {cumulative}')
+            lines.append(f'{metric_name}_sum{{stage="{name}"}} {total}')
+            lines.append(f'{metric_name}_count{{stage="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus_file(self, path):
+        # Tulis lewat file sementara agar collector tidak membaca file setengah jadi
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+# Registry bersama untuk seluruh proses
+REGISTRY = MetricsRegistry()
+stage = REGISTRY.stage
+
+
+def write_metrics_file(path=None):
+    """Tulis REGISTRY ke path (default: env PRICE_METRICS_FILE); tidak melakukan apa-apa jika kosong."""
+    path = path or os.environ.get(METRICS_FILE_ENV)
+    if path:
+        REGISTRY.write_prometheus_file(path)
+
+
+def show_debug_sidebar(registry=REGISTRY):
+    """Panel debug opsional di sidebar Streamlit: ringkasan latensi per tahap + tombol reset."""
+    import streamlit as st
+
+    if not st.sidebar.checkbox("Debug: latensi per tahap", key='metrics_debug_panel'):
+        return
+    rows = registry.summary()
+    if rows:
+        st.sidebar.dataframe([{k: (round(v, 2) if isinstance(v, float) else v) for k, v in row.items()}
+                              for row in rows])
+    else:
+        st.sidebar.caption("Belum ada tahap yang tercatat di proses ini.")
+    if st.sidebar.button("Reset metrik", key='metrics_reset'):
+        registry.reset()
+    with st.sidebar.expander("Format Prometheus"):
+        st.code(registry.prometheus_text(), language='text')
+
+
+class ProfileCapture:
+    """Hasil cProfile satu permintaan; stats_text berisi fungsi teratas menurut waktu kumulatif."""
+
+    def __init__(self, top=30):
+        self.top = top
+        self.profiler = cProfile.Profile()
+        self.stats_text = ''
+
+    def finish(self):
+        buffer = io.StringIO()
+        pstats.Stats(self.profiler, stream=buffer).sort_stats('cumulative').print_stats(self.top)
+        self.stats_text = buffer.getvalue()
+
+
+@contextlib.contextmanager
+def capture_profile(enabled=True, top=30):
+    """Profil blok kode dengan cProfile (hanya thread pemanggil); enabled=False -> tanpa overhead."""
+    capture = ProfileCapture(top)
+    if not enabled:
+        yield capture
+        return
+    capture.profiler.enable()
+    try:
+        yield capture
+    finally:
+        capture.profiler.disable()
+        capture.finish()
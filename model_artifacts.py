@@ -0,0 +1,238 @@
+# model_artifacts.py
+# Format artefak model untuk serving multi-proses: setiap objek (preprocessor, model yang sudah
+# di-flatten, KMeans) disimpan dengan joblib tanpa kompresi, sehingga array NumPy di dalamnya
+# bisa dimuat dengan mmap_mode='r'. Centroid KMeans, momen scaler, dan array pohon lalu dibaca
+# langsung dari page cache OS dan dipakai bersama (read-only) oleh semua worker di satu host,
+# bukan disalin ke memori setiap proses.
+#
+# manifest.json mencatat hash, ukuran, dan dtype/shape setiap array, serta mtime/ukuran file
+# .pkl sumber dan opsi flatten agar artefak yang sudah usang atau berbeda bentuk tidak dipakai.
+# Halaman klastering (cluster_summary.py) memuat K-Means lewat load_kmeans_model, jadi centroid
+# juga dibaca dari artefak bersama.
+#
+# Contoh:
+#   python model_artifacts.py                  # ekspor ke artifacts/shared/
+#   python model_artifacts.py --float32        # simpan array float64 sebagai float32 (lebih kecil)
+#   python model_artifacts.py --verify
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+from data_access import file_sha256
+
+SHARED_ARTIFACT_DIR = os.path.join('artifacts', 'shared')
+MANIFEST_FILE = 'manifest.json'
+# Naikkan jika tata letak artefak berubah agar ekspor lama tidak dipakai
+MANIFEST_FORMAT_VERSION = 2
+SOURCE_PATHS = {
+    'preprocessor': 'preprocessor.pkl',
+    'model': 'best_model.pkl',
+    'kmeans': 'kmeans_cluster_model.pkl',
+}
+# Array lebih kecil dari ini tidak dicatat di manifest (dan tidak diubah ke float32)
+MIN_ARRAY_BYTES = 1024
+# Artefak yang tidak diubah ke float32: KMeans.predict mensyaratkan centroid ber-dtype sama dengan
+# X (float64 dari preprocessor), centroid float32 membuat predict gagal
+KEEP_FLOAT64 = {'kmeans'}
+
+
+def iter_arrays(obj, path='', _seen=None):
+    """(path, array) untuk setiap ndarray numerik di atribut objek, dict, list, dan tuple (rekursif)."""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return
+    _seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype != object:
+            yield path, obj
+        return
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, (list, tuple)):
+        items = enumerate(obj)
+    elif hasattr(obj, '__dict__'):
+        items = vars(obj).items()
+    else:
+        return
+    for key, value in items:
+        yield from iter_arrays(value, f'{path}.{key}' if path else str(key), _seen)
+
+
+def _replace_float64_arrays(obj, min_bytes=MIN_ARRAY_BYTES, _seen=None):
+    # Ganti array float64 besar dengan salinan float32, langsung di atribut / elemen container
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen or isinstance(obj, np.ndarray):
+        return
+    _seen.add(id(obj))
+    if isinstance(obj, (dict, list)):
+        keys = obj.keys() if isinstance(obj, dict) else range(len(obj))
+        container = obj
+    elif isinstance(obj, tuple):
+        keys, container = (), None
+        for value in obj:
+            _replace_float64_arrays(value, min_bytes, _seen)
+    elif hasattr(obj, '__dict__'):
+        keys, container = list(vars(obj)), vars(obj)
+    else:
+        return
+    for key in keys:
+        value = container[key]
+        if isinstance(value, np.ndarray) and value.dtype == np.float64 and value.nbytes >= min_bytes:
+            container[key] = value.astype(np.float32)
+        else:
+            _replace_float64_arrays(value, min_bytes, _seen)
+
+
+def _source_stat(path):
+    stat = os.stat(path)
+    return {'source': path, 'source_mtime_ns': stat.st_mtime_ns, 'source_size': stat.st_size}
+
+
+def export_artifacts(output_dir=SHARED_ARTIFACT_DIR, source_paths=None, float32=False, flatten=True):
+    """Ekspor artefak .pkl ke output_dir dalam format yang bisa di-memory-map; kembalikan manifest.
+
+    flatten=True menyimpan GradientBoosting sebagai FlatTreeEnsemble (array datar yang bisa
+    di-mmap; pohon sklearn selalu disalin saat unpickle). float32=True menyimpan array float64
+    besar sebagai float32 (kecuali artefak di KEEP_FLOAT64): ukuran setengahnya, tetapi
+    prediksi bisa sedikit berbeda.
+    """
+    source_paths = {**SOURCE_PATHS, **(source_paths or {})}
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {
+        'format_version': MANIFEST_FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'float32': float32,
+        'artifacts': {},
+    }
+    for name, source in source_paths.items():
+        if not os.path.exists(source):
+            continue
+        obj = joblib.load(source)
+        if name == 'model' and flatten:
+            from tree_export import flatten_model
+            obj = flatten_model(obj)
+        downcast = float32 and name not in KEEP_FLOAT64
+        if downcast:
+            _replace_float64_arrays(obj)
+        filename = f'{name}.joblib'
+        path = os.path.join(output_dir, filename)
+        # Tanpa kompresi: syarat agar joblib.load(mmap_mode='r') bisa memetakan array langsung
+        joblib.dump(obj, path + '.tmp', compress=0)
+        os.replace(path + '.tmp', path)
+        entry = manifest['artifacts'][name] = {
+            'file': filename,
+            'class': f'{type(obj).__module__}.{type(obj).__name__}',
+            'sha256': file_sha256(path),
+            'size': os.path.getsize(path),
+            'float32': downcast,
+            **_source_stat(source),
+            'arrays': [
+                {'path': array_path, 'dtype': str(array.dtype), 'shape': list(array.shape), 'nbytes': int(array.nbytes)}
+                for array_path, array in iter_arrays(obj) if array.nbytes >= MIN_ARRAY_BYTES
+            ],
+        }
+        if name == 'model':
+            entry['flatten'] = flatten
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+
+def read_manifest(shared_dir=SHARED_ARTIFACT_DIR):
+    try:
+        with open(os.path.join(shared_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get('format_version') == MANIFEST_FORMAT_VERSION else None
+
+
+def is_current(entry, flatten=None, source_path=None):
+    """True jika file .pkl sumber tidak berubah sejak diekspor (atau sudah tidak ada).
+
+    flatten (jika diisi) harus sama dengan opsi flatten saat ekspor, dan source_path (jika
+    diisi) harus file sumber yang sama; ekspor model datar dan model sklearn tidak saling
+    menggantikan.
+    """
+    if flatten is not None and entry.get('flatten', flatten) != flatten:
+        return False
+    if source_path is not None and os.path.abspath(source_path) != os.path.abspath(entry['source']):
+        return False
+    try:
+        stat = os.stat(entry['source'])
+    except FileNotFoundError:
+        return True
+    return (stat.st_mtime_ns, stat.st_size) == (entry['source_mtime_ns'], entry['source_size'])
+
+
+def load_shared_artifact(name, shared_dir=SHARED_ARTIFACT_DIR, mmap_mode='r', verify=False, flatten=None,
+                         source_path=None):
+    """Muat satu artefak dengan array di-memory-map (read-only); None jika tidak ada atau usang
+    (lihat is_current untuk flatten dan source_path)."""
+    manifest = read_manifest(shared_dir)
+    entry = manifest and manifest['artifacts'].get(name)
+    if not entry or not is_current(entry, flatten, source_path):
+        return None
+    path = os.path.join(shared_dir, entry['file'])
+    if verify and file_sha256(path) != entry['sha256']:
+        raise ValueError(f"Hash {path} tidak cocok dengan manifest")
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def load_serving_artifacts(shared_dir=SHARED_ARTIFACT_DIR, preprocessor_path=SOURCE_PATHS['preprocessor'],
+                           model_path=SOURCE_PATHS['model'], flatten=True):
+    """(preprocessor, model) dari artefak bersama jika tersedia dan masih sesuai .pkl sumber;
+    jika tidak, dimuat biasa dengan prediction.load_artifacts."""
+    preprocessor = load_shared_artifact('preprocessor', shared_dir, source_path=preprocessor_path)
+    model = load_shared_artifact('model', shared_dir, flatten=flatten, source_path=model_path)
+    if preprocessor is not None and model is not None:
+        return preprocessor, model
+    from prediction import load_artifacts
+    return load_artifacts(preprocessor_path, model_path, flatten=flatten)
+
+
+def load_kmeans_model(kmeans_model_path=SOURCE_PATHS['kmeans'], shared_dir=SHARED_ARTIFACT_DIR):
+    """Model K-Means dengan centroid di-memory-map dari artefak bersama jika ekspornya masih
+    sesuai kmeans_model_path; jika tidak, dimuat biasa dengan joblib."""
+    model = load_shared_artifact('kmeans', shared_dir, source_path=kmeans_model_path)
+    return model if model is not None else joblib.load(kmeans_model_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor artefak model ke format yang bisa di-memory-map bersama.")
+    parser.add_argument('--output', default=SHARED_ARTIFACT_DIR)
+    parser.add_argument('--preprocessor', default=SOURCE_PATHS['preprocessor'])
+    parser.add_argument('--model', default=SOURCE_PATHS['model'])
+    parser.add_argument('--kmeans', default=SOURCE_PATHS['kmeans'])
+    parser.add_argument('--float32', action='store_true', help="Simpan array float64 sebagai float32")
+    parser.add_argument('--no-flatten', action='store_true', help="Simpan model sklearn apa adanya")
+    parser.add_argument('--verify', action='store_true', help="Periksa hash artefak yang sudah diekspor")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        manifest = read_manifest(args.output)
+        if manifest is None:
+            raise SystemExit(f"Manifest tidak ditemukan di {args.output}")
+        for name, entry in manifest['artifacts'].items():
+            ok = file_sha256(os.path.join(args.output, entry['file'])) == entry['sha256']
+            print(f"{name:<14} {'OK' if ok else 'HASH BERBEDA'}{'' if is_current(entry) else ' (sumber berubah)'}")
+        return
+
+    manifest = export_artifacts(args.output, {'preprocessor': args.preprocessor, 'model': args.model,
+                                              'kmeans': args.kmeans},
+                                float32=args.float32, flatten=not args.no_flatten)
+    for name, entry in manifest['artifacts'].items():
+        array_mb = sum(a['nbytes'] for a in entry['arrays']) / 2 ** 20
+        print(f"{name:<14} {entry['class']:<55} {entry['size'] / 2 ** 20:8.2f} MB "
+              f"({len(entry['arrays'])} array, {array_mb:.2f} MB bisa di-mmap)")
+    print(f"Manifest disimpan ke {os.path.join(args.output, MANIFEST_FILE)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,456 @@
+# model_registry.py
+# Registry model lokal: setiap pasangan preprocessor/model (+ K-Means) disimpan sebagai versi
+# yang tidak berubah lagi, artifacts/registry/v0001/{preprocessor,best_model,kmeans_cluster_model}.pkl
+# + metadata.json (metrik evaluasi, hash data, hash setiap file). File pointer ACTIVE menunjuk
+# versi produksi dan CANDIDATE (opsional) versi yang diuji dalam mode shadow.
+#
+# Aplikasi yang berjalan memakai HotSwapModel: pointer ACTIVE dipantau oleh thread latar,
+# versi baru dimuat dan dipanaskan di latar, lalu referensinya diganti dalam satu assignment.
+# Permintaan yang sedang berjalan tetap memakai versi lama sampai selesai, jadi tidak ada restart
+# dan tidak ada lonjakan latensi karena model dimuat di jalur permintaan. Jika CANDIDATE diisi,
+# setiap batch permintaan juga dinilai oleh versi kandidat di thread terpisah (ShadowScorer);
+# latensi dan selisih prediksinya dicatat tanpa memengaruhi jawaban ke klien.
+#
+# Contoh:
+#   python model_registry.py register --evaluate          # daftarkan *.pkl di direktori kerja
+#   python model_registry.py list
+#   python model_registry.py activate 3                   # model_server beralih tanpa restart
+#   python model_registry.py shadow 4                     # nilai permintaan live dengan v0004
+#   python model_registry.py shadow --off
+import argparse
+import json
+import os
+import queue
+import shutil
+import stat
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_access import file_sha256
+from metrics import REGISTRY as METRICS, Histogram
+from prediction import load_artifacts, predict_batch
+
+REGISTRY_DIR = os.path.join('artifacts', 'registry')
+ACTIVE_FILE = 'ACTIVE'
+CANDIDATE_FILE = 'CANDIDATE'
+METADATA_FILE = 'metadata.json'
+ARTIFACT_FILES = {
+    'preprocessor': 'preprocessor.pkl',
+    'model': 'best_model.pkl',
+    'kmeans': 'kmeans_cluster_model.pkl',
+}
+DEFAULT_POLL_SECONDS = 5.0
+
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, f'v{version:04d}')
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    try:
+        names = os.listdir(registry_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[1:]) for name in names if name.startswith('v') and name[1:].isdigit())
+
+
+def read_metadata(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(version_dir(version, registry_dir), METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def _read_pointer(name, registry_dir):
+    try:
+        with open(os.path.join(registry_dir, name)) as f:
+            value = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return int(value) if value else None
+
+
+def _write_pointer(name, version, registry_dir):
+    path = os.path.join(registry_dir, name)
+    if version is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    if version not in list_versions(registry_dir):
+        raise ValueError(f"Versi {version} tidak ada di {registry_dir}")
+    # Pointer diganti atomik: pembaca selalu melihat versi lama atau versi baru, tidak pernah setengah
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        f.write(str(version))
+    os.replace(tmp_path, path)
+
+
+def active_version(registry_dir=REGISTRY_DIR):
+    return _read_pointer(ACTIVE_FILE, registry_dir)
+
+
+def candidate_version(registry_dir=REGISTRY_DIR):
+    return _read_pointer(CANDIDATE_FILE, registry_dir)
+
+
+def activate(version, registry_dir=REGISTRY_DIR):
+    _write_pointer(ACTIVE_FILE, version, registry_dir)
+    if candidate_version(registry_dir) == version:
+        _write_pointer(CANDIDATE_FILE, None, registry_dir)
+
+
+def set_candidate(version, registry_dir=REGISTRY_DIR):
+    """Jadikan `version` kandidat shadow; None menonaktifkan mode shadow."""
+    _write_pointer(CANDIDATE_FILE, version, registry_dir)
+
+
+def register(paths=None, metrics=None, data_sha256=None, model_name=None, params=None, notes=None,
+             registry_dir=REGISTRY_DIR):
+    """Salin artefak `paths` ({'preprocessor': ..., 'model': ..., 'kmeans': ...}) sebagai versi baru.
+
+    Versi ditulis ke direktori sementara lalu di-rename, sehingga versi yang terlihat selalu
+    lengkap; file di dalamnya dibuat read-only. Mengembalikan nomor versi.
+    """
+    paths = {**ARTIFACT_FILES, **(paths or {})}
+    for name in ('preprocessor', 'model'):
+        if not os.path.exists(paths[name]):
+            raise FileNotFoundError(paths[name])
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp_dir = os.path.join(registry_dir, f'.tmp-{os.getpid()}-{time.time_ns()}')
+    os.makedirs(tmp_dir)
+    files = {}
+    for name, source in paths.items():
+        if not os.path.exists(source):
+            continue  # K-Means opsional
+        target = os.path.join(tmp_dir, ARTIFACT_FILES[name])
+        shutil.copyfile(source, target)
+        files[name] = {'file': ARTIFACT_FILES[name], 'sha256': file_sha256(target), 'size': os.path.getsize(target),
+                       'source': source}
+        os.chmod(target, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    metadata = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_name': model_name,
+        'params': params,
+        'metrics': metrics,
+        'data_sha256': data_sha256,
+        'notes': notes,
+        'files': files,
+    }
+    while True:
+        version = max(list_versions(registry_dir), default=0) + 1
+        with open(os.path.join(tmp_dir, METADATA_FILE), 'w') as f:
+            json.dump({**metadata, 'version': version}, f, indent=2, default=str)
+        try:
+            # rename gagal jika direktori versi sudah dibuat proses lain -> coba nomor berikutnya
+            os.rename(tmp_dir, version_dir(version, registry_dir))
+            return version
+        except OSError:
+            if not os.path.isdir(version_dir(version, registry_dir)):
+                raise
+
+
+def verify_version(version, registry_dir=REGISTRY_DIR):
+    """Nama artefak yang hash-nya tidak cocok dengan metadata (list kosong = utuh)."""
+    metadata = read_metadata(version, registry_dir)
+    path = version_dir(version, registry_dir)
+    return [name for name, entry in metadata['files'].items()
+            if file_sha256(os.path.join(path, entry['file'])) != entry['sha256']]
+
+
+def load_version(version, registry_dir=REGISTRY_DIR, flatten=True):
+    """(preprocessor, model, metadata) untuk satu versi."""
+    path = version_dir(version, registry_dir)
+    preprocessor, model = load_artifacts(os.path.join(path, ARTIFACT_FILES['preprocessor']),
+                                         os.path.join(path, ARTIFACT_FILES['model']), flatten=flatten)
+    return preprocessor, model, read_metadata(version, registry_dir)
+
+
+def active_metadata(registry_dir=REGISTRY_DIR):
+    """Metadata versi ACTIVE, atau None jika registry belum dipakai."""
+    version = active_version(registry_dir)
+    return read_metadata(version, registry_dir) if version is not None else None
+
+
+class RegistryVersion:
+    """Kunci versi artefak untuk PredictionCache / cache halaman: 'registry-v0003' jika registry
+    punya versi ACTIVE, selain itu hash file fallback (prediction_cache.ArtifactVersion)."""
+
+    def __init__(self, registry_dir=REGISTRY_DIR, fallback=None):
+        self.registry_dir = registry_dir
+        self.fallback = fallback
+
+    def current(self):
+        version = active_version(self.registry_dir)
+        if version is not None:
+            return f'registry-v{version:04d}'
+        return self.fallback.current() if self.fallback is not None else None
+
+
+class LoadedVersion:
+    __slots__ = ('version', 'preprocessor', 'model', 'metadata')
+
+    def __init__(self, version, preprocessor, model, metadata):
+        self.version = version
+        self.preprocessor = preprocessor
+        self.model = model
+        self.metadata = metadata
+
+
+def _load_warm(version, registry_dir, flatten):
+    preprocessor, model, metadata = load_version(version, registry_dir, flatten=flatten)
+    # Panggilan pertama memicu inisialisasi lazy di sklearn; lakukan sebelum versi dipakai
+    predict_batch(pd.DataFrame([{}]), preprocessor, model)
+    return LoadedVersion(version, preprocessor, model, metadata)
+
+
+class ShadowScorer:
+    """Menilai batch permintaan live dengan versi kandidat di thread latar.
+
+    submit() tidak pernah memblok: jika antrean penuh, batch dilewati (dihitung di `dropped`).
+    Latensi kandidat dicatat di histogram `shadow_model_predict` (metrics.REGISTRY) dan di
+    histogram milik scorer; selisih terhadap prediksi versi aktif diringkas di stats().
+    """
+
+    def __init__(self, loaded, max_queue=1000):
+        self.loaded = loaded
+        self.latency = Histogram()
+        self.dropped = 0
+        self.errors = 0
+        self.n_rows = 0
+        self.sum_abs_delta = 0.0
+        self.sum_abs_rel_delta = 0.0
+        self.max_abs_delta = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._run, name=f'shadow-v{loaded.version}', daemon=True)
+        self._worker.start()
+
+    def submit(self, df, primary_predictions):
+        try:
+            self._queue.put_nowait((df, np.asarray(primary_predictions, dtype=float)))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            df, primary = item
+            start = time.perf_counter()
+            try:
+                shadow = np.asarray(predict_batch(df, self.loaded.preprocessor, self.loaded.model), dtype=float)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+            self.latency.observe(elapsed)
+            METRICS.observe('shadow_model_predict', elapsed)
+            delta = np.abs(shadow - primary)
+            rel_delta = delta / np.maximum(np.abs(primary), 1.0)
+            with self._lock:
+                self.n_rows += len(delta)
+                self.sum_abs_delta += float(delta.sum())
+                self.sum_abs_rel_delta += float(rel_delta.sum())
+                self.max_abs_delta = max(self.max_abs_delta, float(delta.max(initial=0.0)))
+
+    def stats(self):
+        _, n_batches, total_seconds = self.latency.snapshot()
+        with self._lock:
+            n_rows = self.n_rows
+            return {
+                'version': self.loaded.version,
+                'batches': n_batches,
+                'rows': n_rows,
+                'dropped_batches': self.dropped,
+                'errors': self.errors,
+                'mean_latency_ms': total_seconds / n_batches * 1000 if n_batches else None,
+                'p90_latency_ms': (v * 1000 if (v := self.latency.quantile(0.9)) is not None else None),
+                'mean_abs_delta': self.sum_abs_delta / n_rows if n_rows else None,
+                'mean_abs_pct_delta': 100.0 * self.sum_abs_rel_delta / n_rows if n_rows else None,
+                'max_abs_delta': self.max_abs_delta if n_rows else None,
+            }
+
+
+class HotSwapModel:
+    """Versi ACTIVE registry yang bisa diganti saat aplikasi berjalan.
+
+    `loaded` selalu menunjuk LoadedVersion yang lengkap dan sudah dipanaskan; penggantian
+    hanya berupa assignment satu atribut, jadi pemanggil predict_batch() tidak perlu lock.
+    refresh() (dipanggil thread watcher setiap `poll_seconds`) memuat versi baru dan kandidat
+    shadow di luar jalur permintaan. current() mengembalikan nomor versi aktif, sehingga objek
+    ini bisa dipakai sebagai artifact_version PredictionCache (cache dikosongkan saat swap);
+    predict_batch(df, return_version=True) juga mengembalikan versi yang benar-benar dipakai.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, flatten=True, poll_seconds=DEFAULT_POLL_SECONDS,
+                 shadow_queue=1000):
+        self.registry_dir = registry_dir
+        self.flatten = flatten
+        self.poll_seconds = poll_seconds
+        self.shadow_queue = shadow_queue
+        self.swaps = 0
+        self.last_error = None
+        self.shadow = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        version = active_version(registry_dir)
+        if version is None:
+            raise FileNotFoundError(f"Registry {registry_dir} belum punya versi ACTIVE")
+        self.loaded = _load_warm(version, registry_dir, flatten)
+        self._refresh_shadow()
+
+    def current(self):
+        return self.loaded.version
+
+    def predict_batch(self, df, return_version=False):
+        loaded, shadow = self.loaded, self.shadow
+        predictions = predict_batch(df, loaded.preprocessor, loaded.model)
+        if shadow is not None and len(df):
+            shadow.submit(df, predictions)
+        if return_version:
+            return predictions, loaded.version
+        return predictions
+
+    def _refresh_shadow(self):
+        version = candidate_version(self.registry_dir)
+        if version == self.loaded.version:
+            version = None
+        current = self.shadow.loaded.version if self.shadow is not None else None
+        if version == current:
+            return
+        old, self.shadow = self.shadow, None
+        if old is not None:
+            old.close()
+        if version is not None:
+            self.shadow = ShadowScorer(_load_warm(version, self.registry_dir, self.flatten), self.shadow_queue)
+
+    def refresh(self):
+        """Periksa pointer ACTIVE/CANDIDATE; muat dan ganti versi jika berubah. True jika terjadi swap."""
+        with self._refresh_lock:
+            swapped = False
+            version = active_version(self.registry_dir)
+            if version is not None and version != self.loaded.version:
+                self.loaded = _load_warm(version, self.registry_dir, self.flatten)
+                self.swaps += 1
+                swapped = True
+            self._refresh_shadow()
+            return swapped
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Versi yang gagal dimuat tidak menggantikan versi yang sedang melayani
+                self.last_error = f'{type(e).__name__}: {e}'
+
+    def start(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='registry-watcher', daemon=True)
+            self._watcher.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        if self.shadow is not None:
+            self.shadow.close()
+
+    def stats(self):
+        return {
+            'active_version': self.loaded.version,
+            'model_name': self.loaded.metadata.get('model_name'),
+            'metrics': self.loaded.metadata.get('metrics'),
+            'swaps': self.swaps,
+            'last_error': self.last_error,
+            'shadow': self.shadow.stats() if self.shadow is not None else None,
+        }
+
+
+def evaluate_artifacts(preprocessor_path, model_path, data_path='jabodetabek_house_price.csv'):
+    """Metrik (RMSE, MAE, R2) pada split test training.py untuk pasangan artefak."""
+    from training import load_training_data, regression_metrics
+
+    *_, y_test, _, X_test = load_training_data(data_path, return_frames=True)
+    preprocessor, model = load_artifacts(preprocessor_path, model_path)
+    return regression_metrics(y_test, predict_batch(X_test, preprocessor, model))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registry versi model: daftarkan, aktifkan, dan uji shadow.")
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = commands.add_parser('register', help="Daftarkan artefak sebagai versi baru")
+    register_parser.add_argument('--preprocessor', default=ARTIFACT_FILES['preprocessor'])
+    register_parser.add_argument('--model', default=ARTIFACT_FILES['model'])
+    register_parser.add_argument('--kmeans', default=ARTIFACT_FILES['kmeans'])
+    register_parser.add_argument('--data', default='jabodetabek_house_price.csv')
+    register_parser.add_argument('--model-name', default=None)
+    register_parser.add_argument('--metrics-json', default=None, help="File JSON berisi RMSE/MAE/R2")
+    register_parser.add_argument('--evaluate', action='store_true', help="Hitung metrik pada split test")
+    register_parser.add_argument('--notes', default=None)
+    register_parser.add_argument('--activate', action='store_true')
+
+    commands.add_parser('list', help="Tampilkan semua versi")
+    activate_parser = commands.add_parser('activate', help="Jadikan versi aktif (hot-swap)")
+    activate_parser.add_argument('version', type=int)
+    shadow_parser = commands.add_parser('shadow', help="Atur versi kandidat untuk mode shadow")
+    shadow_parser.add_argument('version', type=int, nargs='?')
+    shadow_parser.add_argument('--off', action='store_true')
+    verify_parser = commands.add_parser('verify', help="Periksa hash file sebuah versi")
+    verify_parser.add_argument('version', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'register':
+        from data_access import source_sha256
+
+        metrics = None
+        if args.metrics_json:
+            with open(args.metrics_json) as f:
+                metrics = json.load(f)
+        elif args.evaluate:
+            metrics = evaluate_artifacts(args.preprocessor, args.model, args.data)
+        version = register({'preprocessor': args.preprocessor, 'model': args.model, 'kmeans': args.kmeans},
+                           metrics=metrics, data_sha256=source_sha256(args.data), model_name=args.model_name,
+                           notes=args.notes, registry_dir=args.registry)
+        print(f"Versi {version} disimpan di {version_dir(version, args.registry)}")
+        if args.activate:
+            activate(version, args.registry)
+            print(f"Versi {version} aktif")
+    elif args.command == 'list':
+        active, candidate = active_version(args.registry), candidate_version(args.registry)
+        for version in list_versions(args.registry):
+            metadata = read_metadata(version, args.registry)
+            metrics = metadata.get('metrics') or {}
+            marker = 'ACTIVE' if version == active else ('CANDIDATE' if version == candidate else '')
+            r2 = f"R2={metrics['R2']:.4f}" if 'R2' in metrics else 'R2=-'
+            print(f"v{version:04d} {marker:<9} {metadata['created_at']} {metadata.get('model_name') or '-':<24} {r2}")
+    elif args.command == 'activate':
+        activate(args.version, args.registry)
+        print(f"Versi {args.version} aktif")
+    elif args.command == 'shadow':
+        if args.off or args.version is None:
+            set_candidate(None, args.registry)
+            print("Mode shadow nonaktif")
+        else:
+            set_candidate(args.version, args.registry)
+            print(f"Versi {args.version} dinilai dalam mode shadow")
+    elif args.command == 'verify':
+        mismatched = verify_version(args.version, args.registry)
+        print('OK' if not mismatched else f"HASH BERBEDA: {', '.join(mismatched)}")
+
+
+if __name__ == '__main__':
+    main()
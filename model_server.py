@@ -0,0 +1,325 @@
+# model_server.py
+# Layanan prediksi harga rumah: preprocessor dan model dimuat sekali dan tetap "hangat",
+# permintaan dari banyak klien digabung (micro-batching) menjadi satu transform + predict.
+#
+# Contoh:
+#   python model_server.py --port 8600
+#   curl -X POST localhost:8600/predict -d '{"lat": -6.22, "long": 106.98, "bedrooms": 3, ...}'
+#   curl -X POST localhost:8600/predict_batch -d '{"instances": [{...}, {...}]}'
+#   curl localhost:8600/stats
+#   curl localhost:8600/metrics                                  # histogram per tahap (Prometheus)
+#   curl -X POST 'localhost:8600/predict?profile=1' -d '{...}'   # + profil cProfile permintaan ini
+#   python model_server.py --registry artifacts/registry         # versi ACTIVE, hot-swap + shadow
+#
+# Hasil prediksi per properti disimpan di cache LRU (prediction_cache.py): listing populer yang
+# ditanyakan berulang kali dijawab tanpa masuk antrean batch.
+# Dengan --registry, model diambil dari model_registry.py: `python model_registry.py activate N`
+# mengganti versi tanpa restart, dan `python model_registry.py shadow N` menilai permintaan live
+# dengan versi kandidat di latar (hasilnya di /stats).
+import argparse
+import collections
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from metrics import REGISTRY, capture_profile
+from model_artifacts import load_serving_artifacts
+from prediction import MODEL_PATH, PREPROCESSOR_PATH, load_artifacts, predict_batch
+from prediction_cache import PredictionCache, canonical_key
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8600
+
+
+class LatencyRecorder:
+    """Menyimpan latensi N permintaan terakhir dan menghitung persentilnya."""
+
+    def __init__(self, window=10000):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def percentiles(self, qs=(50, 90, 99)):
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=float)
+        if samples.size == 0:
+            return {f'p{q}_ms': None for q in qs}
+        return {f'p{q}_ms': float(v) * 1000 for q, v in zip(qs, np.percentile(samples, qs))}
+
+
+class _PendingRequest:
+    __slots__ = ('records', 'future', 'version')
+
+    def __init__(self, records):
+        self.records = records
+        self.future = Future()
+        self.version = None  # Versi registry yang menghitung hasilnya (diisi worker)
+
+
+class PredictionService:
+    """Model yang dimuat sekali + worker thread yang menggabungkan permintaan menjadi batch.
+
+    Worker mengambil permintaan pertama dari antrean, lalu menunggu paling lama
+    `max_wait_ms` untuk permintaan lain sampai `max_batch_rows` baris, kemudian
+    menjalankan satu predict_batch untuk semuanya; jika batch gagal, setiap permintaan di dalamnya
+    diprediksi ulang sendiri-sendiri. Jika `cache_size` > 0, predict() menjawab
+    properti yang sudah pernah diprediksi dari cache dan hanya mengantrekan sisanya. Cache
+    terikat pada artefak yang dimuat saat start, jadi tidak perlu memeriksa hash file; dengan
+    `registry_dir`, cache dikosongkan setiap kali versi aktif diganti, dan hasil yang dihitung
+    dengan versi lama tetapi selesai setelah swap tidak dimasukkan ke cache.
+    """
+
+    def __init__(self, preprocessor_path=PREPROCESSOR_PATH, model_path=MODEL_PATH,
+                 max_batch_rows=256, max_wait_ms=2.0, flatten=True, cache_size=4096, cache_ttl=3600.0,
+                 shared_dir=None, registry_dir=None, poll_seconds=5.0):
+        self.models = None
+        if registry_dir is not None:
+            from model_registry import HotSwapModel
+            self.models = HotSwapModel(registry_dir, flatten=flatten, poll_seconds=poll_seconds).start()
+            self.preprocessor = self.model = None
+        elif shared_dir is not None:
+            # Array model di-memory-map dari artefak bersama (model_artifacts.py), sehingga beberapa
+            # proses layanan di satu host memakai satu salinan di page cache
+            self.preprocessor, self.model = load_serving_artifacts(shared_dir, preprocessor_path, model_path,
+                                                                   flatten=flatten)
+        else:
+            self.preprocessor, self.model = load_artifacts(preprocessor_path, model_path, flatten=flatten)
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.request_latency = LatencyRecorder()
+        self.batch_latency = LatencyRecorder()
+        self.batch_rows = collections.deque(maxlen=10000)
+        self.cache = PredictionCache(cache_size, cache_ttl, artifact_version=self.models) if cache_size > 0 else None
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+        self._worker.start()
+        # Panggilan pertama memicu inisialisasi lazy di sklearn; lakukan sebelum melayani klien
+        # (versi dari registry sudah dipanaskan oleh HotSwapModel)
+        if self.models is None:
+            predict_batch(pd.DataFrame([{}]), self.preprocessor, self.model)
+
+    def _predict_frame(self, df, return_version=False):
+        if self.models is not None:
+            return self.models.predict_batch(df, return_version=return_version)
+        predictions = predict_batch(df, self.preprocessor, self.model)
+        return (predictions, None) if return_version else predictions
+
+    def _enqueue(self, records):
+        pending = _PendingRequest(records)
+        self._queue.put(pending)
+        return pending
+
+    def submit(self, records):
+        return self._enqueue(records).future
+
+    def predict_profiled(self, records):
+        """Prediksi langsung di thread pemanggil (tanpa cache dan antrean) di bawah cProfile."""
+        with capture_profile() as profile:
+            predictions = self._predict_frame(pd.DataFrame.from_records(records))
+        return [float(p) for p in predictions], profile.stats_text
+
+    def predict(self, records, timeout=30.0):
+        if self.cache is None:
+            return self.submit(records).result(timeout=timeout)
+        keys = [canonical_key(record) for record in records]
+        predictions = [self.cache.get(key) for key in keys]
+        missing = [i for i, p in enumerate(predictions) if p is None]
+        if missing:
+            pending = self._enqueue([records[i] for i in missing])
+            computed = pending.future.result(timeout=timeout)
+            for i, p in zip(missing, computed):
+                predictions[i] = p
+                self.cache.put(keys[i], p, version=pending.version)
+        return predictions
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+        if self.models is not None:
+            self.models.close()
+
+    def _collect_batch(self, first):
+        batch, n_rows = [first], len(first.records)
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending is None:
+                self._queue.put(None)  # Teruskan sinyal berhenti setelah batch ini selesai
+                break
+            batch.append(pending)
+            n_rows += len(pending.records)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._predict_pending(self._collect_batch(first))
+
+    def _predict_pending(self, batch):
+        records = [record for pending in batch for record in pending.records]
+        start = time.perf_counter()
+        try:
+            predictions, version = self._predict_frame(pd.DataFrame.from_records(records), return_version=True)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # Satu record rusak tidak boleh menggagalkan permintaan klien lain yang kebetulan
+            # satu batch: ulangi per permintaan, hanya yang benar-benar error yang gagal
+            for pending in batch:
+                self._predict_pending([pending])
+            return
+        self.batch_latency.record(time.perf_counter() - start)
+        self.batch_rows.append(len(records))
+
+        offset = 0
+        for pending in batch:
+            n = len(pending.records)
+            pending.version = version  # Sebelum set_result: predict() membacanya setelah result()
+            pending.future.set_result([float(p) for p in predictions[offset:offset + n]])
+            offset += n
+
+    def stats(self):
+        return {
+            'requests': self.request_latency.count,
+            'batches': self.batch_latency.count,
+            'mean_batch_rows': float(np.mean(self.batch_rows)) if self.batch_rows else None,
+            'request_latency': self.request_latency.percentiles(),
+            'batch_latency': self.batch_latency.percentiles(),
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'registry': self.models.stats() if self.models is not None else None,
+        }
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Diisi oleh make_server
+
+    def log_message(self, format, *args):
+        pass  # Jangan tulis log per permintaan ke stderr (mengganggu latensi)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text, content_type='text/plain; version=0.0.4'):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.service.stats())
+        elif self.path == '/metrics':
+            self._send_text(200, REGISTRY.prometheus_text())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path not in ('/predict', '/predict_batch'):
+            self._send_json(404, {'error': 'not found'})
+            return
+        # ?profile=1 -> permintaan ini dijalankan di bawah cProfile dan profilnya ikut dikembalikan
+        profile = parse_qs(url.query).get('profile', ['0'])[0] not in ('0', '')
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            single = url.path == '/predict' and 'instances' not in payload
+            records = [payload] if single else payload['instances']
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                raise ValueError("'instances' harus berupa list of object")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': f'permintaan tidak valid: {e}'})
+            return
+
+        profile_text = None
+        try:
+            if profile and records:
+                predictions, profile_text = self.service.predict_profiled(records)
+            else:
+                predictions = self.service.predict(records) if records else []
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        elapsed = time.perf_counter() - start
+        self.service.request_latency.record(elapsed)
+        REGISTRY.observe('server_request', elapsed)
+        response = {'predicted_price': predictions[0]} if single else {'predicted_prices': predictions}
+        if profile_text is not None:
+            response['profile'] = profile_text
+        self._send_json(200, response)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    handler = type('BoundPredictionRequestHandler', (PredictionRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON untuk prediksi harga rumah.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--max-batch-rows', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--no-flatten', action='store_true', help="Pakai model.predict sklearn langsung")
+    parser.add_argument('--cache-size', type=int, default=4096, help="Jumlah entri cache prediksi (0 = nonaktif)")
+    parser.add_argument('--cache-ttl', type=float, default=3600.0, help="Umur entri cache prediksi (detik)")
+    parser.add_argument('--shared-artifacts', metavar='DIR',
+                        help="Muat artefak memory-mapped dari DIR (lihat model_artifacts.py)")
+    parser.add_argument('--registry', metavar='DIR',
+                        help="Layani versi ACTIVE dari registry model (hot-swap + shadow, lihat model_registry.py)")
+    parser.add_argument('--poll-seconds', type=float, default=5.0, help="Interval pemeriksaan pointer registry")
+    args = parser.parse_args(argv)
+
+    service = PredictionService(args.preprocessor, args.model, max_batch_rows=args.max_batch_rows,
+                                max_wait_ms=args.max_wait_ms, flatten=not args.no_flatten,
+                                cache_size=args.cache_size, cache_ttl=args.cache_ttl,
+                                shared_dir=args.shared_artifacts, registry_dir=args.registry,
+                                poll_seconds=args.poll_seconds)
+    server = make_server(service, args.host, args.port)
+    print(f"Layanan prediksi berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
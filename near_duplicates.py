@@ -0,0 +1,218 @@
+# near_duplicates.py
+# Deteksi listing yang di-repost (url dan ads_id baru, tetapi title/address, lokasi, dan ukuran
+# sama) tanpa membandingkan semua pasangan baris:
+#   1. MinHash: setiap baris diringkas menjadi signature num_perm nilai dari shingle karakter
+#      title + address; proporsi nilai yang sama memperkirakan kemiripan Jaccard.
+#   2. LSH banding + geo-blocking: signature dipotong menjadi `bands` band. Dua baris hanya
+#      menjadi kandidat jika salah satu band-nya identik DAN berada di blok yang sama
+#      (district + lat/long yang dibulatkan).
+#   3. Verifikasi: kandidat diterima jika perkiraan Jaccard >= threshold dan kolom ukuran
+#      (land_size_m2, building_size_m2, bedrooms, bathrooms) sama; pasangan yang diterima
+#      digabung menjadi grup (komponen terhubung).
+# Waktu dan memori sebanding dengan jumlah baris + jumlah kandidat. Hasil di-cache di disk per
+# hash data dan parameter.
+#
+# Contoh:
+#   python near_duplicates.py
+#   python near_duplicates.py --threshold 0.7 --geo-decimals 2 --output near_duplicates.csv
+import argparse
+import re
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import load_listings, source_sha256
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+CACHE_DIR = '.cache'
+# Naikkan jika cara pengelompokan berubah agar hasil lama di cache tidak dipakai
+DEDUP_FORMAT_VERSION = 1
+
+TEXT_COLUMNS = ['title', 'address']
+BLOCK_COLUMNS = ['district']
+MATCH_COLUMNS = ['land_size_m2', 'building_size_m2', 'bedrooms', 'bathrooms']
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.8
+# 3 desimal ~ 110 m; listing yang di-repost umumnya memakai koordinat yang sama persis
+GEO_DECIMALS = 3
+# Bucket LSH lebih besar dari ini dibandingkan ke anggota pertamanya saja (bukan semua pasangan)
+MAX_BUCKET_SIZE = 50
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(text):
+    return _NON_WORD.sub(' ', str(text).lower()).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Himpunan shingle karakter sepanjang `size` dari teks yang sudah dinormalisasi."""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def listing_text(df, columns=TEXT_COLUMNS):
+    return df[columns].astype(object).fillna('').astype(str).agg(' '.join, axis=1)
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=42):
+    """Matriks signature (n, num_perm) uint32; baris tanpa shingle berisi nilai maksimum.
+
+    Permutasi acak diperkirakan dengan (a * x + b) mod (2**61 - 1) atas hash 32-bit shingle,
+    seperti MinHash pada umumnya. Semua shingle diproses sebagai satu array datar per permutasi.
+    """
+    shingle_sets = [shingles(text, shingle_size) for text in texts]
+    lengths = np.fromiter((len(s) for s in shingle_sets), dtype=np.int64, count=len(shingle_sets))
+    signatures = np.full((len(shingle_sets), num_perm), _MAX_HASH, dtype=np.uint64)
+    has_shingles = lengths > 0
+    if not has_shingles.any():
+        return signatures.astype(np.uint32)
+
+    flat = np.array([s for shingle_set in shingle_sets for s in shingle_set], dtype=object)
+    x = pd.util.hash_array(flat) & _MAX_HASH
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])[has_shingles]
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    for i in range(num_perm):
+        # a, x < 2**32 sehingga a * x tidak melewati batas uint64
+        hashed = ((a[i] * x) % _MERSENNE_PRIME + b[i]) % _MERSENNE_PRIME & _MAX_HASH
+        signatures[has_shingles, i] = np.minimum.reduceat(hashed, starts)
+    return signatures.astype(np.uint32)
+
+
+def geo_blocks(df, block_columns=BLOCK_COLUMNS, geo_decimals=GEO_DECIMALS):
+    """Hash blok per baris: kolom blok (dinormalisasi) + lat/long dibulatkan."""
+    blocks = pd.DataFrame({col: df[col].astype(object).fillna('').map(normalize_text) for col in block_columns},
+                          index=df.index)
+    for col in ('lat', 'long'):
+        if col in df.columns:
+            blocks[col] = pd.to_numeric(df[col], errors='coerce').round(geo_decimals)
+    return pd.util.hash_pandas_object(blocks, index=False).to_numpy()
+
+
+def candidate_pairs(signatures, blocks, bands=BANDS, valid=None, max_bucket_size=MAX_BUCKET_SIZE):
+    """Pasangan posisi (i, j), i < j, yang berbagi band LSH di blok yang sama (tanpa duplikat)."""
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) harus habis dibagi bands ({bands})")
+    rows = num_perm // bands
+    positions = np.arange(n) if valid is None else np.flatnonzero(valid)
+    pair_blocks = []
+    for band in range(bands):
+        band_values = pd.DataFrame(signatures[positions, band * rows:(band + 1) * rows])
+        band_values['block'] = blocks[positions]
+        keys = pd.util.hash_pandas_object(band_values, index=False).to_numpy()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(order)]])
+        for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            members = positions[order[start:end]]
+            if len(members) <= max_bucket_size:
+                i, j = np.triu_indices(len(members), k=1)
+                pair_blocks.append(np.column_stack([members[i], members[j]]))
+            else:
+                pair_blocks.append(np.column_stack([np.repeat(members[0], len(members) - 1), members[1:]]))
+    if not pair_blocks:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pair_blocks), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def _values_match(df, pairs, match_columns):
+    # Kolom ukuran harus sama jika keduanya terisi
+    keep = np.ones(len(pairs), dtype=bool)
+    for col in match_columns:
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        left, right = values[pairs[:, 0]], values[pairs[:, 1]]
+        keep &= (left == right) | np.isnan(left) | np.isnan(right)
+    return keep
+
+
+def find_near_duplicates(df, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE,
+                         geo_decimals=GEO_DECIMALS, text_columns=TEXT_COLUMNS, block_columns=BLOCK_COLUMNS,
+                         match_columns=MATCH_COLUMNS):
+    """Grup near-duplicate di df.
+
+    Mengembalikan DataFrame satu baris per anggota grup (hanya grup berisi >= 2 listing) dengan
+    kolom group_id, row (label index df), position, dan is_representative (anggota pertama
+    di setiap grup, yang dipertahankan oleh deduplicate).
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(df)
+    signatures = minhash_signatures(listing_text(df, text_columns), num_perm, shingle_size)
+    valid = signatures[:, 0] != _MAX_HASH
+    pairs = candidate_pairs(signatures, geo_blocks(df, block_columns, geo_decimals), bands, valid)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[(similarity >= threshold) & _values_match(df, pairs, match_columns)]
+
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    members = np.flatnonzero(sizes[labels] > 1)
+    groups = pd.DataFrame({'component': labels[members], 'position': members})
+    # group_id berurutan menurut posisi anggota pertama
+    groups['group_id'] = groups.groupby('component')['position'].transform('min').rank(method='dense').astype(int) - 1
+    groups['row'] = df.index[members]
+    groups['is_representative'] = ~groups.duplicated('group_id')
+    return groups[['group_id', 'row', 'position', 'is_representative']].sort_values(
+        ['group_id', 'position']).reset_index(drop=True)
+
+
+def deduplicate(df, groups):
+    """df tanpa anggota non-representatif dari setiap grup near-duplicate."""
+    drop = groups.loc[~groups['is_representative'], 'row']
+    return df.drop(index=drop)
+
+
+def _near_duplicates_cached(data_sha256, data_path, params, format_version):
+    # data_sha256 dan format_version hanya menjadi kunci cache; isi data dibaca dari data_path
+    return find_near_duplicates(load_listings(data_path), **params)
+
+
+def load_near_duplicates(data_path=DATA_PATH, cache_dir=CACHE_DIR, **params):
+    """Grup near-duplicate untuk file listing; dihitung sekali per hash data + parameter."""
+    memory = joblib.Memory(cache_dir, verbose=0)
+    cached = memory.cache(_near_duplicates_cached, ignore=['data_path'])
+    return cached(source_sha256(data_path), data_path, params, DEDUP_FORMAT_VERSION)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deteksi listing near-duplicate (MinHash/LSH + geo-blocking).")
+    parser.add_argument('input', nargs='?', default=DATA_PATH)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM)
+    parser.add_argument('--bands', type=int, default=BANDS)
+    parser.add_argument('--geo-decimals', type=int, default=GEO_DECIMALS)
+    parser.add_argument('--output', default=None, help="Simpan grup ke CSV")
+    parser.add_argument('--dedup-output', default=None, help="Simpan data tanpa near-duplicate ke CSV")
+    args = parser.parse_args(argv)
+
+    groups = load_near_duplicates(args.input, threshold=args.threshold, num_perm=args.num_perm,
+                                  bands=args.bands, geo_decimals=args.geo_decimals)
+    n_removed = int((~groups['is_representative']).sum())
+    print(f"{groups['group_id'].nunique()} grup near-duplicate, {len(groups)} listing, "
+          f"{n_removed} baris akan dibuang")
+    listings = load_listings(args.input)
+    for _, group in list(groups.groupby('group_id'))[:5]:
+        print(listings.loc[group['row'], ['title', 'address', 'district', 'lat', 'long', 'land_size_m2']].to_string())
+        print()
+    if args.output:
+        groups.to_csv(args.output, index=False)
+    if args.dedup_output:
+        deduplicate(listings, groups).to_csv(args.dedup_output, index=False)
+
+
+if __name__ == '__main__':
+    main()
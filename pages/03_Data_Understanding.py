@@ -1,6 +1,9 @@
 # pages/03_Data_Understanding.py
 import streamlit as st
-import pandas as pd
+from data_access import load_listings
+from data_quality import load_quality_report
+from near_duplicates import load_near_duplicates
+from prediction import iter_listing_chunks
 
 st.set_page_config(
     page_title="Data Understanding",
@@ -12,25 +15,30 @@ st.markdown("---")
 
 st.subheader("1. Memuat Dataset")
 st.write("Dataset harga rumah Jabodetabek dimuat untuk analisis.")
+# Profil data dihitung streaming per chunk (file tidak dimuat utuh ke memori) dan di-cache
+# per hash isi file (lihat data_quality.py)
 try:
-    df_raw = pd.read_csv('jabodetabek_house_price.csv') # Muat ulang dataset
+    report = load_quality_report('jabodetabek_house_price.csv')
     st.write("Dataset berhasil dimuat!")
-    st.dataframe(df_raw.head())
+    st.dataframe(next(iter_listing_chunks('jabodetabek_house_price.csv', 5)))
 except FileNotFoundError:
     st.error("File 'jabodetabek_house_price.csv' tidak ditemukan. Pastikan ada di direktori yang sama.")
-    df_raw = None # Set to None if file not found
+    report = None # Set to None if file not found
 
-if df_raw is not None:
+if report is not None:
+    columns = report['columns']
     st.subheader("2. Informasi Dataset")
-    st.write("Berikut adalah ringkasan informasi dataset:")
-    st.text(df_raw.info(verbose=True, buf=None)) # Menggunakan st.text untuk menampilkan info()
+    st.write("Berikut adalah ringkasan informasi dataset (tipe data, nilai non-null, memori, dan perkiraan jumlah nilai unik):")
+    st.dataframe(columns[['dtype', 'non_null', 'memory_mb', 'approx_distinct']].style.format({
+        'memory_mb': '{:,.2f}', 'approx_distinct': '{:,}'}))
+    st.write(f"Total pemakaian memori: **{report['memory_bytes'] / 2 ** 20:,.2f} MB**")
 
     st.subheader("3. Ukuran Dataset")
-    st.write(f"Dataset memiliki **{df_raw.shape[0]} baris** dan **{df_raw.shape[1]} kolom**.")
+    st.write(f"Dataset memiliki **{report['n_rows']} baris** dan **{report['n_columns']} kolom**.")
 
     st.subheader("4. Missing Values")
     st.write("Jumlah *missing values* (nilai hilang) per kolom:")
-    missing_values = df_raw.isnull().sum()
+    missing_values = columns['nulls']
     missing_values = missing_values[missing_values > 0]
     if not missing_values.empty:
         st.dataframe(missing_values.rename('Jumlah Missing Values'))
@@ -39,10 +47,24 @@ if df_raw is not None:
 
     st.subheader("5. Duplikasi Data")
     st.write("Jumlah data duplikat (baris identik):")
-    duplicated_count = df_raw.duplicated().sum()
+    duplicated_count = report['duplicate_rows']
     st.write(f"Jumlah data duplikat: **{duplicated_count}**")
     if duplicated_count > 0:
         st.write("Contoh baris duplikat:")
-        st.dataframe(df_raw[df_raw.duplicated()].head())
+        st.dataframe(report['duplicate_examples'])
     else:
-        st.info("Tidak ada data duplikat di dataset.")
\ No newline at end of file
+        st.info("Tidak ada data duplikat di dataset.")
+
+    st.subheader("6. Listing Near-Duplicate")
+    st.write("Listing yang di-repost dengan url/ads_id baru tetapi judul, alamat, lokasi, dan ukuran yang sama "
+             "(MinHash/LSH atas judul + alamat, dibatasi per district dan koordinat; lihat near_duplicates.py):")
+    near_duplicates = load_near_duplicates('jabodetabek_house_price.csv')
+    n_removed = int((~near_duplicates['is_representative']).sum())
+    st.write(f"Jumlah grup near-duplicate: **{near_duplicates['group_id'].nunique()}** "
+             f"({n_removed} baris di luar listing pertama setiap grup)")
+    if n_removed > 0:
+        st.write("Contoh grup near-duplicate:")
+        example_groups = near_duplicates[near_duplicates['group_id'] < 5]
+        listings = load_listings('jabodetabek_house_price.csv', columns=['title', 'address', 'district', 'lat',
+                                                                         'long', 'land_size_m2', 'price_in_rp'])
+        st.dataframe(listings.loc[example_groups['row']].assign(group_id=example_groups['group_id'].to_numpy()))
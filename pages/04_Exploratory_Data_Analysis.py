@@ -1,9 +1,7 @@
 # pages/04_Exploratory_Data_Analysis.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import altair as alt
+from eda_aggregates import load_eda_aggregates
 
 st.set_page_config(
     page_title="Exploratory Data Analysis",
@@ -15,74 +13,66 @@ st.markdown("---")
 
 st.write("Melakukan analisis statistik dan visualisasi untuk memahami karakteristik dan pola dalam data harga rumah.")
 
-# Memuat dan pra-proses data seperti di notebook agar EDA konsisten
-@st.cache_data # Cache data agar tidak diulang setiap kali halaman dimuat
-def load_and_preprocess_data(file_path):
-    df_eda = pd.read_csv(file_path)
-    
-    # Penanganan Missing Values (dari notebook cell 10)
-    num_cols = df_eda.select_dtypes(include=[np.number]).columns
-    df_eda[num_cols] = df_eda[num_cols].apply(lambda x: x.fillna(x.median()))
-    cat_cols = df_eda.select_dtypes(include=['object']).columns
-    df_eda[cat_cols] = df_eda[cat_cols].apply(lambda x: x.fillna(x.mode()[0] if not x.mode().empty else 'Unknown'))
-    
-    # Feature Engineering (dari notebook cell 11)
-    df_eda['price_per_m2'] = df_eda['price_in_rp'] / df_eda['land_size_m2']
-    df_eda['total_rooms'] = df_eda['bedrooms'] + df_eda['bathrooms'] + df_eda['maid_bedrooms'] + df_eda['maid_bathrooms']
-    
-    def age_category(age):
-        if pd.isnull(age):
-            return 'unknown'
-        elif age <= 2:
-            return 'baru'
-        elif age <= 10:
-            return 'sedang'
-        else:
-            return 'lama'
-    df_eda['house_age_category'] = df_eda['building_age'].apply(age_category)
-    return df_eda
+# Grafik digambar dari agregat kecil (bin histogram, KDE di grid tetap, kuantil per kota,
+# hitungan kategori, matriks korelasi) yang dihitung sekali per hash data (lihat eda_aggregates.py),
+# sehingga waktu render tidak bergantung pada jumlah listing.
+aggregates = load_eda_aggregates('jabodetabek_house_price.csv')
 
-df_eda = load_and_preprocess_data('jabodetabek_house_price.csv')
-
-if df_eda is not None:
+if aggregates is not None:
     st.subheader("1. Statistik Deskriptif")
     st.write("Statistik deskriptif untuk kolom numerik:")
-    st.dataframe(df_eda.describe())
+    st.dataframe(aggregates['describe_numeric'])
     st.write("Statistik deskriptif untuk kolom kategorikal:")
-    st.dataframe(df_eda.describe(include='object'))
+    st.dataframe(aggregates['describe_categorical'])
 
     st.subheader("2. Distribusi Harga Rumah")
-    fig1, ax1 = plt.subplots(figsize=(10, 5))
-    sns.histplot(df_eda['price_in_rp'], bins=50, kde=True, ax=ax1)
-    ax1.set_title('Distribusi Harga Rumah')
-    ax1.set_xlabel('Harga (Rp)')
-    ax1.set_ylabel('Jumlah')
-    st.pyplot(fig1)
+    bars = alt.Chart(aggregates['price_histogram']).mark_bar(opacity=0.6).encode(
+        x=alt.X('bin_start:Q', bin='binned', title='Harga (Rp)'),
+        x2='bin_end:Q',
+        y=alt.Y('count:Q', title='Jumlah'),
+        tooltip=['bin_start:Q', 'bin_end:Q', 'count:Q'],
+    )
+    kde_line = alt.Chart(aggregates['price_kde']).mark_line(color='#1f4e79').encode(x='x:Q', y='count:Q')
+    st.altair_chart((bars + kde_line).properties(title='Distribusi Harga Rumah', height=350),
+                    use_container_width=True)
     st.write("Visualisasi ini menunjukkan distribusi harga rumah. Tampak ada *outlier* dengan harga sangat tinggi.")
 
     st.subheader("3. Matriks Korelasi Fitur Numerik")
-    fig2, ax2 = plt.subplots(figsize=(12, 8))
-    sns.heatmap(df_eda.corr(numeric_only=True), annot=True, cmap='coolwarm', fmt='.2f', ax=ax2)
-    ax2.set_title('Heatmap Korelasi Fitur Numerik')
-    st.pyplot(fig2)
+    corr = aggregates['correlation'].rename_axis('fitur_x').reset_index().melt(
+        id_vars='fitur_x', var_name='fitur_y', value_name='korelasi')
+    heatmap = alt.Chart(corr).mark_rect().encode(
+        x=alt.X('fitur_x:N', sort=None, title=None),
+        y=alt.Y('fitur_y:N', sort=None, title=None),
+        color=alt.Color('korelasi:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1], reverse=True)),
+        tooltip=['fitur_x:N', 'fitur_y:N', alt.Tooltip('korelasi:Q', format='.2f')],
+    )
+    labels = heatmap.mark_text(fontSize=9).encode(text=alt.Text('korelasi:Q', format='.2f'), color=alt.value('black'))
+    st.altair_chart((heatmap + labels).properties(title='Heatmap Korelasi Fitur Numerik', height=550),
+                    use_container_width=True)
     st.write("Heatmap ini menggambarkan korelasi antara fitur-fitur numerik. Fitur dengan korelasi tinggi terhadap harga (`price_in_rp`) adalah `building_size_m2`, `land_size_m2`, dan `price_per_m2`.")
 
     st.subheader("4. Distribusi Harga Berdasarkan Kota")
-    fig3, ax3 = plt.subplots(figsize=(12, 6))
-    sns.boxplot(x='city', y='price_in_rp', data=df_eda, ax=ax3)
-    ax3.set_title('Distribusi Harga Rumah per Kota')
-    ax3.set_xlabel('Kota')
-    ax3.set_ylabel('Harga (Rp)')
-    st.pyplot(fig3)
-    st.write("Grafik ini menunjukkan variasi harga rumah antar kota. Beberapa kota mungkin memiliki median harga yang lebih tinggi atau sebaran harga yang lebih luas.")
+    box = alt.Chart(aggregates['price_box_by_city'])
+    box_x = alt.X('city:N', title='Kota')
+    whiskers = box.mark_rule().encode(x=box_x, y=alt.Y('whisker_low:Q', title='Harga (Rp)'), y2='whisker_high:Q')
+    boxes = box.mark_bar(size=28).encode(
+        x=box_x, y='q1:Q', y2='q3:Q', color=alt.Color('city:N', legend=None),
+        tooltip=['city:N', 'n:Q', 'q1:Q', 'median:Q', 'q3:Q', 'n_outliers:Q'],
+    )
+    medians = box.mark_tick(color='white', size=28).encode(x=box_x, y='median:Q')
+    st.altair_chart((whiskers + boxes + medians).properties(title='Distribusi Harga Rumah per Kota', height=400),
+                    use_container_width=True)
+    st.write("Grafik ini menunjukkan variasi harga rumah antar kota. Beberapa kota mungkin memiliki median harga yang lebih tinggi atau sebaran harga yang lebih luas. "
+             "Jumlah *outlier* (di luar 1.5 IQR) per kota tersedia di tooltip.")
 
     # Tambahkan visualisasi lain yang relevan dari notebook Anda
     # Contoh: Distribusi Usia Bangunan per Kategori
     st.subheader("5. Distribusi Usia Bangunan")
-    fig4, ax4 = plt.subplots(figsize=(10, 5))
-    sns.countplot(x='house_age_category', data=df_eda, ax=ax4, palette='viridis')
-    ax4.set_title('Distribusi Kategori Usia Rumah')
-    ax4.set_xlabel('Kategori Usia Rumah')
-    ax4.set_ylabel('Jumlah Properti')
-    st.pyplot(fig4)
-    st.write("Mayoritas properti berada dalam kategori 'baru' dan 'sedang'.")
\ No newline at end of file
+    age_chart = alt.Chart(aggregates['age_category_counts']).mark_bar().encode(
+        x=alt.X('house_age_category:N', title='Kategori Usia Rumah'),
+        y=alt.Y('count:Q', title='Jumlah Properti'),
+        color=alt.Color('house_age_category:N', scale=alt.Scale(scheme='viridis'), legend=None),
+    )
+    st.altair_chart(age_chart.properties(title='Distribusi Kategori Usia Rumah', height=350),
+                    use_container_width=True)
+    st.write("Mayoritas properti berada dalam kategori 'baru' dan 'sedang'.")
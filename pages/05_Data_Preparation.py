@@ -1,7 +1,6 @@
 # pages/05_Data_Preparation.py
 import streamlit as st
-import pandas as pd
-import numpy as np
+from feature_engineering import get_prepared_df
 
 st.set_page_config(
     page_title="Data Preparation",
@@ -20,32 +19,8 @@ Pada kasus ini, *missing values* pada kolom numerik diisi dengan **median** dari
 sementara *missing values* pada kolom kategorikal diisi dengan **modus** (nilai yang paling sering muncul) atau 'Unknown' jika tidak ada modus.
 """)
 
-# Load data to show effect of preprocessing
-@st.cache_data
-def get_processed_df(file_path):
-    df_prep = pd.read_csv(file_path)
-    # Replicate preprocessing from notebook cell 10 & 11
-    num_cols_prep = df_prep.select_dtypes(include=[np.number]).columns
-    df_prep[num_cols_prep] = df_prep[num_cols_prep].apply(lambda x: x.fillna(x.median()))
-    cat_cols_prep = df_prep.select_dtypes(include=['object']).columns
-    df_prep[cat_cols_prep] = df_prep[cat_cols_prep].apply(lambda x: x.fillna(x.mode()[0] if not x.mode().empty else 'Unknown'))
-
-    df_prep['price_per_m2'] = df_prep['price_in_rp'] / df_prep['land_size_m2']
-    df_prep['total_rooms'] = df_prep['bedrooms'] + df_prep['bathrooms'] + df_prep['maid_bedrooms'] + df_prep['maid_bathrooms']
-    
-    def age_category(age):
-        if pd.isnull(age):
-            return 'unknown'
-        elif age <= 2:
-            return 'baru'
-        elif age <= 10:
-            return 'sedang'
-        else:
-            return 'lama'
-    df_prep['house_age_category'] = df_prep['building_age'].apply(age_category)
-    return df_prep
-
-df_prepared = get_processed_df('jabodetabek_house_price.csv')
+# Load data to show effect of preprocessing (notebook cell 10 & 11, lihat feature_engineering.py)
+df_prepared = get_prepared_df('jabodetabek_house_price.csv')
 
 if df_prepared is not None:
     st.write("Setelah penanganan *missing values*, tidak ada lagi nilai yang hilang:")
@@ -84,9 +59,10 @@ st.subheader("5. Preprocessing Pipeline (Scaling dan Encoding)")
 st.write("""
 Pipeline pra-pemrosesan (`ColumnTransformer`) digunakan untuk mengotomatisasi transformasi fitur:
 -   **Fitur Numerik**: Diskala menggunakan `StandardScaler` untuk menstandarkan rentang nilai.
--   **Fitur Kategorikal**: Di-*encode* menggunakan `OneHotEncoder` untuk mengubahnya menjadi format numerik yang dapat dipahami model. `handle_unknown='ignore'` digunakan untuk menangani kategori baru yang mungkin muncul di data *testing*.
+-   **Fitur Kategorikal**: Di-*encode* menggunakan `OneHotEncoder` untuk mengubahnya menjadi format numerik yang dapat dipahami model. `handle_unknown='ignore'` digunakan untuk menangani kategori baru yang mungkin muncul di data *testing*; distrik yang muncul kurang dari 10 kali digabung menjadi satu kategori.
+-   **Fitur Teks** (`address`, `facilities`): Di-*hash* ke jumlah kolom tetap dengan `HashingVectorizer`. Kolom identitas (`url`, `ads_id`) dan judul iklan (`title`) dibuang.
 """)
-st.write("Proses *fit_transform* dilakukan pada data *training* dan *transform* pada data *testing*.")
-# Statistik dari notebook cell 15
-st.write("Shape X_train_processed: (2842, 10811)")
-st.write("Shape X_test_processed: (711, 10811)")
\ No newline at end of file
+st.write("Proses *fit_transform* dilakukan pada data *training* dan *transform* pada data *testing*. Hasilnya berupa matriks *sparse* (CSR).")
+# Statistik dari preprocessor.pkl (preprocessing.build_preprocessor)
+st.write("Shape X_train_processed: (2842, 473)")
+st.write("Shape X_test_processed: (711, 473)")
\ No newline at end of file
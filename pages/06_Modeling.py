@@ -1,10 +1,8 @@
 # pages/06_Modeling.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error # Only for displaying metrics
+from data_access import cached_file_sha256
+from model_registry import active_version, list_versions, read_metadata
 
 st.set_page_config(
     page_title="Modeling",
@@ -25,29 +23,54 @@ Metrik evaluasi utama untuk regresi adalah:
 -   **R2 Score (Coefficient of Determination)**: Mengukur seberapa baik model menjelaskan variabilitas data target. Rentang 0 hingga 1, semakin mendekati 1 semakin baik.
 """)
 
-st.write("Berikut adalah ringkasan hasil evaluasi model regresi yang dilatih di *notebook*:")
+st.write("Berikut adalah ringkasan hasil evaluasi model regresi pada data *testing* (fitur dari preprocessor *sparse*):")
 
-# Data ini hardcoded dari output cell 16 di notebook Anda
+# Hasil tahap compare_models di python pipeline.py --no-dedup (split dan parameter default seperti notebook)
 results_data = {
-    'Linear Regression': {'RMSE': 4.336412e+09, 'MAE': 1.990787e+09, 'R2': 0.742189},
-    'Ridge Regression': {'RMSE': 4.327017e+09, 'MAE': 1.984019e+09, 'R2': 0.743305},
-    'Lasso Regression': {'RMSE': 5.276377e+09, 'MAE': 2.825157e+09, 'R2': 0.618309},
-    'Decision Tree': {'RMSE': 6.034670e+09, 'MAE': 1.013474e+09, 'R2': 0.500716},
-    'Random Forest': {'RMSE': 3.947169e+09, 'MAE': 6.777262e+08, 'R2': 0.786395},
-    'Gradient Boosting': {'RMSE': 3.077916e+09, 'MAE': 7.506862e+08, 'R2': 0.870117},
-    'Support Vector Regressor': {'RMSE': 8.918639e+09, 'MAE': 3.231745e+09, 'R2': -0.090530}
+    'Linear Regression': {'RMSE': 5.127825e+09, 'MAE': 2.481120e+09, 'R2': 0.639499},
+    'Ridge Regression': {'RMSE': 4.672960e+09, 'MAE': 2.166941e+09, 'R2': 0.700619},
+    'Lasso Regression': {'RMSE': 5.189164e+09, 'MAE': 2.479697e+09, 'R2': 0.630823},
+    'Decision Tree': {'RMSE': 7.094695e+09, 'MAE': 1.186477e+09, 'R2': 0.309907},
+    'Random Forest': {'RMSE': 4.820999e+09, 'MAE': 8.288732e+08, 'R2': 0.681350},
+    'Gradient Boosting': {'RMSE': 2.983769e+09, 'MAE': 7.539445e+08, 'R2': 0.877941},
+    'Support Vector Regressor': {'RMSE': 8.918639e+09, 'MAE': 3.231745e+09, 'R2': -0.090530},
+    'Hist Gradient Boosting': {'RMSE': 5.919203e+09, 'MAE': 1.268539e+09, 'R2': 0.519640}
 }
 results_df = pd.DataFrame(results_data).T
 st.dataframe(results_df.style.format({"RMSE": "{:,.2f}", "MAE": "{:,.2f}", "R2": "{:.4f}"}))
 
 st.markdown("""
-Dari hasil di atas, **Gradient Boosting** menunjukkan performa terbaik dengan R2 Score tertinggi (0.8701) dan RMSE terendah.
+Dari hasil di atas, **Gradient Boosting** menunjukkan performa terbaik dengan R2 Score tertinggi (0.8779) dan RMSE terendah.
 Model ini kemudian dilakukan *hyperparameter tuning* untuk mendapatkan performa optimal.
 """)
 st.write("**Hasil Evaluasi Model Terbaik Setelah Tuning (Gradient Boosting):**")
-st.write(f"- RMSE: Rp. 3.188.174.390,20") # From notebook cell 17 output
-st.write(f"- MAE: Rp. 649.374.661,97") # From notebook cell 17 output
-st.write(f"- R2 Score: 0.8606") # From notebook cell 17 output
+# Model di best_model.pkl (tahap fit_best pipeline yang sama): learning_rate=0.1, max_depth=3, n_estimators=300
+st.write(f"- RMSE: Rp. 2.780.652.049,47")
+st.write(f"- MAE: Rp. 603.658.282,02")
+st.write(f"- R2 Score: 0.8940")
+
+# Versi model yang terdaftar di registry (python model_registry.py list), beserta metrik evaluasinya
+registry_versions = list_versions()
+if registry_versions:
+    st.write("**Versi Model di Registry:**")
+    current_version = active_version()
+    registry_df = pd.DataFrame([
+        {'versi': version, 'aktif': version == current_version, 'model': metadata.get('model_name'),
+         'dibuat': metadata['created_at'], **(metadata.get('metrics') or {})}
+        for version in registry_versions
+        for metadata in [read_metadata(version)]
+    ]).set_index('versi')
+    metric_formats = {"RMSE": "{:,.2f}", "MAE": "{:,.2f}", "R2": "{:.4f}"}
+    st.dataframe(registry_df.style.format({col: fmt for col, fmt in metric_formats.items() if col in registry_df},
+                                          na_rep='-'))
+    # Versi aktif bisa berasal dari pipeline lain (mis. python incremental.py --publish); metrik di atas
+    # hanya berlaku untuk best_model.pkl
+    if current_version is not None:
+        active = read_metadata(current_version)
+        if active['files'].get('model', {}).get('sha256') != cached_file_sha256('best_model.pkl'):
+            st.warning(f"Halaman prediksi memakai versi aktif registry v{current_version:04d} "
+                       f"({active.get('model_name') or 'model'}), bukan best_model.pkl. Metrik setelah tuning di atas "
+                       f"menggambarkan best_model.pkl; metrik versi aktif ada di tabel registry.")
 
 st.subheader("2. Model Unsupervised Learning (Klastering)")
 st.write("""
@@ -1,14 +1,8 @@
 # pages/08_Analisis_Klastering.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import KMeans # Needed for KMeans
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+import altair as alt
+from cluster_summary import load_cluster_summary
+from metrics import show_debug_sidebar, write_metrics_file
 
 
 st.set_page_config(
@@ -20,68 +14,35 @@ st.markdown("<h1 style='color:#2E86C1;'>Analisis Klastering Data Rumah</h1>", un
 st.markdown("---")
 st.write("Halaman ini menampilkan hasil analisis klastering pada data rumah untuk mengidentifikasi segmen-segmen properti yang berbeda.")
 
-# Load and preprocess data for clustering
-@st.cache_data # Cache data to avoid re-running every time the page is loaded
-def load_and_cluster_data(file_path, preprocessor_path, kmeans_model_path):
-    df_cluster_analysis = pd.read_csv(file_path)
-    
-    # Replicate preprocessing and feature engineering from notebook
-    num_cols_analysis = df_cluster_analysis.select_dtypes(include=[np.number]).columns
-    df_cluster_analysis[num_cols_analysis] = df_cluster_analysis[num_cols_analysis].apply(lambda x: x.fillna(x.median()))
-    cat_cols_analysis = df_cluster_analysis.select_dtypes(include=['object']).columns
-    df_cluster_analysis[cat_cols_analysis] = df_cluster_analysis[cat_cols_analysis].apply(lambda x: x.fillna(x.mode()[0] if not x.mode().empty else 'Unknown'))
-
-    df_cluster_analysis['price_per_m2'] = df_cluster_analysis['price_in_rp'] / df_cluster_analysis['land_size_m2']
-    df_cluster_analysis['total_rooms'] = df_cluster_analysis['bedrooms'] + df_cluster_analysis['bathrooms'] + df_cluster_analysis['maid_bedrooms'] + df_cluster_analysis['maid_bathrooms']
-    
-    def age_category(age):
-        if pd.isnull(age):
-            return 'unknown'
-        elif age <= 2:
-            return 'baru'
-        elif age <= 10:
-            return 'sedang'
-        else:
-            return 'lama'
-    df_cluster_analysis['house_age_category'] = df_cluster_analysis['building_age'].apply(age_category)
-
-    # Prepare X for clustering (dropping the target 'price_in_rp')
-    X_clustering_features_raw = df_cluster_analysis.drop('price_in_rp', axis=1)
-    # Load the preprocessor
-    loaded_preprocessor = joblib.load(preprocessor_path)
-    X_cluster_processed = loaded_preprocessor.transform(X_clustering_features_raw)
-
-    # Load the KMeans model
-    loaded_kmeans_model = joblib.load(kmeans_model_path)
-    
-    cluster_labels = loaded_kmeans_model.predict(X_cluster_processed)
-    df_cluster_analysis['cluster'] = cluster_labels
-    return df_cluster_analysis
-
+# Label dan statistik klaster dihitung offline (python cluster_summary.py) dan disimpan di
+# cluster_summary.pkl; dihitung ulang otomatis (ke .cache/) hanya jika hash data atau model berubah.
+# Grafik digambar dari agregat di artefak itu (jumlah dan kuantil harga per klaster).
 try:
-    df_clustered = load_and_cluster_data('jabodetabek_house_price.csv', 'preprocessor.pkl', 'kmeans_cluster_model.pkl')
+    summary = load_cluster_summary('jabodetabek_house_price.csv', 'preprocessor.pkl', 'kmeans_cluster_model.pkl')
+    write_metrics_file()  # Hanya jika env PRICE_METRICS_FILE diisi
+    show_debug_sidebar()
 
     st.subheader("1. Distribusi Data per Klaster")
     st.write("Jumlah properti yang termasuk dalam setiap klaster:")
-    st.dataframe(df_clustered['cluster'].value_counts().rename('Jumlah Data per Klaster'))
+    st.dataframe(summary['cluster_counts'])
+    cluster_model = summary['cluster_model']
+    if cluster_model['reduction'] is not None:
+        st.caption(f"K-Means (k={cluster_model['k']}) dilatih setelah reduksi dimensi {cluster_model['reduction']}: "
+                   f"{cluster_model['n_features_in']:,} kolom hasil preprocessing menjadi "
+                   f"{cluster_model['n_components']} komponen.")
     
-    fig_count_dist = plt.figure(figsize=(8, 5))
-    sns.countplot(x='cluster', data=df_clustered, palette='viridis')
-    plt.title('Jumlah Data per Klaster')
-    plt.xlabel('Klaster')
-    plt.ylabel('Jumlah')
-    st.pyplot(fig_count_dist)
+    cluster_counts = summary['cluster_counts'].rename_axis('cluster').reset_index(name='count')
+    count_chart = alt.Chart(cluster_counts).mark_bar().encode(
+        x=alt.X('cluster:O', title='Klaster'),
+        y=alt.Y('count:Q', title='Jumlah'),
+        color=alt.Color('cluster:O', scale=alt.Scale(scheme='viridis'), legend=None),
+    )
+    st.altair_chart(count_chart.properties(title='Jumlah Data per Klaster', height=350), use_container_width=True)
 
     st.subheader("2. Statistik Deskriptif Tiap Klaster")
     st.write("Rata-rata fitur-fitur penting untuk setiap klaster:")
     
-    # Define numerical columns for statistical summary
-    numerical_cols_for_summary = [
-        'price_in_rp', 'land_size_m2', 'building_size_m2', 'bedrooms',
-        'bathrooms', 'total_rooms', 'price_per_m2', 'floors', 'building_age', 'garages'
-    ]
-    
-    cluster_summary_df = df_clustered.groupby('cluster')[numerical_cols_for_summary].agg(['count', 'mean', 'median', 'min', 'max'])
+    cluster_summary_df = summary['cluster_summary_df']
     st.dataframe(cluster_summary_df.style.format({
         ('price_in_rp', 'mean'): "Rp.{:,.0f}", ('price_in_rp', 'median'): "Rp.{:,.0f}",
         ('price_in_rp', 'min'): "Rp.{:,.0f}", ('price_in_rp', 'max'): "Rp.{:,.0f}",
@@ -97,12 +58,16 @@ try:
         """)
 
     st.subheader("4. Visualisasi Harga per Klaster")
-    fig_boxplot, ax_boxplot = plt.subplots(figsize=(10, 6))
-    sns.boxplot(x='cluster', y='price_in_rp', data=df_clustered, palette='viridis', ax=ax_boxplot)
-    ax_boxplot.set_title('Distribusi Harga Rumah per Klaster')
-    ax_boxplot.set_xlabel('Klaster')
-    ax_boxplot.set_ylabel('Harga (Rp)')
-    st.pyplot(fig_boxplot)
+    box = alt.Chart(summary['price_box_by_cluster'])
+    box_x = alt.X('cluster:O', title='Klaster')
+    whiskers = box.mark_rule().encode(x=box_x, y=alt.Y('whisker_low:Q', title='Harga (Rp)'), y2='whisker_high:Q')
+    boxes = box.mark_bar(size=40).encode(
+        x=box_x, y='q1:Q', y2='q3:Q', color=alt.Color('cluster:O', scale=alt.Scale(scheme='viridis'), legend=None),
+        tooltip=['cluster:O', 'n:Q', 'q1:Q', 'median:Q', 'q3:Q', 'n_outliers:Q'],
+    )
+    medians = box.mark_tick(color='white', size=40).encode(x=box_x, y='median:Q')
+    st.altair_chart((whiskers + boxes + medians).properties(title='Distribusi Harga Rumah per Klaster', height=400),
+                    use_container_width=True)
     st.write("Visualisasi ini dengan jelas menunjukkan perbedaan rentang harga antar klaster.")
 
 except FileNotFoundError:
@@ -1,11 +1,6 @@
 # pages/07_House_Price_Prediction.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from metrics import capture_profile, show_debug_sidebar, stage, write_metrics_file
 
 
 st.set_page_config(
@@ -13,13 +8,38 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load preprocessor and model
-try:
-    preprocessor = joblib.load('preprocessor.pkl')
-    model = joblib.load('best_model.pkl')
-except FileNotFoundError:
-    st.error("File model atau preprocessor tidak ditemukan. Pastikan 'preprocessor.pkl' dan 'best_model.pkl' ada di direktori yang sama.")
-    st.stop() # Hentikan eksekusi jika file tidak ditemukan
+# Prediksi dilayani oleh model_server.py (model tetap dimuat di proses layanan).
+# Jika layanan tidak berjalan, preprocessor dan model dimuat sekali per versi artefak.
+# Hasil prediksi per properti disimpan di cache LRU yang dikosongkan saat artefak berubah.
+# Jika registry model (model_registry.py) punya versi ACTIVE, versi itulah yang dipakai; mengganti
+# versi aktif membuat kunci versi berubah sehingga artefak baru dimuat tanpa restart.
+# Modul registry, cache, klien layanan, dan skenario (semuanya menarik pandas lewat prediction.py)
+# diimpor di cabang yang memakainya, bukan di tingkat modul (lihat import_report.py).
+@st.cache_resource
+def get_prediction_cache():
+    from model_registry import RegistryVersion
+    from prediction_cache import ArtifactVersion, PredictionCache
+    return PredictionCache(max_entries=4096, ttl_seconds=3600.0,
+                           artifact_version=RegistryVersion(fallback=ArtifactVersion('preprocessor.pkl',
+                                                                                     'best_model.pkl')))
+
+@st.cache_resource
+def load_local_artifacts(artifact_version):
+    # artifact_version hanya menjadi kunci cache_resource. sklearn/joblib baru diimpor di sini,
+    # jadi halaman tetap cepat dimuat selama layanan prediksi berjalan. Jika artefak bersama
+    # (python model_artifacts.py) tersedia, array model di-memory-map dan dipakai bersama antar worker.
+    if artifact_version.startswith('registry-v'):
+        from model_registry import load_version
+        preprocessor, model, _ = load_version(int(artifact_version[len('registry-v'):]))
+        return preprocessor, model
+    from model_artifacts import load_serving_artifacts
+    return load_serving_artifacts(preprocessor_path='preprocessor.pkl', model_path='best_model.pkl')
+
+# Indeks spasial listing (.cache/spatial_index.pkl) untuk properti pembanding; dibangun ulang hanya jika data berubah
+@st.cache_resource
+def load_comparable_index():
+    from spatial_index import load_spatial_index
+    return load_spatial_index('jabodetabek_house_price.csv')
 
 # Helper for currency formatting
 def format_rupiah(value):
@@ -32,78 +52,44 @@ def predict_house_price(
     price_per_m2, total_rooms,
     district, city, property_type, property_condition, building_orientation, furnishing, house_age_category
 ):
-    # Compose input as DataFrame with correct column order
-    input_dict = {
-        'lat': [lat],
-        'long': [long],
-        'bedrooms': [bedrooms],
-        'bathrooms': [bathrooms],
-        'land_size_m2': [land_size_m2],
-        'building_size_m2': [building_size_m2],
-        'carports': [carports],
-        'maid_bedrooms': [maid_bedrooms],
-        'maid_bathrooms': [maid_bathrooms],
-        'floors': [floors],
-        'building_age': [building_age],
-        'year_built': [year_built],
-        'garages': [garages],
-        'price_per_m2': [price_per_m2],
-        'total_rooms': [total_rooms],
-        'district': [district],
-        'city': [city],
-        'property_type': [property_type],
-        'property_condition': [property_condition],
-        'building_orientation': [building_orientation],
-        'furnishing': [furnishing],
-        'house_age_category': [house_age_category]
-    }
-    input_df = pd.DataFrame(input_dict)
-    
-    # Get the exact column order from the preprocessor's numerical and categorical features
-    # This requires knowing the original num_features and cat_features lists from your notebook.
-    # A more robust way would be to save these lists alongside the preprocessor/model.
-    # For now, let's explicitly list them as they were in your notebook's X.columns.
-    # From tubes.ipynb cell 13:
-    all_X_columns_template = [
-        'url', 'title', 'address', 'district', 'city', 'lat', 'long', 'facilities',
-        'property_type', 'ads_id', 'bedrooms', 'bathrooms', 'land_size_m2', 'building_size_m2',
-        'carports', 'certificate', 'electricity', 'maid_bedrooms', 'maid_bathrooms', 'floors',
-        'building_age', 'year_built', 'property_condition', 'building_orientation', 'garages',
-        'furnishing', 'price_per_m2', 'total_rooms', 'house_age_category'
-    ]
-
-    # Create a dummy DataFrame with all expected columns and fill with placeholders
-    # then update with user inputs. This ensures all columns are present and in order.
-    # Default values for columns not directly taken as input:
-    default_vals = {
-        'url': 'http://dummy.url/',
-        'title': 'Dummy Title',
-        'address': 'Dummy Address',
-        'facilities': 'None', # Or a common value from your data
-        'ads_id': 'dummy_id',
-        'certificate': 'shm - sertifikat hak milik', # Common from your data
-        'electricity': '2200 mah' # Common from your data
+    # Kolom yang tidak diisi pengguna (url, title, certificate, ...) diisi DEFAULT_VALUES
+    # dan diurutkan sesuai kolom training di prediction.build_feature_frame
+    features = {
+        'lat': lat,
+        'long': long,
+        'bedrooms': bedrooms,
+        'bathrooms': bathrooms,
+        'land_size_m2': land_size_m2,
+        'building_size_m2': building_size_m2,
+        'carports': carports,
+        'maid_bedrooms': maid_bedrooms,
+        'maid_bathrooms': maid_bathrooms,
+        'floors': floors,
+        'building_age': building_age,
+        'year_built': year_built,
+        'garages': garages,
+        'price_per_m2': price_per_m2,
+        'total_rooms': total_rooms,
+        'district': district,
+        'city': city,
+        'property_type': property_type,
+        'property_condition': property_condition,
+        'building_orientation': building_orientation,
+        'furnishing': furnishing,
+        'house_age_category': house_age_category
     }
-    
-    # Create an empty DataFrame with the correct column order
-    full_input_df = pd.DataFrame(columns=all_X_columns_template)
-    
-    # Create a single row dictionary from user inputs + defaults
-    single_row_data_for_full_df = {}
-    for col in all_X_columns_template:
-        if col in input_dict:
-            single_row_data_for_full_df[col] = input_dict[col][0]
-        else:
-            single_row_data_for_full_df[col] = default_vals.get(col, None) # Use .get() with None default for safety
-
-    # Append the single row to the full_input_df
-    # Using concat for newer pandas versions is common
-    full_input_df = pd.concat([full_input_df, pd.DataFrame([single_row_data_for_full_df])], ignore_index=True)
-
-
-    processed_input = preprocessor.transform(full_input_df)
-    predicted_price = model.predict(processed_input)[0]
-    return predicted_price
+    cache = get_prediction_cache()
+    return cache.get_or_compute(features, lambda f: _predict_uncached(f, cache.artifact_version.current()))
+
+def _predict_uncached(features, artifact_version):
+    from prediction_client import ServiceUnavailable, predict as predict_via_service
+    try:
+        with stage('prediction_service_call'):
+            return predict_via_service(features)
+    except ServiceUnavailable:
+        from prediction import predict_one
+        preprocessor, model = load_local_artifacts(artifact_version)
+        return float(predict_one(features, preprocessor, model))
 
 # --- Streamlit UI ---
 st.markdown("<h1 style='color:#2E86C1;'>Prediksi Harga Rumah</h1>", unsafe_allow_html=True)
@@ -114,11 +100,25 @@ st.markdown("""
     """, unsafe_allow_html=True)
 st.markdown("---")
 
-# Static metrics (from notebook, Gradient Boosting)
-st.info("**Performa Model Terbaik (Gradient Boosting):** \n"
-          "RMSE: Rp. 3.077.916.144,00  \n" # Dari tubes.ipynb cell 16 output
-          "MAE: Rp. 750.686.158,00  \n" # Dari tubes.ipynb cell 16 output
-          "R2 Score: 0.8701") # Dari tubes.ipynb cell 16 output
+# Metrik versi aktif di registry model; tanpa registry dipakai metrik statis dari notebook
+def show_model_performance():
+    from model_registry import active_metadata
+    registry_metadata = active_metadata()
+    if registry_metadata is not None and registry_metadata.get('metrics'):
+        registry_metrics = registry_metadata['metrics']
+        st.info(f"**Performa Model Aktif ({registry_metadata.get('model_name') or 'model'}, "
+                f"versi {registry_metadata['version']}):**  \n"
+                f"RMSE: {format_rupiah(registry_metrics['RMSE'])}  \n"
+                f"MAE: {format_rupiah(registry_metrics['MAE'])}  \n"
+                f"R2 Score: {registry_metrics['R2']:.4f}")
+    else:
+        # Static metrics (best_model.pkl, Gradient Boosting dengan preprocessor sparse)
+        st.info("**Performa Model Terbaik (Gradient Boosting):** \n"
+                  "RMSE: Rp. 2.780.652.049,47  \n"
+                  "MAE: Rp. 603.658.282,02  \n"
+                  "R2 Score: 0.8940")
+
+show_model_performance()
 
 st.subheader("Masukkan Detail Properti")
 
@@ -183,18 +183,160 @@ with col5:
     furnishing = st.selectbox("Furnishing", furnishing_options, help="Status perabotan properti.")
     house_age_category = st.selectbox("Kategori Usia Rumah", house_age_category_options, help="Kategori usia bangunan: baru, sedang, atau lama.")
 
+def show_comparables(lat, long, k=5, radius_km=1.0):
+    index = load_comparable_index()
+    with stage('comparables_lookup'):
+        area = index.radius_features(lat, long, radius_km=radius_km).iloc[0]
+        comparables = index.nearest(lat, long, k=k)
+    st.markdown("### Properti Pembanding Terdekat")
+    col_a, col_b, col_c = st.columns(3)
+    col_a.metric(f"Listing dalam {radius_km:g} km", int(area['n_listings']))
+    col_b.metric(f"Median Harga/m2 ({radius_km:g} km)",
+                 format_rupiah(area['median_price_per_m2']) if area['n_listings'] else "-")
+    col_c.metric(f"Median Harga ({radius_km:g} km)",
+                 format_rupiah(area['median_price_in_rp']) if area['n_listings'] else "-")
+    st.dataframe(comparables[['distance_km', 'district', 'city', 'price_in_rp', 'price_per_m2',
+                              'land_size_m2', 'building_size_m2', 'bedrooms', 'bathrooms', 'url']].style.format({
+        'distance_km': '{:.2f}',
+        'price_in_rp': format_rupiah,
+        'price_per_m2': format_rupiah,
+    }))
+
+# Panel debug opsional: latensi per tahap (metrics.py) dan profil cProfile satu permintaan
+show_debug_sidebar()
+profile_next = st.sidebar.checkbox("Debug: profil permintaan berikutnya (cProfile)", key='profile_next_request')
+
 st.markdown("---")
 if st.button("Prediksi Harga Rumah"):
     with st.spinner('Memprediksi harga...'):
         try:
-            pred = predict_house_price(
-                lat, long, bedrooms, bathrooms, land_size_m2, building_size_m2, carports,
-                maid_bedrooms, maid_bathrooms, floors, building_age, year_built, garages,
-                price_per_m2, total_rooms,
-                district, city, property_type, property_condition, building_orientation, furnishing, house_age_category
-            )
+            with capture_profile(enabled=profile_next) as profile, stage('predict_request'):
+                pred = predict_house_price(
+                    lat, long, bedrooms, bathrooms, land_size_m2, building_size_m2, carports,
+                    maid_bedrooms, maid_bathrooms, floors, building_age, year_built, garages,
+                    price_per_m2, total_rooms,
+                    district, city, property_type, property_condition, building_orientation, furnishing, house_age_category
+                )
+            if profile_next:
+                with st.expander("Profil cProfile permintaan ini"):
+                    st.code(profile.stats_text, language='text')
             st.success(f"Prediksi Harga Rumah: {format_rupiah(pred)}")
+            cache_stats = get_prediction_cache().stats()
+            st.caption(f"Cache prediksi: {cache_stats['hits']} hit, {cache_stats['misses']} miss, "
+                       f"{cache_stats['entries']} entri")
             st.balloons()
+            show_comparables(lat, long)
+            write_metrics_file()  # Hanya jika env PRICE_METRICS_FILE diisi
+        except FileNotFoundError:
+            st.error("File model atau preprocessor tidak ditemukan. Pastikan 'preprocessor.pkl' dan 'best_model.pkl' ada di direktori yang sama.")
         except Exception as e:
             st.error(f"Terjadi kesalahan saat memprediksi: {e}. Pastikan semua input valid.")
-            st.warning("Periksa kembali input Anda, terutama untuk 'price_per_m2' dan 'total_rooms' karena ini adalah fitur hasil rekayasa.")
\ No newline at end of file
+            st.warning("Periksa kembali input Anda, terutama untuk 'price_per_m2' dan 'total_rooms' karena ini adalah fitur hasil rekayasa.")
+# --- Analisis What-If ---
+# Satu properti dasar (input di atas) + satu atau dua parameter yang di-sweep. Seluruh grid
+# diprediksi dalam satu batch (lihat scenarios.py), bukan satu klik per nilai.
+numeric_sweep_ranges = {  # (batas input, rentang default)
+    'land_size_m2': ((12.0, 8000.0), (60.0, 300.0)),
+    'building_size_m2': ((1.0, 6000.0), (36.0, 300.0)),
+    'bedrooms': ((1.0, 20.0), (1.0, 8.0)),
+    'bathrooms': ((1.0, 20.0), (1.0, 6.0)),
+    'floors': ((1.0, 5.0), (1.0, 4.0)),
+    'building_age': ((0.0, 152.0), (0.0, 40.0)),
+    'carports': ((0.0, 15.0), (0.0, 4.0)),
+    'garages': ((0.0, 50.0), (0.0, 4.0)),
+    'price_per_m2': ((10000.0, 1.0e9), (5.0e6, 5.0e7)),
+}
+categorical_sweep_options = {
+    'city': city_options,
+    'district': district_options,
+    'property_condition': property_condition_options,
+    'building_orientation': building_orientation_options,
+    'furnishing': furnishing_options,
+    'house_age_category': house_age_category_options,
+}
+integer_sweep_parameters = {'bedrooms', 'bathrooms', 'floors', 'building_age', 'carports', 'garages'}
+sweep_parameters = list(numeric_sweep_ranges) + list(categorical_sweep_options)
+
+
+def sweep_values_input(param, key):
+    if param in numeric_sweep_ranges:
+        (low, high), default = numeric_sweep_ranges[param]
+        start, stop = st.slider(f"Rentang {param}", min_value=low, max_value=high, value=default, key=f'range_{key}')
+        steps = st.number_input(f"Jumlah titik {param}", min_value=2, max_value=200, value=50, key=f'steps_{key}')
+        from scenarios import numeric_sweep
+        values = numeric_sweep(start, stop, steps)
+        # Jumlah kamar, lantai, dst. hanya bernilai bulat
+        return sorted(set(round(v) for v in values)) if param in integer_sweep_parameters else values
+    options = categorical_sweep_options[param]
+    return st.multiselect(f"Nilai {param}", options, default=options, key=f'values_{key}')
+
+
+def predict_grid(grid):
+    from prediction import MODEL_INPUT_COLUMNS
+    from prediction_client import ServiceUnavailable, predict_many
+    with stage('scenario_predict'):
+        try:
+            return predict_many(grid[MODEL_INPUT_COLUMNS].to_dict('records'))
+        except ServiceUnavailable:
+            from prediction import predict_batch
+            preprocessor, model = load_local_artifacts(get_prediction_cache().artifact_version.current())
+            return predict_batch(grid, preprocessor, model)
+
+
+def scenario_chart(grid, x, y=None):
+    import altair as alt
+    x_type = 'Q' if x in numeric_sweep_ranges else 'N'
+    price = alt.Y('predicted_price:Q', title='Prediksi Harga (Rp)')
+    if y is None:
+        base = alt.Chart(grid)
+        mark = base.mark_line(point=True) if x_type == 'Q' else base.mark_bar()
+        return mark.encode(x=alt.X(f'{x}:{x_type}', title=x), y=price, tooltip=[x, 'predicted_price'])
+    if x_type == 'Q' and y not in numeric_sweep_ranges:
+        return alt.Chart(grid).mark_line().encode(
+            x=alt.X(f'{x}:Q', title=x), y=price, color=alt.Color(f'{y}:N', title=y), tooltip=[x, y, 'predicted_price'])
+    return alt.Chart(grid).mark_rect().encode(
+        x=alt.X(f'{x}:O', title=x, axis=alt.Axis(format='~s') if x_type == 'Q' else alt.Axis()),
+        y=alt.Y(f'{y}:O', title=y),
+        color=alt.Color('predicted_price:Q', title='Prediksi Harga (Rp)', scale=alt.Scale(scheme='viridis')),
+        tooltip=[x, y, 'predicted_price'],
+    )
+
+
+st.markdown("---")
+st.subheader("Analisis What-If (Sensitivitas Harga)")
+st.write("Lihat bagaimana prediksi harga berubah jika satu atau dua parameter diubah, "
+         "dengan parameter lain tetap seperti input di atas.")
+col_w1, col_w2 = st.columns(2)
+with col_w1:
+    sweep_x = st.selectbox("Parameter utama", sweep_parameters, index=sweep_parameters.index('land_size_m2'))
+    values_x = sweep_values_input(sweep_x, 'x')
+with col_w2:
+    second_options = ['(tidak ada)'] + [p for p in sweep_parameters if p != sweep_x]
+    # 'city' sebagai default, kecuali sedang menjadi parameter utama -> "(tidak ada)"
+    sweep_y = st.selectbox("Parameter kedua (opsional)", second_options,
+                           index=second_options.index('city') if 'city' in second_options else 0)
+    values_y = sweep_values_input(sweep_y, 'y') if sweep_y != '(tidak ada)' else None
+
+if st.button("Jalankan Skenario"):
+    from prediction import MODEL_INPUT_COLUMNS
+    from scenarios import build_scenario_grid
+    base_features = dict(zip(MODEL_INPUT_COLUMNS, [
+        lat, long, bedrooms, bathrooms, land_size_m2, building_size_m2, carports,
+        maid_bedrooms, maid_bathrooms, floors, building_age, year_built, garages,
+        price_per_m2, total_rooms,
+        district, city, property_type, property_condition, building_orientation, furnishing, house_age_category
+    ]))
+    sweeps = {sweep_x: values_x}
+    if values_y is not None:
+        sweeps[sweep_y] = values_y
+    try:
+        grid = build_scenario_grid(base_features, sweeps)
+        with st.spinner(f'Memprediksi {len(grid)} skenario dalam satu batch...'):
+            grid['predicted_price'] = predict_grid(grid)
+        st.altair_chart(scenario_chart(grid, sweep_x, sweep_y if values_y is not None else None).properties(height=420),
+                        use_container_width=True)
+        with st.expander("Tabel skenario"):
+            st.dataframe(grid[list(sweeps) + ['predicted_price']])
+        write_metrics_file()
+    except ValueError as e:
+        st.error(f"Skenario tidak valid: {e}")
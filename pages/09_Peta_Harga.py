@@ -0,0 +1,102 @@
+# pages/09_Peta_Harga.py
+import numpy as np
+import streamlit as st
+from hex_tiles import HEX_SIZE_KM, cells_in_view, hex_polygons, load_hex_tiles, tile_source_hashes
+from metrics import show_debug_sidebar, stage
+
+st.set_page_config(
+    page_title="Peta Harga",
+    layout="wide"
+)
+
+st.markdown("<h1 style='color:#2E86C1;'>Peta Harga dan Klaster Properti</h1>", unsafe_allow_html=True)
+st.markdown("---")
+st.write("Peta ini menampilkan median harga dan klaster dominan listing per sel heksagon di wilayah Jabodetabek.")
+
+# Listing diagregasi offline ke sel heksagon multi-resolusi (python hex_tiles.py; dibangun ulang
+# inkremental jika data/model klaster berubah). Yang dikirim ke browser hanya sel di viewport
+# pada resolusi yang sesuai zoom, bukan satu titik per listing.
+@st.cache_resource
+def get_hex_tiles(source_key):
+    # source_key hanya menjadi kunci cache_resource
+    return load_hex_tiles('jabodetabek_house_price.csv', 'preprocessor.pkl', 'kmeans_cluster_model.pkl')
+
+# Pusat peta per wilayah (perkiraan)
+VIEW_CENTERS = {
+    'Seluruh Jabodetabek': (-6.30, 106.85),
+    'Jakarta Pusat': (-6.1865, 106.8341),
+    'Jakarta Selatan': (-6.2615, 106.8106),
+    'Jakarta Barat': (-6.1674, 106.7637),
+    'Jakarta Timur': (-6.2250, 106.9004),
+    'Jakarta Utara': (-6.1384, 106.8636),
+    'Bekasi': (-6.2383, 106.9756),
+    'Tangerang': (-6.1783, 106.6319),
+    'Bogor': (-6.5950, 106.8166),
+    'Depok': (-6.4025, 106.7942),
+}
+MAP_WIDTH_PX, MAP_HEIGHT_PX = 1000, 600
+CLUSTER_COLORS = [[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37],
+                  [230, 97, 1], [178, 24, 43], [120, 120, 120]]
+METRIC_LABELS = {
+    'median_price_in_rp': 'Median harga (Rp)',
+    'median_price_per_m2': 'Median harga per m2 (Rp)',
+    'dominant_cluster': 'Klaster dominan',
+}
+
+def view_bounds(lat, long, zoom):
+    # Rentang derajat yang terlihat di peta Web Mercator berukuran MAP_WIDTH_PX x MAP_HEIGHT_PX
+    long_span = 360.0 * MAP_WIDTH_PX / 256 / 2 ** zoom
+    lat_span = long_span * MAP_HEIGHT_PX / MAP_WIDTH_PX * np.cos(np.radians(lat))
+    return lat - lat_span / 2, lat + lat_span / 2, long - long_span / 2, long + long_span / 2
+
+def cell_colors(cells, metric):
+    if metric == 'dominant_cluster':
+        return [CLUSTER_COLORS[int(c) % len(CLUSTER_COLORS)] + [170] for c in cells['dominant_cluster']]
+    # Skala kuantil (peringkat) agar beberapa properti sangat mahal tidak membuat sel lain seragam
+    rank = cells[metric].rank(pct=True).fillna(0).to_numpy()
+    return [[int(255 * p), int(80 + 100 * (1 - p)), int(255 * (1 - p)), 170] for p in rank]
+
+try:
+    tiles = get_hex_tiles(tuple(sorted(tile_source_hashes().items())))
+    show_debug_sidebar()
+
+    col_area, col_zoom, col_metric = st.columns(3)
+    with col_area:
+        area = st.selectbox("Wilayah", list(VIEW_CENTERS))
+    with col_zoom:
+        zoom = st.slider("Zoom", min_value=8, max_value=15, value=9 if area == 'Seluruh Jabodetabek' else 11)
+    with col_metric:
+        metric = st.selectbox("Warna sel", list(METRIC_LABELS), format_func=METRIC_LABELS.get)
+
+    center_lat, center_long = VIEW_CENTERS[area]
+    with stage('hex_cells_in_view'):
+        resolution, cells = cells_in_view(tiles, zoom, *view_bounds(center_lat, center_long, zoom))
+    cells = cells.assign(polygon=hex_polygons(cells['q'].to_numpy(), cells['r'].to_numpy(), HEX_SIZE_KM[resolution]),
+                         color=cell_colors(cells, metric))
+    st.caption(f"{len(cells):,} sel heksagon berukuran {HEX_SIZE_KM[resolution]:g} km "
+               f"({int(cells['count'].sum()):,} listing di tampilan ini).")
+
+    import pydeck as pdk  # Diimpor di sini: hanya dibutuhkan saat peta digambar
+    layer = pdk.Layer(
+        'PolygonLayer',
+        cells[['polygon', 'color', 'count', 'median_price_in_rp', 'median_price_per_m2', 'dominant_cluster']],
+        get_polygon='polygon',
+        get_fill_color='color',
+        get_line_color=[255, 255, 255, 80],
+        line_width_min_pixels=0.5,
+        pickable=True,
+    )
+    st.pydeck_chart(pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=center_lat, longitude=center_long, zoom=zoom),
+        tooltip={'text': "Listing: {count}\nMedian harga: Rp {median_price_in_rp}\n"
+                         "Median harga/m2: Rp {median_price_per_m2}\nKlaster dominan: {dominant_cluster}"},
+    ))
+
+    build = tiles.get('build')
+    if build:
+        st.caption(f"Tile terakhir diperbarui dari {build['n_points']:,} listing; "
+                   f"{build['n_recomputed_cells']:,} sel dihitung ulang dalam {build['seconds']:.2f} detik.")
+
+except FileNotFoundError:
+    st.error("Pastikan 'jabodetabek_house_price.csv' ada di direktori yang sama untuk menampilkan peta.")
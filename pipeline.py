@@ -0,0 +1,352 @@
+# pipeline.py
+# Alur Proses_Modeling.ipynb sebagai pipeline bertahap yang bisa dijalankan headless:
+#   dedup -> split -> preprocessor -> compare_models -> tune -> fit_best
+#                                   -> cluster_features -> k_scan -> kmeans -> cluster_agreement
+#   export: tulis preprocessor.pkl, best_model.pkl, kmeans_cluster_model.pkl
+# Output setiap tahap disimpan di .cache/pipeline/<tahap>/<kunci>.pkl. Kunci adalah hash dari
+# isi file input, kode sumber modul yang dipakai tahap itu, parameternya, dan kunci tahap
+# hulunya, sehingga hanya tahap yang terdampak perubahan yang dijalankan ulang (mis. mengganti
+# --kmeans-k hanya menjalankan ulang kmeans dan export).
+#
+# Contoh:
+#   python pipeline.py
+#   python pipeline.py --kmeans-k 4            # regresi diambil dari cache
+#   python pipeline.py --cluster-reduction svd --cluster-n-components 50
+#   python pipeline.py --register --activate   # + versi baru di registry model (model_registry.py)
+#   python pipeline.py --status                # tampilkan tahap yang akan dijalankan ulang
+#   python pipeline.py --until compare_models --force compare_models
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+
+import joblib
+
+CACHE_DIR = os.path.join('.cache', 'pipeline')
+# Naikkan jika format output tahap berubah agar cache lama tidak dipakai
+PIPELINE_FORMAT_VERSION = 1
+
+DEFAULT_CONFIG = {
+    'data_path': 'jabodetabek_house_price.csv',
+    'dedup': True,  # buang listing near-duplicate (near_duplicates.py) sebelum split
+    'dedup_threshold': 0.8,
+    'test_size': 0.2,
+    'random_state': 42,
+    'models': None,
+    'search': 'halving',
+    'n_candidates': None,
+    'n_jobs': -1,
+    'k_min': 2,
+    'k_max': 10,
+    'k_algorithm': 'auto',
+    'silhouette_sample_size': 2000,
+    'cluster_reduction': None,  # 'svd' / 'random_projection' sebelum K-Means (k_selection.py)
+    'cluster_n_components': 50,
+    'kmeans_k': 3,  # optimal_k di notebook; None -> silhouette tertinggi
+    'preprocessor_out': 'preprocessor.pkl',
+    'model_out': 'best_model.pkl',
+    'kmeans_out': 'kmeans_cluster_model.pkl',
+}
+
+
+class Stage:
+    """Satu tahap pipeline.
+
+    `func(config, inputs)` menerima config pipeline dan dict output tahap `deps`. Kunci cache
+    dibentuk dari `params` (nama parameter config yang memengaruhi hasil), `code` (modul yang
+    isi filenya di-hash), `files` (parameter berisi path file input yang isinya di-hash), dan
+    kunci tahap `deps`. Tahap dengan cache=False selalu dijalankan (mis. export).
+    """
+
+    def __init__(self, name, func, deps=(), params=(), code=(), files=(), cache=True):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = tuple(params)
+        self.code = tuple(code)
+        self.files = tuple(files)
+        self.cache = cache
+
+
+# --- Fungsi tahap ---
+
+def _dedup(config, inputs):
+    from data_access import load_listings
+    from near_duplicates import find_near_duplicates
+
+    if not config['dedup']:
+        return None
+    return find_near_duplicates(load_listings(config['data_path']), threshold=config['dedup_threshold'])
+
+
+def _split(config, inputs):
+    from sklearn.model_selection import train_test_split
+    from feature_engineering import get_prepared_df
+    from near_duplicates import deduplicate
+
+    df = get_prepared_df(config['data_path'])
+    if inputs['dedup'] is not None:
+        df = deduplicate(df, inputs['dedup'])
+    X, y = df.drop(['price_in_rp'], axis=1), df['price_in_rp']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=config['test_size'],
+                                                        random_state=config['random_state'])
+    return {'X': X, 'X_train': X_train, 'X_test': X_test,
+            'y_train': y_train.to_numpy(), 'y_test': y_test.to_numpy()}
+
+
+def _fit_preprocessor(config, inputs):
+    from preprocessing import build_preprocessor
+
+    split = inputs['split']
+    preprocessor = build_preprocessor()
+    X_train_processed = preprocessor.fit_transform(split['X_train'])
+    return {'preprocessor': preprocessor, 'X_train': X_train_processed,
+            'X_test': preprocessor.transform(split['X_test'])}
+
+
+def _harness(config, inputs):
+    from training import TrainingHarness
+
+    processed, split = inputs['preprocessor'], inputs['split']
+    return TrainingHarness(processed['X_train'], split['y_train'], processed['X_test'], split['y_test'],
+                           n_jobs=config['n_jobs'], X_train_frame=split['X_train'], X_test_frame=split['X_test'])
+
+
+def _compare_models(config, inputs):
+    results_df, _ = _harness(config, inputs).compare_models(config['models'])
+    return results_df
+
+
+def _tune(config, inputs):
+    best_model_name = inputs['compare_models']['R2'].idxmax()
+    best_params, cv_results = _harness(config, inputs).tune(best_model_name, search=config['search'],
+                                                            n_candidates=config['n_candidates'])
+    return {'name': best_model_name, 'params': best_params, 'cv_results': cv_results}
+
+
+def _fit_best(config, inputs):
+    tuned = inputs['tune']
+    model, metrics = _harness(config, inputs).fit_evaluate(tuned['name'], tuned['params'])
+    return {'name': tuned['name'], 'params': tuned['params'], 'model': model, 'metrics': metrics}
+
+
+def _cluster_features(config, inputs):
+    return inputs['preprocessor']['preprocessor'].transform(inputs['split']['X'])
+
+
+def _k_scan(config, inputs):
+    from k_selection import scan_k
+
+    curves, _ = scan_k(inputs['cluster_features'], range(config['k_min'], config['k_max'] + 1),
+                       algorithm=config['k_algorithm'], sample_size=config['silhouette_sample_size'],
+                       n_jobs=config['n_jobs'], random_state=config['random_state'],
+                       reduction=config['cluster_reduction'], n_components=config['cluster_n_components'])
+    return curves
+
+
+def _kmeans(config, inputs):
+    from k_selection import best_k, make_cluster_model
+
+    curves = inputs['k_scan']
+    k = config['kmeans_k'] if config['kmeans_k'] is not None else best_k(curves)
+    model = make_cluster_model(k, curves['algorithm'].iloc[0], config['cluster_reduction'],
+                               config['cluster_n_components'], random_state=config['random_state'])
+    return model.fit(inputs['cluster_features'])
+
+
+def _cluster_agreement(config, inputs):
+    from k_selection import full_width_agreement
+
+    if config['cluster_reduction'] is None:
+        return None
+    return full_width_agreement(inputs['cluster_features'], inputs['kmeans'], random_state=config['random_state'])
+
+
+def _export(config, inputs):
+    outputs = [
+        (inputs['preprocessor']['preprocessor'], config['preprocessor_out']),
+        (inputs['fit_best']['model'], config['model_out']),
+        (inputs['kmeans'], config['kmeans_out']),
+    ]
+    for obj, path in outputs:
+        joblib.dump(obj, path + '.tmp')
+        os.replace(path + '.tmp', path)
+    return [path for _, path in outputs]
+
+
+STAGES = [
+    Stage('dedup', _dedup, params=('dedup', 'dedup_threshold'), code=('near_duplicates', 'data_access'),
+          files=('data_path',)),
+    Stage('split', _split, deps=('dedup',), params=('test_size', 'random_state'),
+          code=('feature_engineering', 'data_access'), files=('data_path',)),
+    Stage('preprocessor', _fit_preprocessor, deps=('split',), code=('preprocessing',)),
+    Stage('compare_models', _compare_models, deps=('split', 'preprocessor'), params=('models',),
+          code=('training', 'hist_boosting')),
+    Stage('tune', _tune, deps=('split', 'preprocessor', 'compare_models'), params=('search', 'n_candidates'),
+          code=('training', 'hist_boosting')),
+    Stage('fit_best', _fit_best, deps=('split', 'preprocessor', 'tune'), code=('training', 'hist_boosting')),
+    Stage('cluster_features', _cluster_features, deps=('split', 'preprocessor')),
+    Stage('k_scan', _k_scan, deps=('cluster_features',),
+          params=('k_min', 'k_max', 'k_algorithm', 'silhouette_sample_size', 'random_state', 'cluster_reduction',
+                  'cluster_n_components'), code=('k_selection',)),
+    Stage('kmeans', _kmeans, deps=('cluster_features', 'k_scan'),
+          params=('kmeans_k', 'random_state', 'cluster_reduction', 'cluster_n_components'), code=('k_selection',)),
+    Stage('cluster_agreement', _cluster_agreement, deps=('cluster_features', 'kmeans'), params=('random_state',),
+          code=('k_selection',)),
+    Stage('export', _export, deps=('preprocessor', 'fit_best', 'kmeans'),
+          params=('preprocessor_out', 'model_out', 'kmeans_out'), cache=False),
+]
+
+
+def _module_source_hash(module_name):
+    module = sys.modules.get(module_name) or __import__(module_name)
+    with open(inspect.getsourcefile(module), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class PipelineRunner:
+    """Menjalankan STAGES sesuai urutan dependensi dengan cache disk per kunci tahap."""
+
+    def __init__(self, config=None, stages=STAGES, cache_dir=CACHE_DIR, log=print):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.log = log
+        self._keys = {}
+        self._outputs = {}
+
+    def stage_key(self, name):
+        if name not in self._keys:
+            from data_access import source_sha256
+
+            stage = self.stages[name]
+            payload = {
+                'format_version': PIPELINE_FORMAT_VERSION,
+                'stage': name,
+                'func': inspect.getsource(stage.func),
+                'code': {module: _module_source_hash(module) for module in stage.code},
+                'params': {param: self.config[param] for param in stage.params},
+                'files': {param: source_sha256(self.config[param]) for param in stage.files},
+                'deps': {dep: self.stage_key(dep) for dep in stage.deps},
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+            self._keys[name] = hashlib.sha256(encoded).hexdigest()[:16]
+        return self._keys[name]
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, name, f'{self.stage_key(name)}.pkl')
+
+    def is_cached(self, name):
+        return self.stages[name].cache and os.path.exists(self._cache_path(name))
+
+    def output(self, name, force=()):
+        """Output tahap `name`: dari cache jika kuncinya cocok, selain itu dijalankan (beserta hulunya)."""
+        if name in self._outputs:
+            return self._outputs[name]
+        stage = self.stages[name]
+        path = self._cache_path(name)
+        if stage.cache and name not in force and os.path.exists(path):
+            self.log(f"[cache] {name:<18} {self.stage_key(name)}")
+            result = joblib.load(path)
+        else:
+            inputs = {dep: self.output(dep, force) for dep in stage.deps}
+            start = time.perf_counter()
+            result = stage.func(self.config, inputs)
+            self.log(f"[run]   {name:<18} {self.stage_key(name)} {time.perf_counter() - start:8.1f} s")
+            if stage.cache:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                joblib.dump(result, path + '.tmp')
+                os.replace(path + '.tmp', path)
+        self._outputs[name] = result
+        return result
+
+    def status(self, until='export'):
+        """(tahap, kunci, ter-cache) untuk `until` dan seluruh hulunya, urut dependensi."""
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            order.append(name)
+
+        visit(until)
+        return [(name, self.stage_key(name), self.is_cached(name)) for name in order]
+
+    def run(self, until='export', force=()):
+        return self.output(until, force=set(force))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan pipeline modeling bertahap dengan cache per tahap.")
+    parser.add_argument('--data', default=DEFAULT_CONFIG['data_path'])
+    parser.add_argument('--config', help="File JSON berisi parameter (menimpa default)")
+    parser.add_argument('--models', nargs='+', default=None)
+    parser.add_argument('--search', choices=['halving', 'random', 'grid'], default=None)
+    parser.add_argument('--n-candidates', type=int, default=None)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--no-dedup', action='store_true', help="Jangan buang listing near-duplicate")
+    parser.add_argument('--kmeans-k', type=int, default=None)
+    parser.add_argument('--cluster-reduction', choices=['svd', 'random_projection'], default=None)
+    parser.add_argument('--cluster-n-components', type=int, default=None)
+    parser.add_argument('--auto-k', action='store_true', help="Pilih k dengan silhouette tertinggi")
+    parser.add_argument('--until', default='export', choices=[stage.name for stage in STAGES])
+    parser.add_argument('--force', nargs='+', default=(), choices=[stage.name for stage in STAGES],
+                        help="Jalankan ulang tahap ini walau ada di cache")
+    parser.add_argument('--status', action='store_true', help="Tampilkan status cache tanpa menjalankan")
+    parser.add_argument('--register', action='store_true',
+                        help="Daftarkan artefak hasil export sebagai versi baru di registry model")
+    parser.add_argument('--activate', action='store_true', help="Bersama --register: jadikan versi baru aktif")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    config = {'data_path': args.data}
+    if args.config:
+        with open(args.config) as f:
+            config.update(json.load(f))
+    overrides = {'models': args.models, 'search': args.search, 'n_candidates': args.n_candidates,
+                 'n_jobs': args.n_jobs, 'kmeans_k': args.kmeans_k, 'cluster_reduction': args.cluster_reduction,
+                 'cluster_n_components': args.cluster_n_components}
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    if args.no_dedup:
+        config['dedup'] = False
+    if args.auto_k:
+        config['kmeans_k'] = None
+
+    runner = PipelineRunner(config, cache_dir=args.cache_dir)
+    if args.status:
+        for name, key, cached in runner.status(args.until):
+            state = 'cache' if cached else ('selalu' if not runner.stages[name].cache else 'jalankan')
+            print(f"{name:<18} {key}  {state}")
+        return
+
+    result = runner.run(args.until, force=args.force)
+    if args.until == 'export':
+        best = runner.output('fit_best')
+        print(f"Model terbaik: {best['name']} {best['params']} R2={best['metrics']['R2']:.4f}")
+        print(f"Artefak ditulis: {', '.join(result)}")
+        if args.register:
+            from data_access import source_sha256
+            from model_registry import activate, register
+
+            version = register({'preprocessor': runner.config['preprocessor_out'], 'model': runner.config['model_out'],
+                                'kmeans': runner.config['kmeans_out']},
+                               metrics=best['metrics'], data_sha256=source_sha256(runner.config['data_path']),
+                               model_name=best['name'], params=best['params'],
+                               notes=f"pipeline fit_best {runner.stage_key('fit_best')}")
+            if args.activate:
+                activate(version)
+            print(f"Terdaftar di registry sebagai versi {version}{' (aktif)' if args.activate else ''}")
+        agreement = runner.output('cluster_agreement')
+        if agreement is not None:
+            print(f"ARI K-Means tereduksi vs lebar penuh: {agreement['ari']:.4f} (predict "
+                  f"{agreement['reduced_predict_seconds']:.3f} s vs {agreement['full_predict_seconds']:.3f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# prediction.py
+# Prediksi harga rumah secara batch (vectorized) dan CLI untuk menilai ulang file listing.
+#
+# Contoh:
+#   python prediction.py listings.csv hasil.csv --chunksize 50000
+#   python prediction.py listings.parquet hasil.parquet
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import house_age_category, price_per_m2, total_rooms
+from hist_boosting import uses_feature_frame
+from metrics import stage
+from preprocessing import ALL_X_COLUMNS, NUM_FEATURES
+
+PREPROCESSOR_PATH = 'preprocessor.pkl'
+MODEL_PATH = 'best_model.pkl'
+PREDICTION_COLUMN = 'predicted_price_in_rp'
+
+# 22 input model yang diisi pengguna di halaman prediksi
+MODEL_INPUT_COLUMNS = [
+    'lat', 'long', 'bedrooms', 'bathrooms', 'land_size_m2', 'building_size_m2', 'carports',
+    'maid_bedrooms', 'maid_bathrooms', 'floors', 'building_age', 'year_built', 'garages',
+    'price_per_m2', 'total_rooms',
+    'district', 'city', 'property_type', 'property_condition', 'building_orientation',
+    'furnishing', 'house_age_category'
+]
+
+# Default values for columns not directly taken as input
+DEFAULT_VALUES = {
+    'url': 'http://dummy.url/',
+    'title': 'Dummy Title',
+    'address': 'Dummy Address',
+    'facilities': 'None',
+    'ads_id': 'dummy_id',
+    'certificate': 'shm - sertifikat hak milik',  # Common from the data
+    'electricity': '2200 mah',  # Common from the data
+}
+
+
+def load_artifacts(preprocessor_path=PREPROCESSOR_PATH, model_path=MODEL_PATH, flatten=False):
+    """Muat preprocessor dan model; flatten=True mengganti GradientBoosting dengan evaluator
+    array datar dari tree_export.py (hasil prediksi identik, overhead lebih kecil)."""
+    import joblib  # Diimpor di sini: halaman yang hanya memakai konstanta modul ini tidak perlu joblib
+
+    preprocessor, model = joblib.load(preprocessor_path), joblib.load(model_path)
+    if flatten:
+        from tree_export import flatten_model
+        model = flatten_model(model)
+    return preprocessor, model
+
+
+def _numeric_fill_values(preprocessor):
+    # Nilai numerik yang hilang diisi rata-rata training dari StandardScaler,
+    # sehingga setelah scaling bernilai 0 (netral)
+    try:
+        scaler = preprocessor.named_transformers_['num']
+        return dict(zip(scaler.feature_names_in_, scaler.mean_))
+    except (AttributeError, KeyError):
+        return {}
+
+
+def build_feature_frame(df, preprocessor=None):
+    """Susun DataFrame listing menjadi kolom X training (ALL_X_COLUMNS) secara vectorized."""
+    X = df.reindex(columns=ALL_X_COLUMNS)
+
+    # Fitur hasil rekayasa diturunkan dari kolom mentah jika tidak disediakan
+    if 'price_per_m2' not in df.columns and {'price_in_rp', 'land_size_m2'} <= set(df.columns):
+        X['price_per_m2'] = price_per_m2(df)
+    if 'total_rooms' not in df.columns:
+        X['total_rooms'] = total_rooms(X)
+    if 'house_age_category' not in df.columns:
+        X['house_age_category'] = house_age_category(X['building_age'])
+
+    X[NUM_FEATURES] = X[NUM_FEATURES].apply(pd.to_numeric, errors='coerce')
+    if preprocessor is not None:
+        X = X.fillna(_numeric_fill_values(preprocessor))
+    cat_cols = [col for col in ALL_X_COLUMNS if col not in NUM_FEATURES]
+    X[cat_cols] = X[cat_cols].astype(object).fillna(DEFAULT_VALUES).fillna('unknown')
+    return X
+
+
+def predict_batch(df, preprocessor, model):
+    """Prediksi harga untuk banyak listing sekaligus dengan satu transform dan satu predict."""
+    if len(df) == 0:
+        return np.empty(0)
+    # Durasi setiap tahap dicatat di metrics.REGISTRY (histogram per tahap)
+    with stage('build_feature_frame'):
+        X = build_feature_frame(df, preprocessor)
+    if uses_feature_frame(model):
+        # Model dengan kategori native (hist_boosting.py) meng-encode frame fitur sendiri
+        X_processed = X
+    else:
+        with stage('preprocessor_transform'):
+            X_processed = preprocessor.transform(X)
+    with stage('model_predict'):
+        return model.predict(X_processed)
+
+
+def predict_one(features, preprocessor, model):
+    """Prediksi satu rumah dari dict berisi MODEL_INPUT_COLUMNS."""
+    with stage('build_input_frame'):
+        df = pd.DataFrame([features])
+    return predict_batch(df, preprocessor, model)[0]
+
+
+def iter_listing_chunks(path, chunksize):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def score_file(input_path, output_path, preprocessor, model, chunksize=50000):
+    """Stream file listing (CSV/Parquet) per chunk dan tulis baris input + kolom prediksi."""
+    is_parquet = os.path.splitext(output_path)[1].lower() in ('.parquet', '.pq')
+    writer = None
+    n_rows = 0
+    try:
+        for i, chunk in enumerate(iter_listing_chunks(input_path, chunksize)):
+            chunk[PREDICTION_COLUMN] = predict_batch(chunk, preprocessor, model)
+            if is_parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            else:
+                chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediksi harga rumah secara batch dari file CSV/Parquet.")
+    parser.add_argument('input', help="File listing (.csv atau .parquet)")
+    parser.add_argument('output', help="File hasil (.csv atau .parquet)")
+    parser.add_argument('--chunksize', type=int, default=50000, help="Jumlah baris per batch")
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--no-flatten', action='store_true', help="Pakai model.predict sklearn langsung")
+    args = parser.parse_args(argv)
+
+    preprocessor, model = load_artifacts(args.preprocessor, args.model, flatten=not args.no_flatten)
+    n_rows = score_file(args.input, args.output, preprocessor, model, chunksize=args.chunksize)
+    print(f"{n_rows} listing diprediksi -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
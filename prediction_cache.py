@@ -0,0 +1,148 @@
+# prediction_cache.py
+# Cache LRU + TTL untuk hasil prediksi satu rumah. Kunci cache adalah hash kanonik dari
+# 22 input model (prediction.MODEL_INPUT_COLUMNS), sehingga properti yang sama dengan
+# urutan/representasi input berbeda (3 vs 3.0, spasi di ujung teks) tetap menjadi hit.
+# Seluruh isi cache dibuang otomatis jika hash file preprocessor/model berubah.
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+from data_access import file_sha256
+from prediction import MODEL_INPUT_COLUMNS
+
+# Presisi angka di kunci cache (input lat/long di halaman prediksi memakai 6 desimal)
+KEY_DECIMALS = 6
+
+
+def _normalize_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+    if number != number:  # NaN
+        return None
+    return round(number, KEY_DECIMALS) + 0.0  # + 0.0 menyamakan -0.0 dengan 0.0
+
+
+def canonical_key(features, columns=MODEL_INPUT_COLUMNS):
+    """Hash SHA-256 dari nilai input yang dinormalisasi, dalam urutan `columns` yang tetap."""
+    values = [_normalize_value(features.get(col)) for col in columns]
+    return hashlib.sha256(json.dumps(values, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class ArtifactVersion:
+    """Hash gabungan file artefak; file hanya di-hash ulang jika mtime/ukurannya berubah."""
+
+    def __init__(self, *paths):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self._stat_key = None
+        self._digest = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        stat_key = tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, self.paths))
+        with self._lock:
+            if stat_key != self._stat_key:
+                self._digest = hashlib.sha256(
+                    ''.join(file_sha256(p) for p in self.paths).encode('ascii')).hexdigest()
+                self._stat_key = stat_key
+            return self._digest
+
+
+class PredictionCache:
+    """Cache LRU thread-safe dengan batas `max_entries` dan umur entri `ttl_seconds`.
+
+    `artifact_version` (opsional) adalah ArtifactVersion; jika nilainya berubah, seluruh
+    entri dibuang sebelum lookup berikutnya. put() dengan `version` hanya menyimpan nilai
+    jika versi itu masih versi aktif: prediksi yang dihitung dengan versi lama dan selesai
+    setelah swap ditolak (stale_puts), bukan dilayani selama TTL. Counter
+    hits/misses/evictions dapat dibaca lewat stats().
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=3600.0, artifact_version=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.artifact_version = artifact_version
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def _check_version(self):
+        # Dipanggil dengan self._lock terkunci
+        if self.artifact_version is None:
+            return
+        version = self.artifact_version.current()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key):
+        """Nilai untuk `key`, atau None jika tidak ada / kedaluwarsa (dihitung sebagai miss)."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, version=None):
+        """Simpan `value`; `version` adalah artifact_version.current() saat nilai dihitung."""
+        with self._lock:
+            self._check_version()
+            if version is not None and self.artifact_version is not None and version != self._version:
+                self.stale_puts += 1
+                return
+            self._entries[key] = (value, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, features, compute):
+        """Prediksi untuk `features` dari cache, atau compute(features) lalu disimpan."""
+        key = canonical_key(features)
+        value = self.get(key)
+        if value is None:
+            # Versi dibaca sebelum menghitung: jika artefak berganti selama compute, hasilnya tidak disimpan
+            version = self.artifact_version.current() if self.artifact_version is not None else None
+            value = compute(features)
+            self.put(key, value, version=version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'stale_puts': self.stale_puts,
+            }
@@ -0,0 +1,39 @@
+# prediction_client.py
+# Klien ringan untuk model_server.py (hanya library standar, tanpa pandas/sklearn).
+import json
+import os
+import urllib.error
+import urllib.request
+
+DEFAULT_SERVICE_URL = os.environ.get('PRICE_SERVICE_URL', 'http://127.0.0.1:8600')
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+def _request(path, payload=None, url=None, timeout=2.0):
+    url = (url or DEFAULT_SERVICE_URL).rstrip('/') + path
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        # Layanan hidup tetapi menolak input -> teruskan pesan errornya
+        raise ValueError(json.loads(e.read() or b'{}').get('error', str(e))) from e
+    except (urllib.error.URLError, OSError) as e:
+        raise ServiceUnavailable(f"Layanan prediksi tidak dapat dihubungi di {url}: {e}") from e
+
+
+def predict(features, url=None, timeout=2.0):
+    """Prediksi satu rumah; `features` berisi 22 input model (lihat prediction.MODEL_INPUT_COLUMNS)."""
+    return _request('/predict', features, url, timeout)['predicted_price']
+
+
+def predict_many(records, url=None, timeout=30.0):
+    return _request('/predict_batch', {'instances': list(records)}, url, timeout)['predicted_prices']
+
+
+def service_stats(url=None, timeout=2.0):
+    return _request('/stats', url=url, timeout=timeout)
@@ -0,0 +1,73 @@
+# preprocessing.py
+# Pipeline pra-pemrosesan (scaling dan encoding) untuk model regresi dan klastering.
+# Pengganti ColumnTransformer di notebook yang meng-one-hot semua kolom object
+# (termasuk url, title, address, ads_id) menjadi matriks dense (n, 10811). preprocessor.pkl,
+# best_model.pkl, dan kmeans_cluster_model.pkl dilatih dengan preprocessor ini (python pipeline.py).
+# Konstanta kolom di modul ini diimpor oleh jalur ringan (halaman Streamlit, prediction.py),
+# jadi sklearn baru diimpor saat build_preprocessor dipanggil.
+
+# Kolom numerik (sama dengan num_features di notebook)
+NUM_FEATURES = [
+    'lat', 'long', 'bedrooms', 'bathrooms', 'land_size_m2', 'building_size_m2',
+    'carports', 'maid_bedrooms', 'maid_bathrooms', 'floors', 'building_age',
+    'year_built', 'garages', 'price_per_m2', 'total_rooms'
+]
+# Kolom kategorikal dengan sedikit nilai unik -> one-hot biasa
+CAT_FEATURES = [
+    'city', 'property_type', 'certificate', 'electricity', 'property_condition',
+    'building_orientation', 'furnishing', 'house_age_category'
+]
+# Kolom kategorikal dengan banyak nilai unik (380 distrik) -> kategori jarang digabung
+RARE_CAT_FEATURES = ['district']
+# Kolom teks bebas -> feature hashing dengan lebar tetap
+TEXT_FEATURES = ['address', 'facilities']
+# Kolom identitas (hampir unik per baris) tidak membawa informasi harga -> dibuang. Judul iklan
+# juga dibuang: kata-kata promosinya (mewah, murah, ...) membuat pohon boosting menghafal
+# segelintir listing ekstrem (R2 test turun ke 0.83 atau lebih rendah, tergantung parameter)
+ID_FEATURES = ['url', 'ads_id', 'title']
+
+# Urutan kolom X saat training (X.columns di notebook)
+ALL_X_COLUMNS = [
+    'url', 'title', 'address', 'district', 'city', 'lat', 'long', 'facilities',
+    'property_type', 'ads_id', 'bedrooms', 'bathrooms', 'land_size_m2', 'building_size_m2',
+    'carports', 'certificate', 'electricity', 'maid_bedrooms', 'maid_bathrooms', 'floors',
+    'building_age', 'year_built', 'property_condition', 'building_orientation', 'garages',
+    'furnishing', 'price_per_m2', 'total_rooms', 'house_age_category'
+]
+
+# Jumlah kolom hash per fitur teks
+TEXT_HASH_FEATURES = {
+    'address': 2 ** 8,
+    'facilities': 2 ** 6,
+}
+
+
+def build_preprocessor(min_district_frequency=10, text_hash_features=None):
+    """Buat ColumnTransformer yang menghasilkan matriks CSR sparse.
+
+    Distrik yang muncul kurang dari `min_district_frequency` kali digabung menjadi
+    satu kolom 'infrequent'; kolom teks di-hash ke lebar tetap sehingga ukuran
+    output tidak bergantung pada jumlah listing.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    text_hash_features = {**TEXT_HASH_FEATURES, **(text_hash_features or {})}
+
+    transformers = [
+        ('num', StandardScaler(), NUM_FEATURES),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CAT_FEATURES),
+        ('district', OneHotEncoder(handle_unknown='infrequent_if_exist',
+                                   min_frequency=min_district_frequency), RARE_CAT_FEATURES),
+    ]
+    for col in TEXT_FEATURES:
+        # Kolom diberikan sebagai string (bukan list) agar vectorizer menerima input 1-D
+        transformers.append((
+            f'text_{col}',
+            HashingVectorizer(n_features=text_hash_features[col], alternate_sign=False),
+            col,
+        ))
+
+    # sparse_threshold=1.0 -> output selalu CSR; kolom lain (url, ads_id, target) dibuang
+    return ColumnTransformer(transformers=transformers, remainder='drop', sparse_threshold=1.0)
@@ -0,0 +1,61 @@
+# scenarios.py
+# Analisis what-if: satu properti dasar + satu atau dua parameter yang di-sweep. Seluruh grid
+# skenario (mis. 50 nilai land_size_m2 x 9 kota = 450 baris) dibangun sebagai satu DataFrame
+# dan diprediksi dengan satu preprocessor.transform + satu model.predict.
+#
+# Contoh:
+#   from scenarios import numeric_sweep, run_scenarios
+#   grid = run_scenarios(base_features, {'land_size_m2': numeric_sweep(60, 300, 50),
+#                                        'city': city_options}, preprocessor, model)
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import ROOM_COLUMNS, house_age_category, total_rooms
+from metrics import stage
+from prediction import MODEL_INPUT_COLUMNS, PREDICTION_COLUMN, predict_batch
+
+MAX_SWEEP_PARAMS = 2
+MAX_SCENARIOS = 100000
+
+
+def numeric_sweep(start, stop, steps):
+    return np.linspace(start, stop, int(steps))
+
+
+def build_scenario_grid(base_features, sweeps, recompute_derived=True):
+    """DataFrame berisi satu baris per kombinasi nilai `sweeps` ({kolom: nilai}), kolom lain dari base.
+
+    Jika recompute_derived=True, fitur turunan ikut disesuaikan saat kolom sumbernya di-sweep:
+    total_rooms dari kolom kamar dan house_age_category dari building_age.
+    """
+    if not 1 <= len(sweeps) <= MAX_SWEEP_PARAMS:
+        raise ValueError(f"Jumlah parameter sweep harus 1 sampai {MAX_SWEEP_PARAMS}")
+    unknown = [col for col in sweeps if col not in MODEL_INPUT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Parameter tidak dikenal: {unknown}")
+    names = list(sweeps)
+    values = [list(sweeps[name]) for name in names]
+    n_scenarios = int(np.prod([len(v) for v in values]))
+    if n_scenarios == 0 or n_scenarios > MAX_SCENARIOS:
+        raise ValueError(f"Grid berisi {n_scenarios} skenario; batasnya 1 sampai {MAX_SCENARIOS}")
+
+    grid = pd.DataFrame(list(itertools.product(*values)), columns=names)
+    for col in MODEL_INPUT_COLUMNS:
+        if col not in grid.columns:
+            grid[col] = base_features.get(col)
+    if recompute_derived:
+        if any(col in sweeps for col in ROOM_COLUMNS) and 'total_rooms' not in sweeps:
+            grid['total_rooms'] = total_rooms(grid)
+        if 'building_age' in sweeps and 'house_age_category' not in sweeps:
+            grid['house_age_category'] = house_age_category(grid['building_age'].astype(float))
+    return grid[names + [col for col in MODEL_INPUT_COLUMNS if col not in names]]
+
+
+def run_scenarios(base_features, sweeps, preprocessor, model, recompute_derived=True):
+    """Grid skenario + kolom prediksi, dihitung dalam satu batch."""
+    with stage('scenario_grid'):
+        grid = build_scenario_grid(base_features, sweeps, recompute_derived)
+    grid[PREDICTION_COLUMN] = predict_batch(grid, preprocessor, model)
+    return grid
@@ -0,0 +1,134 @@
+# spatial_index.py
+# Indeks spasial (BallTree, jarak haversine) atas lat/long listing untuk mencari properti
+# pembanding terdekat dan fitur agregat radius (mis. median price_per_m2 dalam 1 km).
+# Indeks dibangun sekali dari jabodetabek_house_price.csv dan disimpan di .cache/spatial_index.pkl
+# (tidak di-commit) bersama hash data, sehingga hanya dibangun ulang jika data berubah.
+#
+# Contoh:
+#   python spatial_index.py
+#   python spatial_index.py --query -6.2239 106.9863 --k 5
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_access import load_listings, source_sha256
+
+DATA_PATH = 'jabodetabek_house_price.csv'
+SPATIAL_INDEX_PATH = os.path.join('.cache', 'spatial_index.pkl')
+# Naikkan jika isi artefak berubah agar artefak lama dibangun ulang
+INDEX_FORMAT_VERSION = 1
+EARTH_RADIUS_KM = 6371.0088
+
+# Kolom yang ditampilkan untuk setiap properti pembanding
+COMPARABLE_COLUMNS = [
+    'title', 'district', 'city', 'price_in_rp', 'land_size_m2', 'building_size_m2',
+    'bedrooms', 'bathrooms', 'lat', 'long', 'url'
+]
+
+
+def _to_radians(lat, long):
+    return np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(long)]).astype(float))
+
+
+class ComparableIndex:
+    """BallTree haversine + tabel ringkas listing pembanding (baris ke-i = titik ke-i di tree)."""
+
+    def __init__(self, listings, leaf_size=40):
+        from sklearn.neighbors import BallTree
+
+        listings = listings.dropna(subset=['lat', 'long']).reset_index(drop=True)
+        self.listings = listings
+        self.price_per_m2 = (listings['price_in_rp'] / listings['land_size_m2']).to_numpy(float)
+        self.tree = BallTree(_to_radians(listings['lat'], listings['long']), leaf_size=leaf_size,
+                             metric='haversine')
+
+    def __len__(self):
+        return len(self.listings)
+
+    def nearest(self, lat, long, k=5):
+        """k listing terdekat dari satu titik, diurutkan dari yang paling dekat (kolom distance_km)."""
+        k = min(k, len(self))
+        distances, indices = self.tree.query(_to_radians(lat, long), k=k)
+        comparables = self.listings.iloc[indices[0]].copy()
+        comparables.insert(0, 'distance_km', distances[0] * EARTH_RADIUS_KM)
+        comparables['price_per_m2'] = self.price_per_m2[indices[0]]
+        return comparables.reset_index(drop=True)
+
+    def radius_features(self, lat, long, radius_km=1.0):
+        """Agregat listing dalam `radius_km` dari setiap titik (lat/long skalar atau array).
+
+        Menghasilkan DataFrame satu baris per titik: jumlah listing, median price_per_m2,
+        dan median harga; NaN jika tidak ada listing dalam radius.
+        """
+        indices = self.tree.query_radius(_to_radians(lat, long), r=radius_km / EARTH_RADIUS_KM)
+        prices = self.listings['price_in_rp'].to_numpy(float)
+        rows = []
+        for idx in indices:
+            rows.append({
+                'n_listings': len(idx),
+                'median_price_per_m2': float(np.nanmedian(self.price_per_m2[idx])) if len(idx) else np.nan,
+                'median_price_in_rp': float(np.nanmedian(prices[idx])) if len(idx) else np.nan,
+            })
+        return pd.DataFrame(rows)
+
+
+def build_spatial_index(data_path=DATA_PATH):
+    listings = load_listings(data_path, columns=COMPARABLE_COLUMNS)
+    return {
+        'format_version': INDEX_FORMAT_VERSION,
+        'data_sha256': source_sha256(data_path),
+        'index': ComparableIndex(listings),
+    }
+
+
+def load_spatial_index(data_path=DATA_PATH, index_path=SPATIAL_INDEX_PATH):
+    """Muat ComparableIndex dari index_path; bangun ulang dan simpan jika hash data tidak cocok."""
+    data_sha256 = source_sha256(data_path)
+    try:
+        artifact = joblib.load(index_path)
+    except (FileNotFoundError, EOFError, ValueError, AttributeError, ImportError):
+        # AttributeError/ImportError: artefak lama yang mereferensikan kelas yang tidak bisa diimpor
+        # (mis. __main__.ComparableIndex dari versi CLI sebelumnya) -> bangun ulang
+        artifact = None
+    if artifact is not None and artifact.get('format_version') == INDEX_FORMAT_VERSION \
+            and artifact.get('data_sha256') == data_sha256:
+        return artifact['index']
+
+    artifact = build_spatial_index(data_path)
+    try:
+        os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+        joblib.dump(artifact, index_path)
+    except OSError:
+        pass  # Direktori read-only: tetap pakai indeks di memori
+    return artifact['index']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun indeks spasial listing untuk pencarian properti pembanding.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--output', default=SPATIAL_INDEX_PATH)
+    parser.add_argument('--query', nargs=2, type=float, metavar=('LAT', 'LONG'),
+                        help="Tampilkan pembanding terdekat untuk satu titik")
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--radius-km', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    artifact = build_spatial_index(args.data)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    joblib.dump(artifact, args.output)
+    index = artifact['index']
+    print(f"Indeks spasial {len(index)} listing disimpan ke {args.output}")
+    if args.query:
+        lat, long = args.query
+        print(index.nearest(lat, long, k=args.k)[['distance_km', 'district', 'price_in_rp', 'price_per_m2']].to_string())
+        print(index.radius_features(lat, long, radius_km=args.radius_km).to_string())
+
+
+if __name__ == '__main__':
+    # Jalankan lewat modul yang diimpor: ComparableIndex di-pickle sebagai spatial_index.ComparableIndex,
+    # bukan __main__.ComparableIndex yang tidak bisa dimuat oleh halaman Streamlit
+    import spatial_index
+    spatial_index.main()
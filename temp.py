@@ -2,11 +2,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
+from model_artifacts import load_serving_artifacts
+from prediction import predict_one
 
 # Load preprocessor and model
-preprocessor = joblib.load('preprocessor.pkl')
-model = joblib.load('best_model.pkl')
+preprocessor, model = load_serving_artifacts()
 
 # Helper for currency formatting
 def format_rupiah(value):
@@ -19,48 +19,33 @@ def predict_house_price(
     price_per_m2, total_rooms,
     district, city, property_type, property_condition, building_orientation, furnishing, house_age_category
 ):
-    # Compose input as DataFrame with correct column order
-    input_dict = {
-        'lat': [lat],
-        'long': [long],
-        'bedrooms': [bedrooms],
-        'bathrooms': [bathrooms],
-        'land_size_m2': [land_size_m2],
-        'building_size_m2': [building_size_m2],
-        'carports': [carports],
-        'maid_bedrooms': [maid_bedrooms],
-        'maid_bathrooms': [maid_bathrooms],
-        'floors': [floors],
-        'building_age': [building_age],
-        'year_built': [year_built],
-        'garages': [garages],
-        'price_per_m2': [price_per_m2],
-        'total_rooms': [total_rooms],
-        'district': [district],
-        'city': [city],
-        'property_type': [property_type],
-        'property_condition': [property_condition],
-        'building_orientation': [building_orientation],
-        'furnishing': [furnishing],
-        'house_age_category': [house_age_category]
+    # Kolom yang tidak diisi pengguna (url, title, certificate, ...) diisi DEFAULT_VALUES
+    # dan diurutkan sesuai kolom training di prediction.build_feature_frame
+    features = {
+        'lat': lat,
+        'long': long,
+        'bedrooms': bedrooms,
+        'bathrooms': bathrooms,
+        'land_size_m2': land_size_m2,
+        'building_size_m2': building_size_m2,
+        'carports': carports,
+        'maid_bedrooms': maid_bedrooms,
+        'maid_bathrooms': maid_bathrooms,
+        'floors': floors,
+        'building_age': building_age,
+        'year_built': year_built,
+        'garages': garages,
+        'price_per_m2': price_per_m2,
+        'total_rooms': total_rooms,
+        'district': district,
+        'city': city,
+        'property_type': property_type,
+        'property_condition': property_condition,
+        'building_orientation': building_orientation,
+        'furnishing': furnishing,
+        'house_age_category': house_age_category
     }
-    input_df = pd.DataFrame(input_dict)
-    # Add dummy columns for features expected by preprocessor but not used in input
-    # (url, title, address, facilities, ads_id, certificate, electricity)
-    for col in ['url', 'title', 'address', 'facilities', 'ads_id', 'certificate', 'electricity']:
-        input_df[col] = 'unknown'
-    # Reorder columns to match training data
-    ordered_cols = [
-        'url', 'title', 'address', 'district', 'city', 'lat', 'long', 'facilities',
-        'property_type', 'ads_id', 'bedrooms', 'bathrooms', 'land_size_m2', 'building_size_m2',
-        'carports', 'certificate', 'electricity', 'maid_bedrooms', 'maid_bathrooms', 'floors',
-        'building_age', 'year_built', 'property_condition', 'building_orientation', 'garages',
-        'furnishing', 'price_per_m2', 'total_rooms', 'house_age_category'
-    ]
-    input_df = input_df[ordered_cols]
-    processed_input = preprocessor.transform(input_df)
-    predicted_price = model.predict(processed_input)[0]
-    return predicted_price
+    return predict_one(features, preprocessor, model)
 
 def main():
     st.set_page_config(page_title="Prediksi Harga Rumah Jabodetabek", layout="wide")
@@ -0,0 +1,305 @@
+# training.py
+# Harness untuk perbandingan model regresi dan hyperparameter tuning.
+# - Preprocessor di-fit sekali dan hasil transformasinya di-cache di disk (dipakai semua fold)
+# - Model kandidat dilatih paralel di process pool
+# - Tuning memakai successive halving / random search atas grid dari notebook
+# - Hasil setiap fit dan setiap fold di-memoize di disk: menambah satu model baru tidak
+#   melatih ulang model lain. Kunci cache ikut memuat hash kode preprocessor / factory model,
+#   jadi mengubah preprocessing.py atau hist_boosting.py tidak mengembalikan hasil lama
+#
+# Contoh:
+#   python training.py
+#   python training.py --search random --n-candidates 8 --models "Gradient Boosting" "Random Forest"
+#   python training.py --models "Hist Gradient Boosting"
+import argparse
+import inspect
+import math
+import os
+from functools import partial
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler, train_test_split
+from sklearn.svm import SVR
+from sklearn.tree import DecisionTreeRegressor
+
+import feature_engineering
+import preprocessing
+from data_access import file_sha256, source_sha256
+from feature_engineering import get_prepared_df
+from hist_boosting import PARAM_GRID as HIST_BOOSTING_PARAM_GRID, make_hist_boosting
+from preprocessing import build_preprocessor
+
+CACHE_DIR = os.path.join('.cache', 'training')
+RANDOM_STATE = 42
+
+# Model regresi yang dibandingkan di notebook
+MODEL_FACTORIES = {
+    'Linear Regression': LinearRegression,
+    'Ridge Regression': Ridge,
+    'Lasso Regression': Lasso,
+    'Decision Tree': partial(DecisionTreeRegressor, random_state=RANDOM_STATE),
+    'Random Forest': partial(RandomForestRegressor, random_state=RANDOM_STATE),
+    'Gradient Boosting': partial(GradientBoostingRegressor, random_state=RANDOM_STATE),
+    'Support Vector Regressor': SVR,
+    'Hist Gradient Boosting': partial(make_hist_boosting, random_state=RANDOM_STATE),
+}
+# Model yang dilatih pada frame fitur mentah (kategori native), bukan matriks hasil preprocessor
+FEATURE_FRAME_MODELS = {'Hist Gradient Boosting'}
+
+# Grid hyperparameter dari notebook (satu entri per cabang if/elif). Grid Gradient Boosting
+# diperlebar (n_estimators 300, max_depth 4): pada fitur sparse model terbaik ada di tepi grid notebook
+PARAM_GRIDS = {
+    'Random Forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 10, 20],
+        'min_samples_split': [2, 5, 10]
+    },
+    'Gradient Boosting': {
+        'n_estimators': [100, 200, 300],
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_depth': [3, 4, 5, 7]
+    },
+    'Support Vector Regressor': {
+        'C': [0.1, 1, 10],
+        'kernel': ['linear', 'rbf'],
+        'gamma': ['scale', 'auto']
+    },
+    'Ridge Regression': {
+        'alpha': [0.1, 1, 10, 100]
+    },
+    'Lasso Regression': {
+        'alpha': [0.1, 1, 10, 100]
+    },
+    'Decision Tree': {
+        'max_depth': [None, 5, 10, 20],
+        'min_samples_split': [2, 5, 10]
+    },
+    'Hist Gradient Boosting': HIST_BOOSTING_PARAM_GRID,
+}
+
+
+def make_model(name, params=None):
+    return MODEL_FACTORIES[name]().set_params(**(params or {}))
+
+
+def _source_sha256(*modules):
+    return joblib.hash([file_sha256(inspect.getsourcefile(module)) for module in modules])
+
+
+def preprocessing_code_key():
+    """Hash kode feature engineering + definisi preprocessor (kunci cache load_training_data)."""
+    return _source_sha256(feature_engineering, preprocessing)
+
+
+def model_code_key(name):
+    """Hash definisi model `name`: factory beserta argumen partial-nya, dan sumber modulnya.
+
+    Factory dari sklearn diwakili versi sklearn; factory lokal (mis. hist_boosting.make_hist_boosting)
+    diwakili isi file modulnya dan preprocessing.py (daftar kolom yang dipakai encoder-nya).
+    """
+    factory = MODEL_FACTORIES[name]
+    func = getattr(factory, 'func', factory)
+    if func.__module__.split('.')[0] == 'sklearn':
+        source = sklearn.__version__
+    else:
+        source = _source_sha256(inspect.getmodule(func), preprocessing)
+    return joblib.hash((func.__module__, func.__qualname__, getattr(factory, 'keywords', {}), source))
+
+
+def regression_metrics(y_true, y_pred):
+    return {
+        'RMSE': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'MAE': float(mean_absolute_error(y_true, y_pred)),
+        'R2': float(r2_score(y_true, y_pred)),
+    }
+
+
+def _prepare_training_data(data_sha256, code_key, data_path, test_size, random_state):
+    # data_sha256 dan code_key hanya menjadi kunci cache; isi data dibaca dari data_path
+    df = get_prepared_df(data_path)
+    X = df.drop(['price_in_rp'], axis=1)
+    y = df['price_in_rp']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    preprocessor = build_preprocessor()
+    X_train_processed = preprocessor.fit_transform(X_train)
+    X_test_processed = preprocessor.transform(X_test)
+    return (preprocessor, X_train_processed, X_test_processed, y_train.to_numpy(), y_test.to_numpy(),
+            X_train, X_test)
+
+
+def load_training_data(data_path='jabodetabek_house_price.csv', test_size=0.2, random_state=RANDOM_STATE,
+                       cache_dir=CACHE_DIR, return_frames=False):
+    """Split 80:20 + preprocessor yang sudah di-fit; di-cache di disk per hash data dan kode preprocessing.
+
+    return_frames=True menambahkan frame fitur X_train, X_test (untuk FEATURE_FRAME_MODELS).
+    """
+    memory = joblib.Memory(cache_dir, verbose=0)
+    cached = memory.cache(_prepare_training_data, ignore=['data_path'])
+    result = cached(source_sha256(data_path), preprocessing_code_key(), data_path, test_size, random_state)
+    return result if return_frames else result[:5]
+
+
+def _take(X, rows):
+    return X.iloc[rows] if hasattr(X, 'iloc') else X[rows]
+
+
+def _fit_evaluate(name, params, data_key, code_key, X_train, y_train, X_test, y_test):
+    model = make_model(name, params).fit(X_train, y_train)
+    return regression_metrics(y_test, model.predict(X_test)), model
+
+
+def _fold_score(name, params, data_key, code_key, fold, n_splits, n_resources, X, y):
+    # Successive halving memakai n_resources baris pertama dari permutasi tetap
+    order = np.random.RandomState(RANDOM_STATE).permutation(X.shape[0])[:n_resources]
+    train_idx, val_idx = list(KFold(n_splits, shuffle=True, random_state=RANDOM_STATE).split(order))[fold]
+    model = make_model(name, params).fit(_take(X, order[train_idx]), y[order[train_idx]])
+    return -mean_squared_error(y[order[val_idx]], model.predict(_take(X, order[val_idx])))
+
+
+class TrainingHarness:
+    """Perbandingan model dan tuning dengan cache disk per (model, kode model, parameter, data, fold).
+
+    X_train_frame / X_test_frame (frame fitur sebelum preprocessor) diperlukan untuk
+    FEATURE_FRAME_MODELS; tanpa keduanya model tersebut dilewati oleh compare_models.
+    """
+
+    def __init__(self, X_train, y_train, X_test, y_test, cache_dir=CACHE_DIR, n_jobs=-1,
+                 X_train_frame=None, X_test_frame=None):
+        self.X_train, self.y_train = X_train, np.asarray(y_train)
+        self.X_test, self.y_test = X_test, np.asarray(y_test)
+        self.X_train_frame, self.X_test_frame = X_train_frame, X_test_frame
+        self.n_jobs = n_jobs
+        # Data besar tidak ikut di-hash per panggilan; cukup satu kunci untuk seluruh split
+        self.data_key = joblib.hash((self.X_train, self.y_train, self.X_test, self.y_test,
+                                     self.X_train_frame, self.X_test_frame))
+        # Kunci kode per model: mengubah factory model membuat hasil fit/fold lama tidak dipakai
+        self.code_keys = {name: model_code_key(name) for name in MODEL_FACTORIES}
+        memory = joblib.Memory(cache_dir, verbose=0)
+        self._fit_evaluate = memory.cache(_fit_evaluate, ignore=['X_train', 'y_train', 'X_test', 'y_test'])
+        self._fold_score = memory.cache(_fold_score, ignore=['X', 'y'])
+
+    def _inputs(self, name):
+        # (X_train, X_test) yang sesuai untuk model `name`
+        if name not in FEATURE_FRAME_MODELS:
+            return self.X_train, self.X_test
+        if self.X_train_frame is None or self.X_test_frame is None:
+            raise ValueError(f"Model '{name}' membutuhkan X_train_frame dan X_test_frame")
+        return self.X_train_frame, self.X_test_frame
+
+    def fit_evaluate(self, name, params=None):
+        """(model, metrik) untuk satu model yang dilatih pada seluruh data training."""
+        X_train, X_test = self._inputs(name)
+        metrics, model = self._fit_evaluate(name, params or {}, self.data_key, self.code_keys[name],
+                                            X_train, self.y_train, X_test, self.y_test)
+        return model, metrics
+
+    def compare_models(self, names=None):
+        """Latih semua kandidat secara paralel; kembalikan (results_df, models) seperti di notebook."""
+        has_frames = self.X_train_frame is not None and self.X_test_frame is not None
+        names = list(names or [name for name in MODEL_FACTORIES if has_frames or name not in FEATURE_FRAME_MODELS])
+        inputs = {name: self._inputs(name) for name in names}
+        outputs = Parallel(n_jobs=self.n_jobs)(
+            delayed(self._fit_evaluate)(name, {}, self.data_key, self.code_keys[name],
+                                        inputs[name][0], self.y_train, inputs[name][1], self.y_test)
+            for name in names
+        )
+        results = {name: metrics for name, (metrics, _) in zip(names, outputs)}
+        models = {name: model for name, (_, model) in zip(names, outputs)}
+        return pd.DataFrame(results).T[['RMSE', 'MAE', 'R2']], models
+
+    def _score_candidates(self, name, candidates, cv, n_resources):
+        jobs = [(i, fold) for i in range(len(candidates)) for fold in range(cv)]
+        scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(self._fold_score)(name, candidates[i], self.data_key, self.code_keys[name], fold, cv,
+                                      n_resources, self._inputs(name)[0], self.y_train)
+            for i, fold in jobs
+        )
+        return np.asarray(scores).reshape(len(candidates), cv).mean(axis=1)
+
+    def tune(self, name, search='halving', n_candidates=None, cv=3, factor=3, param_grid=None):
+        """Cari parameter terbaik untuk `name`; kembalikan (best_params, cv_results).
+
+        search='grid' mengevaluasi seluruh grid, 'random' mengambil `n_candidates` titik acak,
+        'halving' memulai dengan semua kandidat pada subset data kecil lalu menyisakan
+        1/`factor` terbaik di setiap ronde dengan data `factor` kali lebih besar.
+        Skor adalah rata-rata neg_mean_squared_error dari `cv` fold.
+        """
+        param_grid = param_grid or PARAM_GRIDS.get(name)
+        if not param_grid:
+            return {}, pd.DataFrame()
+        grid = list(ParameterGrid(param_grid))
+        if search == 'grid' or n_candidates is None or n_candidates >= len(grid):
+            candidates = grid
+        else:
+            candidates = list(ParameterSampler(param_grid, n_iter=n_candidates, random_state=RANDOM_STATE))
+
+        n_total = self.X_train.shape[0]
+        rows = []
+        if search == 'halving':
+            n_rounds = max(1, math.ceil(math.log(len(candidates), factor)) + 1)
+            for round_index in range(n_rounds):
+                # Ronde terakhir selalu memakai seluruh data training
+                n_resources = min(max(n_total // factor ** (n_rounds - 1 - round_index), cv * 20), n_total)
+                scores = self._score_candidates(name, candidates, cv, n_resources)
+                rows += [{'round': round_index, 'n_resources': n_resources, 'params': p, 'mean_score': s}
+                         for p, s in zip(candidates, scores)]
+                if len(candidates) == 1 or n_resources == n_total:
+                    break
+                keep = max(1, math.ceil(len(candidates) / factor))
+                candidates = [candidates[i] for i in np.argsort(-scores)[:keep]]
+        else:
+            scores = self._score_candidates(name, candidates, cv, n_total)
+            rows += [{'round': 0, 'n_resources': n_total, 'params': p, 'mean_score': s}
+                     for p, s in zip(candidates, scores)]
+
+        cv_results = pd.DataFrame(rows)
+        final_round = cv_results[cv_results['round'] == cv_results['round'].max()]
+        best_params = final_round.loc[final_round['mean_score'].idxmax(), 'params']
+        return best_params, cv_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan model regresi, tuning model terbaik, simpan best_model.pkl.")
+    parser.add_argument('--data', default='jabodetabek_house_price.csv')
+    parser.add_argument('--models', nargs='+', default=None, choices=list(MODEL_FACTORIES))
+    parser.add_argument('--search', choices=['halving', 'random', 'grid'], default='halving')
+    parser.add_argument('--n-candidates', type=int, default=None)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--results', default=None, help="Simpan results_df ke CSV")
+    parser.add_argument('--preprocessor-out', default='preprocessor.pkl')
+    parser.add_argument('--model-out', default='best_model.pkl')
+    args = parser.parse_args(argv)
+
+    preprocessor, X_train_processed, X_test_processed, y_train, y_test, X_train, X_test = load_training_data(
+        args.data, return_frames=True)
+    harness = TrainingHarness(X_train_processed, y_train, X_test_processed, y_test, n_jobs=args.n_jobs,
+                              X_train_frame=X_train, X_test_frame=X_test)
+
+    results_df, _ = harness.compare_models(args.models)
+    print(results_df.to_string())
+    if args.results:
+        results_df.to_csv(args.results)
+
+    best_model_name = results_df['R2'].idxmax()
+    best_params, _ = harness.tune(best_model_name, search=args.search, n_candidates=args.n_candidates)
+    best_model, best_metrics = harness.fit_evaluate(best_model_name, best_params)
+    print(f"Model terbaik: {best_model_name} {best_params}")
+    print(f"RMSE: {best_metrics['RMSE']:.2f}")
+    print(f"MAE: {best_metrics['MAE']:.2f}")
+    print(f"R2: {best_metrics['R2']:.4f}")
+
+    joblib.dump(preprocessor, args.preprocessor_out)
+    joblib.dump(best_model, args.model_out)
+    print(f"Preprocessor dan model terbaik disimpan ke {args.preprocessor_out} dan {args.model_out}")
+    print("Catatan: latih ulang K-Means (python k_selection.py) karena preprocessor ikut diperbarui.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# tree_export.py
+# Ekspor GradientBoostingRegressor (best_model.pkl) menjadi array NumPy kontigu dan
+# evaluator batch yang vectorized. Hasil prediksi identik dengan model.predict.
+#
+# Contoh:
+#   python tree_export.py --model best_model.pkl --output best_model_flat.pkl --check
+import argparse
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+TREE_LEAF = -1
+
+
+class FlatTreeEnsemble:
+    """Semua pohon GradientBoosting dalam satu set array datar (feature, threshold, children, value).
+
+    Node setiap pohon digabung ke array global; `roots[t]` adalah indeks akar pohon ke-t.
+    Anak kiri/kanan dari daun menunjuk ke daun itu sendiri sehingga traversal semua
+    pohon bisa dijalankan sebanyak `max_depth` langkah tanpa percabangan per node.
+    Hanya kolom input yang dipakai split (`used_features`) yang dibaca.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, value, roots,
+                 used_features, init_value, learning_rate, max_depth, n_features_in):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.used_features = used_features
+        self.init_value = init_value
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features_in
+
+    @classmethod
+    def from_model(cls, model):
+        from sklearn.dummy import DummyRegressor
+
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Hanya GradientBoosting regresi (satu pohon per iterasi) yang didukung")
+        if not isinstance(model.init_, DummyRegressor):
+            raise ValueError(f"init estimator {type(model.init_).__name__} tidak didukung")
+
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        n_nodes = sum(tree.node_count for tree in trees)
+        feature = np.empty(n_nodes, dtype=np.int32)
+        threshold = np.empty(n_nodes, dtype=np.float64)
+        left = np.empty(n_nodes, dtype=np.int32)
+        right = np.empty(n_nodes, dtype=np.int32)
+        value = np.empty(n_nodes, dtype=np.float64)
+        for tree, offset in zip(trees, offsets):
+            nodes = slice(offset, offset + tree.node_count)
+            own_index = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left == TREE_LEAF
+            feature[nodes] = np.where(is_leaf, -1, tree.feature)
+            threshold[nodes] = tree.threshold
+            left[nodes] = np.where(is_leaf, own_index, tree.children_left + offset)
+            right[nodes] = np.where(is_leaf, own_index, tree.children_right + offset)
+            value[nodes] = tree.value[:, 0, 0]
+
+        # Petakan indeks fitur asli ke posisi di used_features; daun memakai kolom 0 (tidak berpengaruh)
+        internal = feature >= 0
+        used_features = np.unique(feature[internal]).astype(np.int32)
+        feature[internal] = np.searchsorted(used_features, feature[internal])
+        feature[~internal] = 0
+
+        return cls(
+            feature=feature, threshold=threshold, children_left=left, children_right=right,
+            value=value, roots=offsets.astype(np.int32), used_features=used_features,
+            init_value=float(np.asarray(model.init_.constant_).ravel()[0]),
+            learning_rate=float(model.learning_rate),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features_in=int(model.n_features_in_),
+        )
+
+    def _select_columns(self, X):
+        # Sama seperti sklearn: input dibandingkan sebagai float32 terhadap threshold float64
+        if sparse.issparse(X):
+            return X.tocsr()[:, self.used_features].toarray().astype(np.float32)
+        return np.asarray(X)[:, self.used_features].astype(np.float32)
+
+    def predict(self, X, chunk_size=4096):
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X memiliki {X.shape[1]} fitur, model membutuhkan {self.n_features_in_}")
+        n_samples = X.shape[0]
+        out = np.full(n_samples, self.init_value, dtype=np.float64)
+        for start in range(0, n_samples, chunk_size):
+            rows = slice(start, min(start + chunk_size, n_samples))
+            # out[rows] adalah view, diisi langsung (init + pohon 1 + pohon 2 + ...)
+            self._accumulate_chunk(self._select_columns(X[rows]), out[rows])
+        return out
+
+    def _accumulate_chunk(self, X_used, acc):
+        row_index = np.arange(X_used.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X_used.shape[0], self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            go_left = X_used[row_index, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        leaf_values = self.value[nodes]
+        # Dijumlahkan per pohon sesuai urutan sklearn agar hasilnya identik bit demi bit
+        for t in range(leaf_values.shape[1]):
+            acc += self.learning_rate * leaf_values[:, t]
+
+
+def flatten_model(model):
+    """FlatTreeEnsemble untuk GradientBoostingRegressor; model lain dikembalikan apa adanya."""
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    if isinstance(model, GradientBoostingRegressor):
+        return FlatTreeEnsemble.from_model(model)
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor GradientBoostingRegressor ke array datar untuk inferensi cepat.")
+    parser.add_argument('--model', default='best_model.pkl')
+    parser.add_argument('--output', default='best_model_flat.pkl')
+    parser.add_argument('--check', action='store_true', help="Bandingkan prediksi dengan model.predict pada dataset")
+    parser.add_argument('--preprocessor', default='preprocessor.pkl')
+    parser.add_argument('--data', default='jabodetabek_house_price.csv')
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    flat = FlatTreeEnsemble.from_model(model)
+    joblib.dump(flat, args.output)
+    print(f"{flat.roots.size} pohon, {flat.value.size} node, {flat.used_features.size} dari "
+          f"{flat.n_features_in_} fitur dipakai -> {args.output}")
+
+    if args.check:
+        from feature_engineering import get_prepared_df
+
+        X = joblib.load(args.preprocessor).transform(get_prepared_df(args.data).drop('price_in_rp', axis=1))
+        expected = model.predict(X)
+        actual = flat.predict(X)
+        if not np.array_equal(expected, actual):
+            raise SystemExit(f"Prediksi berbeda: selisih maksimum {np.abs(expected - actual).max()}")
+        print(f"Prediksi identik dengan model.predict untuk {len(expected)} baris")
+
+
+if __name__ == '__main__':
+    # Jalankan lewat modul yang diimpor: FlatTreeEnsemble di-pickle sebagai tree_export.FlatTreeEnsemble,
+    # bukan __main__.FlatTreeEnsemble yang tidak bisa dimuat oleh proses lain
+    import tree_export
+    tree_export.main()